@@ -0,0 +1,285 @@
+"""
+Module defining the typed applicant record shared by the cleaning and loading stages.
+
+:func:`clean.clean_html` used to return every score as the string it found in
+the page ('3.90', '0'), leaving each later stage to convert it again: the
+loader pushed strings into FLOAT columns and every dashboard query cast them.
+:class:`ApplicantRecord` converts and validates the scores once, when a row
+is parsed, and offers cheap conversions for the two places rows leave Python:
+
+    - :meth:`ApplicantRecord.as_tuple` for database inserts, in the column
+      order of the applicants table
+    - :meth:`ApplicantRecord.to_dict` for the JSON files passed between stages,
+      with the keys the scraper has always written ('Term', 'US/International',
+      'Degree', 'llm-generated-program', ...)
+
+Score validation:
+    - values that are not numbers become None
+    - 0 becomes None; GradCafe shows 0 when no score was entered
+    - values outside SCORE_RANGES become None
+
+Derived fields, so queries can filter on indexed columns instead of text:
+    - decision: one of DECISIONS, from the decision text ('Wait listed on 6 Mar')
+    - decision_date: ISO date of the decision; the year is taken from the
+      text when present, else from date_added (the year before when the
+      decision would otherwise fall after the entry was added)
+    - term_season / term_year: 'Fall' and 2025 for the term 'Fall 2025'
+
+Example Usage:
+    >>> record = ApplicantRecord.from_dict({"program": "CS", "gpa": "3.90", "gre": "0"})
+    >>> record.gpa, record.gre
+    (3.9, None)
+    >>> record.to_dict()['gpa']
+    3.9
+
+.. seealso::
+   :mod:`clean` for the parser that builds records
+   :mod:`load_data` for the database insert
+"""
+
+import math
+import re
+from dataclasses import dataclass
+from datetime import date, datetime
+
+# Inclusive range of plausible values for each score
+SCORE_RANGES = {
+    "gpa": (0.0, 10.0),
+    "gre": (130.0, 340.0),
+    "gre_v": (130.0, 170.0),
+    "gre_aw": (0.0, 6.0),
+}
+
+# Values of the decision column
+DECISIONS = ("accepted", "rejected", "interview", "wait_listed", "other")
+
+# Values of the term_season column
+SEASONS = ("Spring", "Summer", "Fall", "Winter")
+
+DECISION_RE = re.compile(
+    r'\b(Accepted|Rejected|Interview|Wait\s*listed|Other)'
+    r'(?:\s+on\s+(\d{1,2})\s+([A-Za-z]{3})[A-Za-z]*\.?(?:,?\s+(\d{4}))?)?',
+    re.IGNORECASE,
+)
+TERM_RE = re.compile(r'\b(Spring|Summer|Fall|Winter)\s+(\d{4})\b', re.IGNORECASE)
+YEAR_RE = re.compile(r'\b(\d{4})\b')
+
+# Record attribute (and applicants column) -> key used in the JSON row files
+JSON_KEYS = {
+    "program": "program",
+    "comments": "comments",
+    "date_added": "date_added",
+    "url": "url",
+    "status": "status",
+    "term": "Term",
+    "us_or_international": "US/International",
+    "gpa": "gpa",
+    "gre": "gre",
+    "gre_v": "gre_v",
+    "gre_aw": "gre_aw",
+    "degree": "Degree",
+    "llm_generated_program": "llm-generated-program",
+    "llm_generated_university": "llm-generated-university",
+    "decision": "decision",
+    "decision_date": "decision_date",
+    "term_season": "term_season",
+    "term_year": "term_year",
+}
+
+# Attributes that to_dict() leaves out while they are None (set by the LLM step)
+_OPTIONAL = ("llm_generated_program", "llm_generated_university")
+
+
+def to_score(field, value):
+    """
+    Convert a raw score to a float, or None when it is missing or implausible.
+
+    :param field: Score name, one of SCORE_RANGES
+    :type field: str
+    :param value: Score as parsed ('3.90', ' 320 ') or already converted
+    :type value: str or float or int or None
+    :return: The score, or None
+    :rtype: float or None
+
+    Example:
+        >>> to_score('gre_aw', '4.5'), to_score('gpa', '0.00'), to_score('gre_v', '900')
+        (4.5, None, None)
+    """
+    if value is None:
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    low, high = SCORE_RANGES[field]
+    if number == 0 or not math.isfinite(number) or not low <= number <= high:
+        return None
+    return number
+
+
+def _added_date(date_added):
+    """Parse GradCafe's 'March 3, 2025'; None when it has another form."""
+    try:
+        return datetime.strptime(' '.join(date_added.split()), '%B %d, %Y').date()
+    except (AttributeError, ValueError):
+        return None
+
+
+def parse_decision(text, date_added=None):
+    """
+    Derive the decision and its date from a decision or status text.
+
+    :param text: Text of the decision cell or the status field, e.g. 'Accepted on 3 Mar'
+    :type text: str or None
+    :param date_added: Date the entry was added, e.g. 'March 7, 2025'; gives the
+        year when the text has none
+    :type date_added: str, optional
+    :return: Decision (one of DECISIONS) and ISO decision date; None for either
+        when it cannot be derived. Text that names no known decision is
+        'other', so the decision is only None when there is no text.
+    :rtype: tuple[str or None, str or None]
+
+    Example:
+        >>> parse_decision('Wait listed on 6 Mar', 'March 7, 2025')
+        ('wait_listed', '2025-03-06')
+        >>> parse_decision('Accepted on 28 Dec', 'January 2, 2025')
+        ('accepted', '2024-12-28')
+        >>> parse_decision('Pending')
+        ('other', None)
+    """
+    text = ' '.join((text or '').split())
+    match = DECISION_RE.search(text)
+    if not match:
+        return ('other' if text else None), None
+    decision = match.group(1).lower().replace(' ', '')
+    decision = 'wait_listed' if decision == 'waitlisted' else decision
+
+    day, month, year = match.group(2), match.group(3), match.group(4)
+    if day is None:
+        return decision, None
+    added = _added_date(date_added)
+    if year is None:
+        fallback = YEAR_RE.search(date_added or '')
+        if added is None and fallback is None:
+            return decision, None
+        year = added.year if added else int(fallback.group(1))
+    try:
+        decided = date(int(year), datetime.strptime(month.title(), '%b').month, int(day))
+    except ValueError:
+        return decision, None
+    if match.group(4) is None and added is not None and decided > added:
+        try:
+            decided = decided.replace(year=decided.year - 1)
+        except ValueError:  # 29 Feb
+            return decision, None
+    return decision, decided.isoformat()
+
+
+def parse_term(term):
+    """
+    Split a term such as 'Fall 2025' into season and year.
+
+    :param term: Term text
+    :type term: str or None
+    :return: Season (one of SEASONS) and year; the season is None when the
+        term only gives a year, and both are None when it gives neither
+    :rtype: tuple[str or None, int or None]
+
+    Example:
+        >>> parse_term('Fall 2025')
+        ('Fall', 2025)
+        >>> parse_term('2025')
+        (None, 2025)
+    """
+    match = TERM_RE.search(term or '')
+    if not match:
+        year = YEAR_RE.search(term or '')
+        return None, (int(year.group(1)) if year else None)
+    return match.group(1).title(), int(match.group(2))
+
+
+@dataclass(slots=True)
+class ApplicantRecord:
+    """
+    One GradCafe survey entry, with scores converted to floats.
+
+    Attribute names match the columns of the applicants table. Scores are
+    converted with :func:`to_score` on construction, so a record never holds
+    a score string. Derived fields that are not given are filled from term,
+    status and date_added (:func:`parse_term`, :func:`parse_decision`); the
+    parser passes the decision it read from the page, which also covers
+    decisions that have no status text (interview, wait listed).
+
+    Example:
+        >>> ApplicantRecord(program="CS", gre_v="165").gre_v
+        165.0
+    """
+
+    program: str = None
+    comments: str = None
+    date_added: str = None
+    url: str = None
+    status: str = None
+    term: str = None
+    us_or_international: str = None
+    gpa: float = None
+    gre: float = None
+    gre_v: float = None
+    gre_aw: float = None
+    degree: str = None
+    llm_generated_program: str = None
+    llm_generated_university: str = None
+    decision: str = None
+    decision_date: str = None
+    term_season: str = None
+    term_year: int = None
+
+    def __post_init__(self):
+        self.gpa = to_score("gpa", self.gpa)
+        self.gre = to_score("gre", self.gre)
+        self.gre_v = to_score("gre_v", self.gre_v)
+        self.gre_aw = to_score("gre_aw", self.gre_aw)
+        if self.decision not in DECISIONS:
+            self.decision, decision_date = parse_decision(self.status, self.date_added)
+            self.decision_date = self.decision_date or decision_date
+        if self.term_season not in SEASONS or self.term_year is None:
+            self.term_season, self.term_year = parse_term(self.term)
+
+    @classmethod
+    def from_dict(cls, row):
+        """
+        Build a record from a JSON row; missing keys become None.
+
+        :param row: Row with the keys of JSON_KEYS (old files with string scores work)
+        :type row: dict
+        :return: The record
+        :rtype: ApplicantRecord
+        """
+        return cls(**{name: row.get(key) for name, key in JSON_KEYS.items()})
+
+    def to_dict(self):
+        """
+        Return the row with the keys of JSON_KEYS, ready for json.dump.
+
+        The LLM fields are left out while they are None, so a freshly parsed
+        row has the same keys as before records were introduced.
+
+        :rtype: dict
+        """
+        row = {key: getattr(self, name) for name, key in JSON_KEYS.items()}
+        for name in _OPTIONAL:
+            if row[JSON_KEYS[name]] is None:
+                del row[JSON_KEYS[name]]
+        return row
+
+    def as_tuple(self):
+        """
+        Return the values in applicants column order (the keys of JSON_KEYS).
+
+        :rtype: tuple
+        """
+        return (self.program, self.comments, self.date_added, self.url, self.status,
+                self.term, self.us_or_international, self.gpa, self.gre, self.gre_v,
+                self.gre_aw, self.degree, self.llm_generated_program,
+                self.llm_generated_university, self.decision, self.decision_date,
+                self.term_season, self.term_year)
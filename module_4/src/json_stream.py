@@ -0,0 +1,327 @@
+"""
+Module for reading and writing large JSON and JSON Lines files one record at a time.
+
+``json.load`` builds the whole document in memory, which for the multi-gigabyte
+raw backfill files needs a large-memory box. The readers here decode a file
+incrementally and yield one record at a time, holding at most the current
+record (plus one read chunk) in memory. A file is read in a single pass.
+
+Accepted layouts, matching what the scraper, cleaner and LLM step write:
+    - a JSON array of records: ``[{...}, {...}]``
+    - an object whose 'rows' key holds the records: ``{"rows": [{...}, ...]}``
+    - JSON Lines, one record per line; lines that are not valid JSON are skipped
+
+Written format: every stage of the pipeline (scrape -> clean -> LLM -> load)
+writes compact JSON Lines with :func:`write_file`, one record per line with no
+indentation or spaces after separators. Files from before the pipeline
+switched format can be converted once with :func:`convert_file`.
+
+.. note::
+   Inside an array or a 'rows' object the file must be valid JSON; a
+   truncated or corrupt document raises :class:`json.JSONDecodeError` once
+   the bad record is reached. A document written on a single line is decoded
+   whole, as it cannot be told apart from a one-line JSON Lines file before
+   that line has been read.
+
+Example Usage:
+    >>> import json_stream
+    >>> for row in json_stream.iter_file('update_llm_extend_applicant_data.jsonl'):
+    ...     print(row['program'])
+    Computer Science, Stanford University
+    >>> json_stream.convert_file('applicant_data.json', 'applicant_data.jsonl')
+    150
+
+.. seealso::
+   :mod:`load_data` and :mod:`clean` for the loaders built on this module
+"""
+
+import argparse
+import json
+import os
+
+# Characters read from the file per refill; grown while a record is larger
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = ' \t\n\r'
+_decoder = json.JSONDecoder()
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+class _Buffer:
+    """Sliding window over a text file with helpers for incremental decoding."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+
+    def fill(self):
+        """Drop consumed text and append the next chunk (at least as large as the pending text)."""
+        data = self.f.read(max(self.chunk_size, len(self.text) - self.pos))
+        self.text = self.text[self.pos:] + data
+        self.pos = 0
+        self.eof = not data
+
+    def peek(self):
+        """Skip whitespace and return the next character, or '' at end of file."""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text) or self.eof:
+                return self.text[self.pos:self.pos + 1]
+            self.fill()
+
+    def expect(self, chars, message):
+        """Consume the next character if it is one of chars, otherwise raise."""
+        char = self.peek()
+        if not char or char not in chars:
+            raise json.JSONDecodeError(message, self.text, self.pos)
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the JSON value starting at the next character."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self.fill()  # The value may continue in the next chunk
+                continue
+            # A number at the end of the window might continue in the next chunk
+            if end < len(self.text) or self.eof:
+                self.pos = end
+                return obj
+            self.fill()
+
+    def line_end(self):
+        """Return the index of the next newline, or of the end of file."""
+        while True:
+            newline = self.text.find('\n', self.pos)
+            if newline != -1:
+                return newline
+            if self.eof:
+                return len(self.text)
+            self.fill()
+
+
+def _iter_array(buf):
+    buf.expect('[', "Expecting '['")
+    if buf.peek() == ']':
+        buf.pos += 1
+        return
+    while True:
+        yield buf.value()
+        if buf.expect(',]', "Expecting ',' delimiter") == ']':
+            return
+
+
+def _iter_object(buf, key):
+    """Yield the items of obj[key] as they are decoded, or obj itself if key is absent."""
+    buf.expect('{', "Expecting '{'")
+    fields = {}
+    streamed = False
+    if buf.peek() == '}':
+        buf.pos += 1
+    else:
+        while True:
+            if buf.peek() != '"':
+                raise json.JSONDecodeError("Expecting property name enclosed in double quotes",
+                                           buf.text, buf.pos)
+            name = buf.value()
+            buf.expect(':', "Expecting ':' delimiter")
+            if name == key and buf.peek() == '[':
+                yield from _iter_array(buf)
+                streamed = True
+            else:
+                fields[name] = buf.value()
+            if buf.expect(',}', "Expecting ',' delimiter") == '}':
+                break
+    if not streamed:
+        yield fields
+
+
+def _iter_lines(buf):
+    while buf.peek():
+        end = buf.line_end()
+        line = buf.text[buf.pos:end]
+        buf.pos = end + 1
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+
+def iter_records(f, key='rows', chunk_size=CHUNK_SIZE):
+    """
+    Yield the records of an open JSON or JSON Lines file one at a time.
+
+    :param f: Text file object opened for reading
+    :type f: io.TextIOBase
+    :param key: Key of a top-level object that holds the records
+    :type key: str, optional
+    :param chunk_size: Characters read from f at a time
+    :type chunk_size: int, optional
+    :return: Iterator over the records in file order
+    :rtype: iterator
+    :raises json.JSONDecodeError: When an array or 'rows' document is malformed
+
+    Example:
+        >>> with open('applicant_data.jsonl', encoding='utf-8') as f:
+        ...     rows = list(iter_records(f))
+    """
+    buf = _Buffer(f, chunk_size)
+    first = buf.peek()
+    if first == '[':
+        yield from _iter_array(buf)
+        return
+    if first != '{':
+        yield from _iter_lines(buf)
+        return
+
+    # A first line that is a whole object means JSON Lines (or a one-line document)
+    end = buf.line_end()
+    try:
+        record = json.loads(buf.text[buf.pos:end])
+    except json.JSONDecodeError:
+        yield from _iter_object(buf, key)
+        return
+
+    buf.pos = end
+    if buf.peek():
+        yield record
+        yield from _iter_lines(buf)
+    elif isinstance(record.get(key), list):
+        yield from record[key]
+    else:
+        yield record
+
+
+def iter_file(filename, key='rows', encoding='utf-8'):
+    """
+    Open a JSON or JSON Lines file and yield its records one at a time.
+
+    :param filename: Path to the file
+    :type filename: str
+    :param key: Key of a top-level object that holds the records
+    :type key: str, optional
+    :param encoding: Text encoding of the file
+    :type encoding: str, optional
+    :return: Iterator over the records in file order
+    :rtype: iterator
+    :raises FileNotFoundError: When the file does not exist
+    :raises json.JSONDecodeError: When an array or 'rows' document is malformed
+
+    Example:
+        >>> sum(1 for _ in iter_file('update_raw_applicant_data.json'))
+        9058
+    """
+    with open(filename, 'r', encoding=encoding) as f:
+        yield from iter_records(f, key)
+
+
+def dumps(record):
+    """
+    Serialize one record as a compact JSON Lines line (without the newline).
+
+    :param record: JSON-serializable record
+    :type record: dict
+    :rtype: str
+
+    Example:
+        >>> dumps({"program": "CS", "gpa": 3.9})
+        '{"program":"CS","gpa":3.9}'
+    """
+    return _encoder.encode(record)
+
+
+def write_records(f, records):
+    """
+    Write records to an open text file as compact JSON Lines.
+
+    :param f: Text file object opened for writing
+    :type f: io.TextIOBase
+    :param records: Records to write; may be a generator
+    :type records: iterable
+    :return: Number of records written
+    :rtype: int
+    :raises TypeError: When a record cannot be JSON serialized
+    """
+    count = 0
+    for record in records:
+        f.write(_encoder.encode(record))
+        f.write('\n')
+        count += 1
+    return count
+
+
+def write_file(filename, records, encoding='utf-8'):
+    """
+    Write records to a compact JSON Lines file, replacing it when complete.
+
+    Records are written to ``<filename>.tmp`` first, so a reader never sees a
+    half-written file and a failed run leaves the previous file in place.
+
+    :param filename: Path to the output file
+    :type filename: str
+    :param records: Records to write; may be a generator
+    :type records: iterable
+    :param encoding: Text encoding of the file
+    :type encoding: str, optional
+    :return: Number of records written
+    :rtype: int
+    :raises TypeError: When a record cannot be JSON serialized
+
+    Example:
+        >>> write_file('update_applicant_data.jsonl', rows)
+        150
+    """
+    tmp_name = filename + '.tmp'
+    try:
+        with open(tmp_name, 'w', encoding=encoding) as f:
+            count = write_records(f, records)
+        os.replace(tmp_name, filename)
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+    return count
+
+
+def convert_file(src, dst, key='rows', encoding='utf-8'):
+    """
+    Convert a legacy JSON file (indented array or {'rows': [...]}) to compact JSON Lines.
+
+    Records are streamed from src to dst, so files larger than memory convert too.
+
+    :param src: Path to the legacy JSON file
+    :type src: str
+    :param dst: Path to the JSON Lines file to write
+    :type dst: str
+    :param key: Key of a top-level object that holds the records
+    :type key: str, optional
+    :param encoding: Text encoding of both files
+    :type encoding: str, optional
+    :return: Number of records converted
+    :rtype: int
+    :raises FileNotFoundError: When src does not exist
+    :raises json.JSONDecodeError: When src is malformed
+
+    Example:
+        >>> convert_file('llm_extend_applicant_data.json', 'llm_extend_applicant_data.jsonl')
+        30000
+    """
+    return write_file(dst, iter_file(src, key, encoding), encoding)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    parser = argparse.ArgumentParser(
+        description="Convert a legacy JSON file to compact JSON Lines.")
+    parser.add_argument("src", help="Legacy JSON file (array or {'rows': [...]}).")
+    parser.add_argument("dst", nargs="?", help="Output file (default: src with a .jsonl suffix).")
+    args = parser.parse_args()
+    dst = args.dst or os.path.splitext(args.src)[0] + '.jsonl'
+    print(f"Converted {convert_file(args.src, dst)} records to {dst}")
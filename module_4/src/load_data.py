@@ -14,56 +14,146 @@ and includes robust error handling for various file formats and encoding issues.
 """
 
 import psycopg_pool
-import json
+import itertools
 import os
+import re
+
+import json_stream
+from applicant_record import ApplicantRecord, parse_decision, parse_term
+
+# Rows sent to the database per executemany call and transaction
+LOAD_BATCH_SIZE = int(os.getenv('LOAD_BATCH_SIZE', '1000'))
+
+# Pattern used to pull the numeric GradCafe result ID out of an applicant URL
+RESULT_ID_RE = re.compile(r'/result/(\d+)')
+
+# Name of the crawl_cursor row tracking the GradCafe survey crawl
+CRAWL_CURSOR_NAME = 'gradcafe_survey'
+
+CRAWL_CURSOR_DDL = """
+    CREATE TABLE IF NOT EXISTS crawl_cursor(
+        name TEXT PRIMARY KEY,
+        high_water_mark INTEGER NOT NULL,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+"""
+
+# Indexes on the structured columns filled by ApplicantRecord
+STRUCTURED_INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS applicants_term_idx
+        ON applicants (term_year, term_season);
+    CREATE INDEX IF NOT EXISTS applicants_decision_idx
+        ON applicants (decision, term_year);
+"""
+
+# Insert shared by both loaders; rows already stored under their result_id are skipped
+INSERT_APPLICANT_SQL = """
+    INSERT INTO applicants(
+        program, comments, date_added, url, status, term,
+        us_or_international, gpa, gre, gre_v, gre_aw, degree,
+        llm_generated_program, llm_generated_university,
+        decision, decision_date, term_season, term_year, result_id
+    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+              %s, %s, %s, %s, %s)
+    ON CONFLICT (result_id) DO NOTHING
+"""
+
+# Fills the structured columns of rows read by add_structured_columns() in one
+# statement per chunk; values already stored are kept
+STRUCTURED_BACKFILL_SQL = """
+    UPDATE applicants a
+    SET decision = COALESCE(a.decision, v.decision),
+        decision_date = COALESCE(a.decision_date, v.decision_date),
+        term_season = COALESCE(a.term_season, v.term_season),
+        term_year = COALESCE(a.term_year, v.term_year),
+        structured_parsed = true
+    FROM unnest(%s::int[], %s::text[], %s::date[], %s::text[], %s::smallint[])
+        AS v(p_id, decision, decision_date, term_season, term_year)
+    WHERE a.p_id = v.p_id;
+"""
+
+# Set once ensure_schema() has run the migrations in this process
+_schema_ready = False
+
+def extract_result_id(url):
+    """
+    Extract the numeric GradCafe result ID from an applicant URL.
+
+    :param url: Applicant URL such as 'https://www.thegradcafe.com/result/12345'
+    :type url: str or None
+    :return: The result ID, or None when the URL is missing or has no ID
+    :rtype: int or None
+
+    Example:
+        >>> extract_result_id('https://www.thegradcafe.com/result/12345')
+        12345
+        >>> extract_result_id(None) is None
+        True
+    """
+    match = RESULT_ID_RE.search(url or '')
+    return int(match.group(1)) if match else None
+
+def _batches(rows, size):
+    """Yield lists of up to size rows from any iterable."""
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, size)):
+        yield batch
+
+def iter_rows(filename):
+    """
+    Yield the records of a JSON or JSON Lines file one at a time.
+
+    The file is decoded in a single streaming pass by :mod:`json_stream`, which
+    accepts a list of rows, {'rows': [...]} and JSONL alike. A file that turns
+    out not to be valid UTF-8 is read again as latin1, skipping the records
+    already yielded.
+
+    :param filename: Path to the JSON file to load
+    :type filename: str
+    :return: Iterator over the records in file order
+    :rtype: iterator[dict]
+    :raises json.JSONDecodeError: When a JSON array or {'rows': [...]} document is malformed
+    :raises FileNotFoundError: When the specified file doesn't exist
+
+    Example:
+        >>> add_applicant_data({"rows": iter_rows('update_llm_extend_applicant_data.jsonl')})
+    """
+    yielded = 0
+    try:
+        for row in json_stream.iter_file(filename):
+            yield row
+            yielded += 1
+    except UnicodeDecodeError:
+        # Handle encoding issues
+        yield from itertools.islice(json_stream.iter_file(filename, encoding='latin1'), yielded, None)
 
 def load_data(filename):
     """
     Load data from a JSON file with fallback handling for problematic files.
     
-    This function attempts to load JSON data using multiple strategies to handle
-    different file formats and encoding issues. It first tries standard JSON loading,
-    then falls back to JSONL format, and finally attempts to handle encoding issues.
+    Reads every record with :func:`iter_rows`, so JSON, {'rows': [...]} and
+    JSONL files are accepted and non-UTF-8 files are read again as latin1.
     
     :param filename: Path to the JSON file to load
     :type filename: str
-    :return: Dictionary containing the loaded data, with 'rows' key for JSONL format
+    :return: Dictionary with the loaded records under the 'rows' key
     :rtype: dict
-    :raises json.JSONDecodeError: When JSON parsing fails completely
+    :raises json.JSONDecodeError: When a JSON array or {'rows': [...]} document is malformed
     :raises FileNotFoundError: When the specified file doesn't exist
-    :raises UnicodeDecodeError: When encoding issues cannot be resolved
     
     .. note::
        For JSONL files, each line should contain a valid JSON object.
        Invalid lines are silently skipped.
        
+    .. seealso::
+       :func:`iter_rows` to load rows without holding them all
+
     Example:
         >>> data = load_data('applicant_data.json')
         >>> print(len(data['rows']))
         150
     """
-    try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        # Handle JSONL format (one JSON per line)
-        records = []
-        with open(filename, 'r', encoding='utf-8', errors='replace') as f:
-            for line in f:
-                line = line.strip()
-                if line:
-                    try:
-                        records.append(json.loads(line))
-                    except json.JSONDecodeError:
-                        continue
-        return {"rows": records}
-    except UnicodeDecodeError:
-        # Handle encoding issues
-        with open(filename, 'r', encoding='latin1') as f:
-            content = f.read()
-        # Clean problematic characters and try again
-        cleaned_content = content.encode('utf-8', errors='ignore').decode('utf-8')
-        return json.loads(cleaned_content)
+    return {"rows": list(iter_rows(filename))}
     
 def create_applicant_table():
     """
@@ -71,7 +161,8 @@ def create_applicant_table():
     
     This function establishes a connection to the PostgreSQL database and creates
     the applicants table with the required schema. If the table already exists,
-    it will be dropped and recreated.
+    it will be dropped and recreated. The crawl_cursor table is reset at the
+    same time so the scraper does not stop early against an empty table.
     
     :raises psycopg.Error: When database connection or SQL execution fails
     
@@ -99,6 +190,15 @@ def create_applicant_table():
         - degree: TEXT - Degree type (Masters, PhD)
         - llm_generated_program: TEXT - LLM-processed program name
         - llm_generated_university: TEXT - LLM-processed university name
+        - decision: TEXT - accepted, rejected, interview, wait_listed or other
+        - decision_date: DATE - Date of the decision
+        - term_season: TEXT - Spring, Summer, Fall or Winter
+        - term_year: SMALLINT - Year of the term
+        - structured_parsed: BOOLEAN - Structured columns derived (true for new rows)
+        - result_id: INTEGER - GradCafe result ID parsed from url (unique index)
+
+    Indexes on (term_year, term_season) and (decision, term_year) serve the
+    dashboard queries in :mod:`query_data` and :mod:`app`.
     """
     DATABASE_URL = os.getenv('DATABASE_URL', "postgresql://postgres@localhost:5432/module_3_db")
     pool = psycopg_pool.ConnectionPool(DATABASE_URL)
@@ -107,6 +207,7 @@ def create_applicant_table():
         with conn.cursor() as cur:
             cur.execute("""
                 DROP TABLE IF EXISTS applicants;
+                DROP TABLE IF EXISTS crawl_cursor;
             """)
 
             cur.execute("""
@@ -125,14 +226,117 @@ def create_applicant_table():
                     gre_aw FLOAT,
                     degree TEXT,
                     llm_generated_program TEXT,
-                    llm_generated_university TEXT
-                )
-            """)
+                    llm_generated_university TEXT,
+                    decision TEXT CHECK (decision IN
+                        ('accepted', 'rejected', 'interview', 'wait_listed', 'other')),
+                    decision_date DATE,
+                    term_season TEXT CHECK (term_season IN ('Spring', 'Summer', 'Fall', 'Winter')),
+                    term_year SMALLINT,
+                    structured_parsed BOOLEAN DEFAULT true,
+                    result_id INTEGER
+                );
+                CREATE UNIQUE INDEX IF NOT EXISTS applicants_result_id_idx
+                    ON applicants (result_id);
+            """ + STRUCTURED_INDEX_DDL + CRAWL_CURSOR_DDL)
 
             conn.commit()
     pool.close()
     
 
+def create_crawl_cursor_table():
+    """
+    Create the crawl_cursor table used for incremental scraping.
+
+    The table holds one row per crawl with the highest GradCafe result ID that
+    has been ingested (the high-water mark) and when it last advanced. It is
+    created by :func:`create_applicant_table`; this function adds it to an
+    existing database without touching the applicants table.
+
+    :raises psycopg.Error: When database connection or SQL execution fails
+
+    Example:
+        >>> create_crawl_cursor_table()
+    """
+    DATABASE_URL = os.getenv('DATABASE_URL', "postgresql://postgres@localhost:5432/module_3_db")
+    pool = psycopg_pool.ConnectionPool(DATABASE_URL)
+
+    try:
+        with pool.getconn() as conn:
+            with conn.cursor() as cur:
+                cur.execute(CRAWL_CURSOR_DDL)
+                conn.commit()
+    finally:
+        pool.close()
+
+def advance_crawl_cursor(cur, result_ids):
+    """
+    Move the crawl high-water mark forward on an open cursor.
+
+    The loaders call this once, after the last batch of a run has been
+    committed, so the mark only covers runs that were stored in full. A load
+    that fails part-way leaves it where it was. The mark never moves backwards.
+
+    :param cur: Open psycopg cursor inside the loader's transaction
+    :type cur: psycopg.Cursor
+    :param result_ids: Result IDs of the rows being inserted (None values ignored)
+    :type result_ids: iterable[int or None]
+
+    Example:
+        >>> advance_crawl_cursor(cur, [12345, 12350, None])  # mark becomes >= 12350
+    """
+    known_ids = [result_id for result_id in result_ids if result_id is not None]
+    if not known_ids:
+        return
+
+    cur.execute("""
+        INSERT INTO crawl_cursor (name, high_water_mark, updated_at)
+        VALUES (%s, %s, now())
+        ON CONFLICT (name) DO UPDATE SET
+            high_water_mark = GREATEST(crawl_cursor.high_water_mark, EXCLUDED.high_water_mark),
+            updated_at = now()
+        """, (CRAWL_CURSOR_NAME, max(known_ids)))
+
+def _newest_id(newest_id, result_ids):
+    """Return the highest of newest_id and result_ids, ignoring None values."""
+    return max((result_id for result_id in (newest_id, *result_ids) if result_id is not None), default=None)
+
+def _load_counts(inserted, skipped):
+    """Report and return how many rows a load inserted and skipped as duplicates."""
+    print(f"Inserted {inserted} rows, skipped {skipped} already in the database")
+    return {"inserted": inserted, "skipped": skipped}
+
+def _finish_crawl_cursor(conn, cur, newest_id):
+    """Advance the crawl cursor to the newest ID of a fully committed load."""
+    if newest_id is not None:
+        advance_crawl_cursor(cur, [newest_id])
+        conn.commit()
+
+def ensure_schema():
+    """
+    Bring an existing applicants table up to the current schema.
+
+    Runs :func:`create_crawl_cursor_table`, :func:`add_result_id_column` and
+    :func:`add_structured_columns` once per process. The loaders call this
+    before their first insert, since ``ON CONFLICT (result_id)`` needs the
+    unique index and the insert names the decision and term columns.
+
+    :raises psycopg.Error: When database connection or SQL execution fails
+
+    .. note::
+       Every migration is idempotent, so a database created by
+       :func:`create_applicant_table` is left unchanged.
+
+    Example:
+        >>> ensure_schema()  # Later calls in the same process return at once
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    create_crawl_cursor_table()
+    add_result_id_column()
+    add_structured_columns()
+    _schema_ready = True
+
 def  add_applicant_data_master_copy(data):
     """
     Add applicant data to the PostgreSQL database using master copy field mappings.
@@ -143,6 +347,8 @@ def  add_applicant_data_master_copy(data):
     
     :param data: Dictionary containing applicant data with 'rows' key
     :type data: dict
+    :return: Number of rows inserted and of rows skipped as already stored
+    :rtype: dict
     :raises psycopg.Error: When database connection or insertion fails
     :raises KeyError: When required fields are missing from data entries
     
@@ -150,6 +356,19 @@ def  add_applicant_data_master_copy(data):
        This function expects the master copy format with fields like:
        'semester', 'applicant_type', 'gre_total', 'gre_verbal'
        
+    .. note::
+       The result_id column is filled from each entry's url. Rows whose
+       result_id is already stored are skipped (ON CONFLICT DO NOTHING);
+       how many were skipped is printed and returned.
+       Older tables are migrated first by :func:`ensure_schema`.
+
+    .. note::
+       data['rows'] may be any iterable, such as :func:`iter_rows`; rows are
+       read, inserted and committed LOAD_BATCH_SIZE at a time. The crawl
+       cursor only advances after the final batch commits, so a failed load
+       never leaves the high-water mark above rows that were not stored.
+       The decision and term columns are derived from status and semester.
+
     Required Fields in Each Entry:
         - program, comments, date_added, url, status
         - semester, applicant_type, gpa, gre_total, gre_verbal, gre_aw
@@ -158,28 +377,36 @@ def  add_applicant_data_master_copy(data):
     Example:
         >>> data = {"rows": [{"program": "CS", "semester": "Fall 2025", ...}]}
         >>> add_applicant_data_master_copy(data)
+        Inserted 1 rows, skipped 0 already in the database
+        {'inserted': 1, 'skipped': 0}
     """
     
+    ensure_schema()
     DATABASE_URL = os.getenv('DATABASE_URL', "postgresql://postgres@localhost:5432/module_3_db")
     pool = psycopg_pool.ConnectionPool(DATABASE_URL)
 
+    newest_id = None
+    inserted = skipped = 0
     with pool.getconn() as conn:
         with conn.cursor() as cur:
-            for entry in data['rows']:
-                cur.execute("""
-                    INSERT INTO applicants(
-                        program, comments, date_added, url, status, term,
-                        us_or_international, gpa, gre, gre_v, gre_aw, degree,
-                        llm_generated_program, llm_generated_university
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (
+            for batch in _batches(data['rows'], LOAD_BATCH_SIZE):
+                result_ids = [extract_result_id(entry['url']) for entry in batch]
+                cur.executemany(INSERT_APPLICANT_SQL, [(
                     entry['program'], entry['comments'], entry['date_added'],
                     entry['url'], entry['status'], entry['semester'], entry['applicant_type'],
                     entry['gpa'], entry['gre_total'], entry['gre_verbal'], entry['gre_aw'], entry['degree'],
-                    entry['llm-generated-program'], entry['llm-generated-university']
-                ))
-            conn.commit()
+                    entry['llm-generated-program'], entry['llm-generated-university'],
+                    *parse_decision(entry['status'], entry['date_added']),
+                    *parse_term(entry['semester']),
+                    result_id
+                ) for entry, result_id in zip(batch, result_ids)])
+                inserted += cur.rowcount
+                skipped += len(batch) - cur.rowcount
+                conn.commit()
+                newest_id = _newest_id(newest_id, result_ids)
+            _finish_crawl_cursor(conn, cur, newest_id)
     pool.close()
+    return _load_counts(inserted, skipped)
 
 def  add_applicant_data(data):
     """
@@ -191,12 +418,30 @@ def  add_applicant_data(data):
     
     :param data: Dictionary containing applicant data with 'rows' key
     :type data: dict
+    :return: Number of rows inserted and of rows skipped as already stored
+    :rtype: dict
     :raises psycopg.Error: When database connection or insertion fails
-    :raises KeyError: When required fields are missing from data entries
     
     .. note::
        This function expects the standard format with fields like:
-       'Term', 'US/International', 'gre', 'gre_v', 'Degree'
+       'Term', 'US/International', 'gre', 'gre_v', 'Degree'.
+       Each entry goes through :class:`applicant_record.ApplicantRecord`, so
+       scores from older files (strings, 0 for "not entered") are stored as
+       floats or NULL; missing fields are stored as NULL. Files written before
+       the decision and term columns existed get them derived from status,
+       date_added and Term.
+
+    .. note::
+       The result_id column is filled from each entry's url. Rows whose
+       result_id is already stored are skipped (ON CONFLICT DO NOTHING);
+       how many were skipped is printed and returned.
+       Older tables are migrated first by :func:`ensure_schema`.
+
+    .. note::
+       data['rows'] may be any iterable, such as :func:`iter_rows`; rows are
+       read, inserted and committed LOAD_BATCH_SIZE at a time. The crawl
+       cursor only advances after the final batch commits, so a failed load
+       never leaves the high-water mark above rows that were not stored.
        
     Required Fields in Each Entry:
         - program, comments, date_added, url, status
@@ -206,27 +451,169 @@ def  add_applicant_data(data):
     Example:
         >>> data = {"rows": [{"program": "CS", "Term": "Fall 2025", ...}]}
         >>> add_applicant_data(data)
+        Inserted 1 rows, skipped 0 already in the database
+        {'inserted': 1, 'skipped': 0}
     """
+    ensure_schema()
     DATABASE_URL = os.getenv('DATABASE_URL', "postgresql://postgres@localhost:5432/module_3_db")
     pool = psycopg_pool.ConnectionPool(DATABASE_URL)
 
+    newest_id = None
+    inserted = skipped = 0
     with pool.getconn() as conn:
         with conn.cursor() as cur:
-            for entry in data['rows']:
-                cur.execute("""
-                    INSERT INTO applicants(
-                        program, comments, date_added, url, status, term,
-                        us_or_international, gpa, gre, gre_v, gre_aw, degree,
-                        llm_generated_program, llm_generated_university
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-                    """, (
-                    entry['program'], entry['comments'], entry['date_added'],
-                    entry['url'], entry['status'], entry['Term'], entry['US/International'],
-                    entry['gpa'], entry['gre'], entry['gre_v'], entry['gre_aw'], entry['Degree'],
-                    entry['llm-generated-program'], entry['llm-generated-university']
-                ))
-            conn.commit()
+            for batch in _batches(data['rows'], LOAD_BATCH_SIZE):
+                result_ids = insert_applicant_rows(cur, batch)
+                inserted += cur.rowcount
+                skipped += len(batch) - cur.rowcount
+                conn.commit()
+                newest_id = _newest_id(newest_id, result_ids)
+            _finish_crawl_cursor(conn, cur, newest_id)
     pool.close()
+    return _load_counts(inserted, skipped)
+
+def insert_applicant_rows(cur, rows):
+    """
+    Insert one batch of standard-format rows on an open cursor.
+
+    This is the insert step of :func:`add_applicant_data` without the
+    connection handling, for callers that keep one connection open across
+    many batches (see :func:`pipeline.run`). The caller commits, runs
+    :func:`ensure_schema` first and advances the crawl cursor once its whole
+    load has been committed. Afterwards ``cur.rowcount`` is the number of
+    rows inserted; the rest were already stored.
+
+    :param cur: Open psycopg cursor
+    :type cur: psycopg.Cursor
+    :param rows: Entries in the standard format (see :func:`add_applicant_data`)
+    :type rows: list[dict]
+    :return: Result ID of each row, None where the url has none
+    :rtype: list[int or None]
+
+    Example:
+        >>> result_ids = insert_applicant_rows(cur, batch)
+        >>> conn.commit()
+    """
+    records = [ApplicantRecord.from_dict(entry) for entry in rows]
+    result_ids = [extract_result_id(record.url) for record in records]
+    cur.executemany(INSERT_APPLICANT_SQL, [
+        record.as_tuple() + (result_id,)
+        for record, result_id in zip(records, result_ids)
+    ])
+    return result_ids
+
+def add_result_id_column():
+    """
+    Add and backfill the indexed result_id column on an existing applicants table.
+
+    Tables created before result_id existed only store the GradCafe ID inside
+    the url text. This migration adds the column, fills it from the url for
+    the first row of each result ID, and builds the unique index used by
+    :func:`scrape.find_existing_ids` for index lookups.
+
+    :raises psycopg.Error: When database connection or SQL execution fails
+
+    .. note::
+       Safe to run more than once. Duplicate rows for the same result ID keep
+       a NULL result_id so the unique index can still be built.
+
+    Example:
+        >>> add_result_id_column()  # Also run by ensure_schema() before loading
+    """
+    DATABASE_URL = os.getenv('DATABASE_URL', "postgresql://postgres@localhost:5432/module_3_db")
+    pool = psycopg_pool.ConnectionPool(DATABASE_URL)
+
+    try:
+        with pool.getconn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("ALTER TABLE applicants ADD COLUMN IF NOT EXISTS result_id INTEGER;")
+                cur.execute("""
+                    UPDATE applicants a
+                    SET result_id = first_rows.result_id
+                    FROM (
+                        SELECT DISTINCT ON (result_id) p_id, result_id
+                        FROM (
+                            SELECT p_id,
+                                CAST(SUBSTRING(url FROM '/result/([0-9]+)') AS INTEGER) AS result_id
+                            FROM applicants
+                            WHERE url LIKE '%/result/%'
+                        ) parsed
+                        WHERE result_id NOT IN (
+                            SELECT result_id FROM applicants WHERE result_id IS NOT NULL
+                        )
+                        ORDER BY result_id, p_id
+                    ) first_rows
+                    WHERE a.p_id = first_rows.p_id
+                    AND a.result_id IS NULL;
+                """)
+                cur.execute("""
+                    CREATE UNIQUE INDEX IF NOT EXISTS applicants_result_id_idx
+                        ON applicants (result_id);
+                """)
+                conn.commit()
+    finally:
+        pool.close()
+
+def add_structured_columns():
+    """
+    Add and backfill the decision and term columns on an existing applicants table.
+
+    Tables created before these columns existed only hold the free-text
+    status and term. This migration adds the typed columns, derives their
+    values from status, date_added and term with the same functions the
+    cleaner uses, and builds the indexes the dashboard queries rely on.
+
+    :raises psycopg.Error: When database connection or SQL execution fails
+
+    .. note::
+       Safe to run more than once. Rows that existed before the migration get
+       a NULL structured_parsed flag; they are read LOAD_BATCH_SIZE at a time,
+       filled with one set-based UPDATE per chunk and flagged, so no row is
+       read twice, even when its term gives no year. New rows default to
+       true. Values already stored are kept. A status that names no decision
+       becomes 'other', so for old rows decision is NULL exactly when status is.
+
+    Example:
+        >>> add_structured_columns()  # Also run by ensure_schema() before loading
+    """
+    DATABASE_URL = os.getenv('DATABASE_URL', "postgresql://postgres@localhost:5432/module_3_db")
+    pool = psycopg_pool.ConnectionPool(DATABASE_URL)
+
+    try:
+        with pool.getconn() as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    ALTER TABLE applicants
+                        ADD COLUMN IF NOT EXISTS decision TEXT CHECK (decision IN
+                            ('accepted', 'rejected', 'interview', 'wait_listed', 'other')),
+                        ADD COLUMN IF NOT EXISTS decision_date DATE,
+                        ADD COLUMN IF NOT EXISTS term_season TEXT
+                            CHECK (term_season IN ('Spring', 'Summer', 'Fall', 'Winter')),
+                        ADD COLUMN IF NOT EXISTS term_year SMALLINT,
+                        ADD COLUMN IF NOT EXISTS structured_parsed BOOLEAN;
+                    ALTER TABLE applicants ALTER COLUMN structured_parsed SET DEFAULT true;
+                """)
+                conn.commit()
+                while True:
+                    cur.execute("""
+                        SELECT p_id, status, date_added, term FROM applicants
+                        WHERE structured_parsed IS NULL
+                        ORDER BY p_id
+                        LIMIT %s;
+                    """, (LOAD_BATCH_SIZE,))
+                    rows = cur.fetchall()
+                    if not rows:
+                        break
+                    parsed = [
+                        (p_id, *parse_decision(status, date_added), *parse_term(term))
+                        for p_id, status, date_added, term in rows
+                    ]
+                    cur.execute(STRUCTURED_BACKFILL_SQL, [list(column) for column in zip(*parsed)])
+                    conn.commit()
+                cur.execute(STRUCTURED_INDEX_DDL)
+                conn.commit()
+    finally:
+        pool.close()
 
 def drop_table():
     """
@@ -259,7 +646,9 @@ def drop_table():
     finally:
         pool.close()
 
-# if __name__ == "__main__":
+if __name__ == "__main__":  # pragma: no cover
+    # Migrate an existing database; create_app() and the loaders also do this
+    ensure_schema()
 #     data = load_data('jhu_software_concepts/module_3/llm_extend_applicant_data_master_copy.json')
     # drop_table()
     # create_applicant_table()
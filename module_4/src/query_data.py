@@ -15,17 +15,21 @@ of the graduate admissions dataset.
 
 .. warning::
    All queries execute immediately upon module import. Ensure database
-   connectivity before importing this module.
+   connectivity before importing this module. An older applicants table must
+   be migrated first (:func:`load_data.ensure_schema`), which ``python
+   load_data.py``, the loaders and the Flask app's startup all do.
 
 Database Requirements:
     The applicants table must contain the following fields:
     - term: Application term (e.g., 'Fall 2025')
+    - term_season, term_year: Term split into indexed columns ('Fall', 2025)
     - us_or_international: Applicant type ('American', 'International', 'Other')
     - gpa: Grade Point Average (numeric, typically 0-5 scale)
     - gre: GRE total score (numeric, typically 260-340 scale)
     - gre_v: GRE Verbal score (numeric, typically 130-170 scale)
     - gre_aw: GRE Analytical Writing score (numeric, typically 0-6 scale)
     - status: Application status (contains 'Accepted', 'Rejected', etc.)
+    - decision: Decision derived from the status ('accepted', 'rejected', ...)
     - degree: Degree type ('Masters', 'PhD', etc.)
     - llm_generated_university: University name (processed by LLM)
 
@@ -73,7 +77,7 @@ with conn.cursor() as cur:
     exist for the Fall 2025 application cycle.
     
     SQL Logic:
-        - Filters applicants table for exact term match 'Fall 2025'
+        - Filters on the indexed term_season and term_year columns
         - Returns single count value
         
     Expected Output: Single integer representing total Fall 2025 applications
@@ -81,7 +85,7 @@ with conn.cursor() as cur:
     cur.execute("""
         SELECT COUNT (*) 
                 FROM applicants
-                WHERE TERM = 'Fall 2025';""")
+                WHERE term_season = 'Fall' AND term_year = 2025;""")
     print("How many entries do you have in your database who have applied for Fall 2025?\n", cur.fetchall(),"\n\n")
 
     # Query 2: Percentage of international students
@@ -188,7 +192,7 @@ with conn.cursor() as cur:
                 FROM applicants
                 WHERE us_or_international = 'American'
                 AND
-                term = 'Fall 2025'
+                term_season = 'Fall' AND term_year = 2025
                 AND
                 gpa <= 5;
                 """)
@@ -202,21 +206,20 @@ with conn.cursor() as cur:
     acceptances, providing a key admissions metric for the application cycle.
     
     SQL Logic:
-        - Uses CASE WHEN with ILIKE for flexible status matching
-        - Counts acceptances and divides by total Fall 2025 applications
+        - Counts rows whose decision is 'accepted'
+        - Divides by total Fall 2025 applications
         - Multiplies by 100 for percentage and rounds to 2 decimals
-        - ILIKE '%Accepted%' catches variations in status text
         
     Expected Output: Percentage of Fall 2025 applicants who were accepted
     """
     cur.execute("""
                 SELECT
                     ROUND(
-                        (COUNT(CASE WHEN status ILIKE '%Accepted%' THEN 1 END) * 100.00) / COUNT(*),
+                        (COUNT(CASE WHEN decision = 'accepted' THEN 1 END) * 100.00) / COUNT(*),
                         2
                     ) AS acceptance_percentage
                 FROM applicants
-                WHERE term = 'Fall 2025';
+                WHERE term_season = 'Fall' AND term_year = 2025;
                 """)
     print("What percent of entries for Fall 2025 are Acceptances (to two decimal places)?\n", cur.fetchall(),"\n\n")
 
@@ -229,8 +232,7 @@ with conn.cursor() as cur:
     to understand competitive GPA ranges.
     
     SQL Logic:
-        - Filters for Fall 2025 term and accepted status
-        - Uses ILIKE for flexible status matching
+        - Filters for Fall 2025 term and accepted decision
         - Validates GPA values (<=5 for reasonable bounds)
         - Rounds result to 2 decimal places
         
@@ -243,9 +245,9 @@ with conn.cursor() as cur:
                         2
                     ) AS average_gpa
                 FROM applicants
-                WHERE term = 'Fall 2025'
+                WHERE term_season = 'Fall' AND term_year = 2025
                 AND
-                status ILIKE '%accepted%'
+                decision = 'accepted'
                 AND gpa <= 5;
                 """)
     print("What is the average GPA of applicants who applied for Fall 2025 who are Acceptances?\n", cur.fetchall(),"\n\n")
@@ -283,9 +285,9 @@ with conn.cursor() as cur:
     successful PhD applications to Georgetown for recent application cycles.
     
     SQL Logic:
-        - Uses ILIKE with wildcards for flexible matching on all text fields
-        - Combines university, degree, status, and term filters
-        - Flexible matching allows for variations in data entry
+        - Uses ILIKE with wildcards for flexible university name matching
+        - Combines university, degree, decision, and term year filters
+        - Decision and term year are structured columns, so no text matching
         
     Expected Output: Count of Georgetown PhD acceptances in 2025
     """    
@@ -297,9 +299,9 @@ with conn.cursor() as cur:
                 AND
                 degree = 'PhD'
                 AND
-                status ILIKE '%accept%'
+                decision = 'accepted'
                 AND
-                term ILIKE '%2025%';                
+                term_year = 2025;
                 """)
     print("How many entries from 2025 are acceptances from applicants who applied to Georgetown University for a PhD?\n", cur.fetchall(), "\n\n")
 
@@ -319,7 +321,7 @@ with conn.cursor() as cur:
         - Orders by rate difference to show universities favoring international students
         
     Data Quality Filters:
-        - Excludes records with NULL university, applicant type, or status
+        - Excludes records with NULL university, applicant type, or decision
         - Requires minimum 5 applications per university/type combination
         - Only includes universities with both US and International applicants
         
@@ -331,15 +333,15 @@ with conn.cursor() as cur:
                     llm_generated_university,
                     us_or_international,
                     COUNT(*) as total_applications,
-                    COUNT(CASE WHEN status ILIKE '%accepted%' THEN 1 END) as acceptances,
+                    COUNT(CASE WHEN decision = 'accepted' THEN 1 END) as acceptances,
                     ROUND(
-                        (COUNT(CASE WHEN status ILIKE '%accepted%' THEN 1 END) * 100.0) / COUNT(*), 
+                        (COUNT(CASE WHEN decision = 'accepted' THEN 1 END) * 100.0) / COUNT(*),
                         2
                     ) AS acceptance_rate
                 FROM applicants 
                 WHERE llm_generated_university IS NOT NULL 
                 AND us_or_international IS NOT NULL
-                AND status IS NOT NULL
+                AND decision IS NOT NULL
                 GROUP BY llm_generated_university, us_or_international
                 HAVING COUNT(*) >= 5  -- Only universities with sufficient data
                  )
@@ -366,13 +368,13 @@ with conn.cursor() as cur:
     
     SQL Logic:
         - Groups applicants by degree type and admission outcome
-        - Uses CASE statement to categorize status into Accepted/Rejected/Other
+        - Uses CASE on the decision column to label rows Accepted/Rejected/Other
         - Calculates average GPA and count for each group
         - Filters for valid GPA values and complete records
         - Orders by degree and admission status for easy comparison
         
     Data Validation:
-        - Excludes NULL GPA, status, and degree values
+        - Excludes NULL GPA, decision, and degree values
         - Filters GPA <= 5 for reasonable bounds
         - Includes count for statistical significance assessment
         
@@ -382,8 +384,8 @@ with conn.cursor() as cur:
                 SELECT 
                 degree,
                 CASE 
-                    WHEN status ILIKE '%accepted%' THEN 'Accepted'
-                    WHEN status ILIKE '%rejected%' THEN 'Rejected'
+                    WHEN decision = 'accepted' THEN 'Accepted'
+                    WHEN decision = 'rejected' THEN 'Rejected'
                     ELSE 'Other'
                 END as admission_status,
                 COUNT(*) as count,
@@ -391,13 +393,13 @@ with conn.cursor() as cur:
             FROM applicants 
             WHERE gpa IS NOT NULL 
             AND gpa <= 5
-            AND status IS NOT NULL
+            AND decision IS NOT NULL
             AND degree IS NOT NULL
             GROUP BY 
                 degree,
                 CASE 
-                    WHEN status ILIKE '%accepted%' THEN 'Accepted'
-                    WHEN status ILIKE '%rejected%' THEN 'Rejected'
+                    WHEN decision = 'accepted' THEN 'Accepted'
+                    WHEN decision = 'rejected' THEN 'Rejected'
                     ELSE 'Other'
                 END
             ORDER BY degree, admission_status;        
@@ -0,0 +1,268 @@
+"""
+Module for crawling the full GradCafe survey history in resumable shards.
+
+The original module_2 scraper walked ``range(0, 9058)`` in one process and
+kept every page in memory until the end, so a crash near the last page lost
+the whole run. This backfill splits the page range into contiguous shards,
+crawls the shards in parallel worker processes, and appends each page to a
+per-shard :class:`raw_archive.RawArchive` the moment it arrives.
+
+The archive index doubles as the checkpoint: a page is done once its index
+line is on disk. Re-running the command with the same output directory skips
+every page that is already archived and only fetches the rest.
+
+A page that still fails after the client's retries is recorded in the
+shard's failure log and skipped, so one bad page does not stop the run. It
+is not archived, so the next run fetches it again.
+
+Output Directory Layout:
+    - manifest.json: page range and shard count, fixed on the first run
+    - shard-0000.gz, shard-0000.gz.idx, ...: raw page archive per shard
+    - shard-0000.failed.jsonl, ...: pages that failed in the shard's last run
+
+.. note::
+   The shard layout is read back from manifest.json on resume, so a resumed
+   run always assigns pages to the same shard files. Passing a different
+   range or shard count for an existing directory is an error.
+
+.. warning::
+   A full backfill issues thousands of requests. Keep the worker count
+   modest. Each worker spaces its requests by the robots.txt crawl delay
+   times the number of workers, so together they honor the delay.
+
+Example Usage:
+    $ python backfill.py --out-dir backfill --shards 16 --workers 4
+    Shard 3: 567 pages to fetch (0 already done)
+    ...
+    Backfill complete: 9058 of 9058 pages archived (0 failed)
+
+    >>> import backfill
+    >>> for entry in backfill.iter_archived_pages('backfill'):
+    ...     rows = clean.clean_html(entry['html'])
+
+.. seealso::
+   :mod:`raw_archive` for the on-disk page format
+   :mod:`clean` for parsing the archived pages
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import time
+
+import http_client
+import raw_archive
+
+BASE_URL = os.getenv('GRADCAFE_BASE_URL', 'https://www.thegradcafe.com')
+SURVEY_URL = BASE_URL + "/survey/?page={}"
+
+# Page range of the module_2 full-history scrape (end is exclusive)
+DEFAULT_START_PAGE = 0
+DEFAULT_END_PAGE = 9058
+
+DEFAULT_OUT_DIR = 'jhu_software_concepts/module_3/web_scraper/backfill'
+
+
+def shard_ranges(start, end, shards):
+    """
+    Split the page range [start, end) into contiguous, nearly equal shards.
+
+    :param start: First page number
+    :type start: int
+    :param end: One past the last page number
+    :type end: int
+    :param shards: Number of shards
+    :type shards: int
+    :return: List of (shard_number, first_page, end_page) tuples
+    :rtype: list[tuple[int, int, int]]
+
+    Example:
+        >>> shard_ranges(0, 10, 3)
+        [(0, 0, 4), (1, 4, 7), (2, 7, 10)]
+    """
+    total = max(0, end - start)
+    shards = max(1, min(shards, total or 1))
+    size, extra = divmod(total, shards)
+    ranges = []
+    first = start
+    for shard in range(shards):
+        last = first + size + (1 if shard < extra else 0)
+        ranges.append((shard, first, last))
+        first = last
+    return ranges
+
+
+def shard_path(out_dir, shard):
+    """Return the archive path used for one shard."""
+    return os.path.join(out_dir, f"shard-{shard:04d}.gz")
+
+
+def failure_path(out_dir, shard):
+    """Return the path of the failure log written for one shard."""
+    return os.path.join(out_dir, f"shard-{shard:04d}.failed.jsonl")
+
+
+def load_manifest(out_dir, start, end, shards):
+    """
+    Create the backfill manifest, or check an existing one matches the request.
+
+    :param out_dir: Backfill output directory
+    :type out_dir: str
+    :param start: First page number
+    :type start: int
+    :param end: One past the last page number
+    :type end: int
+    :param shards: Number of shards
+    :type shards: int
+    :return: The manifest contents
+    :rtype: dict
+    :raises ValueError: When an existing manifest uses a different layout
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, 'manifest.json')
+    manifest = {"start": start, "end": end, "shards": shards}
+
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            existing = json.load(f)
+        if existing != manifest:
+            raise ValueError(
+                f"{out_dir} was started with {existing}; resume with the same "
+                "--start, --end and --shards or use a new --out-dir"
+            )
+        return existing
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def crawl_shard(task):
+    """
+    Fetch every page of one shard that is not yet archived.
+
+    Runs inside a worker process. Each page is appended and fsynced to the
+    shard's archive before the next request, so the archive index always
+    reflects the pages that are safely on disk. Requests are paced by
+    :meth:`http_client.ResilientClient.pace`, with the crawl delay scaled
+    by the number of worker processes.
+
+    A page that still fails after retries is written to the shard's failure
+    log and skipped. When the circuit breaker is open, the worker waits for
+    its cool-down before the next page instead of failing every page at once.
+
+    :param task: Tuple of (out_dir, shard_number, first_page, end_page, workers)
+    :type task: tuple[str, int, int, int, int]
+    :return: Tuple of (shard_number, pages_fetched, pages_already_done, pages_failed)
+    :rtype: tuple[int, int, int, int]
+    """
+    out_dir, shard, first, end, workers = task
+    archive = raw_archive.RawArchive(shard_path(out_dir, shard))
+    todo = [page for page in range(first, end) if page not in archive]
+    print(f"Shard {shard}: {len(todo)} pages to fetch ({(end - first) - len(todo)} already done)")
+
+    http = http_client.ResilientClient()
+    http.pace(BASE_URL, processes=workers, initial=1, max_limit=1)
+    failed = 0
+    with open(failure_path(out_dir, shard), 'w', encoding='utf-8') as failures:
+        for page in todo:
+            try:
+                response = http.request('GET', SURVEY_URL.format(page))
+            except Exception as e:
+                print(f"Shard {shard}: page {page} failed: {e}")
+                failures.write(json.dumps({"page": page, "error": str(e)}) + "\n")
+                failures.flush()
+                failed += 1
+                if isinstance(e, http_client.CircuitOpenError):
+                    time.sleep(http.breaker.reset_timeout)
+                continue
+            archive.append(page, response.data, fsync=True)
+    print(f"Shard {shard}: HTTP stats {http.stats_snapshot()}")
+
+    return shard, len(todo) - failed, (end - first) - len(todo), failed
+
+
+def run(out_dir=DEFAULT_OUT_DIR, start=DEFAULT_START_PAGE, end=DEFAULT_END_PAGE,
+        shards=16, workers=4):
+    """
+    Run (or resume) a sharded backfill over the page range [start, end).
+
+    :param out_dir: Directory for the manifest and shard archives
+    :type out_dir: str, optional
+    :param start: First page number
+    :type start: int, optional
+    :param end: One past the last page number
+    :type end: int, optional
+    :param shards: Number of shards the range is split into
+    :type shards: int, optional
+    :param workers: Number of worker processes
+    :type workers: int, optional
+    :return: Number of pages archived across all shards
+    :rtype: int
+    :raises ValueError: When out_dir holds a backfill with a different layout
+
+    .. note::
+       Workers are started with the 'spawn' method, like the clean and
+       crawl-queue pools, so no parent state (locks, sockets) is inherited.
+
+    Example:
+        >>> run('backfill', start=0, end=100, shards=4, workers=2)
+        100
+    """
+    load_manifest(out_dir, start, end, shards)
+    workers = max(1, workers)
+    tasks = [(out_dir, shard, first, last, workers) for shard, first, last in shard_ranges(start, end, shards)]
+
+    failed_total = 0
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes=workers) as pool:
+        for shard, fetched, done, failed in pool.imap_unordered(crawl_shard, tasks):
+            print(f"Shard {shard}: finished ({fetched} fetched, {done} resumed, {failed} failed)")
+            failed_total += failed
+
+    archived = sum(len(raw_archive.RawArchive(shard_path(out_dir, shard))) for shard, _, _ in
+                   shard_ranges(start, end, shards))
+    print(f"Backfill complete: {archived} of {end - start} pages archived ({failed_total} failed)")
+    if failed_total:
+        print(f"Failed pages are listed in {out_dir}/shard-*.failed.jsonl; run again to retry them")
+    return archived
+
+
+def iter_archived_pages(out_dir=DEFAULT_OUT_DIR):
+    """
+    Yield every archived page of a backfill in page order.
+
+    Shards are contiguous page ranges, so reading the shards in order gives
+    pages in order while only one page is decompressed at a time.
+
+    :param out_dir: Backfill output directory
+    :type out_dir: str, optional
+    :return: Iterator of dictionaries with 'page' and 'html' keys
+    :rtype: iterator[dict]
+    :raises FileNotFoundError: When out_dir has no manifest
+    """
+    with open(os.path.join(out_dir, 'manifest.json'), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    for shard, _, _ in shard_ranges(manifest['start'], manifest['end'], manifest['shards']):
+        yield from raw_archive.RawArchive(shard_path(out_dir, shard))
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser(
+        description="Resumable, sharded backfill of the full GradCafe survey history.",
+    )
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR,
+                        help="Directory for the manifest and shard archives.")
+    parser.add_argument("--start", type=int, default=DEFAULT_START_PAGE,
+                        help="First page number.")
+    parser.add_argument("--end", type=int, default=DEFAULT_END_PAGE,
+                        help="One past the last page number.")
+    parser.add_argument("--shards", type=int, default=16,
+                        help="Number of shards the page range is split into.")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Number of worker processes.")
+    args = parser.parse_args()
+
+    run(out_dir=args.out_dir, start=args.start, end=args.end,
+        shards=args.shards, workers=args.workers)
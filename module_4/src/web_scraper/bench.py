@@ -0,0 +1,293 @@
+"""
+Benchmarks for the scraping and cleaning hot paths.
+
+Each subcommand runs against pages that were already saved to disk, so the
+numbers are repeatable without network access. Pages are read with
+:func:`clean.load_pages`, which prefers the raw page archive and falls back
+to the legacy raw JSON file.
+
+Subcommands:
+    - extract: compare the result-ID extractor backends in :mod:`scrape`
+    - clean: compare the :func:`clean.clean_html` engines (rows/sec) and
+      check they return identical rows
+    - scrape: run the scraper's fetch/parse loop against a local
+      :mod:`replay_server` and report pages/sec and page latency percentiles
+
+Example Usage:
+    $ python bench.py extract --archive update_raw_applicant_pages.gz --repeat 5
+    Loaded 120 pages
+    bs4    120 pages x 5 in  6.412s      93.6 pages/sec
+    lxml   120 pages x 5 in  0.731s     820.8 pages/sec
+    Backends agree on all 120 pages
+
+    $ python bench.py clean --archive update_raw_applicant_pages.gz
+    Loaded 120 pages
+    bs4    2400 rows x 3 in 15.204s     473.6 rows/sec
+    lxml   2400 rows x 3 in  2.817s    2555.9 rows/sec
+    Engines agree on all 120 pages
+
+    $ python bench.py scrape --latency 80 --jitter 40 --error-rate 0.02
+    Loaded 120 pages
+    serial       125 pages in 13.911s     9.0 pages/sec  p50  104.2ms  p99  198.7ms
+    concurrent   132 pages in  2.104s    62.7 pages/sec  p50  118.5ms  p99  709.3ms
+    ...
+
+.. note::
+   The scrape benchmark treats every result as new (``existing_ids`` is an
+   empty set) so no database is needed, and it does not write the page
+   archive. Each variant gets a fresh HTTP client and a fresh server.
+
+.. seealso::
+   :mod:`scrape` for the extractor backends and fetch loops
+   :mod:`replay_server` for the injected latency and errors
+"""
+
+import argparse
+import time
+
+import clean
+import http_client
+import replay_server
+import scrape
+
+# Fetch loops compared by the scrape benchmark
+SCRAPE_VARIANTS = ("serial", "concurrent", "adaptive", "gallop")
+
+
+def load_corpus(archive_path=clean.RAW_ARCHIVE_PATH, json_path=clean.RAW_JSON_PATH, limit=None):
+    """
+    Load saved pages into memory so file I/O is excluded from the timings.
+
+    :param archive_path: Raw page archive to read
+    :type archive_path: str, optional
+    :param json_path: Legacy raw JSON file used when the archive is missing
+    :type json_path: str, optional
+    :param limit: Maximum number of pages to load
+    :type limit: int, optional
+    :return: Raw page contents in page order
+    :rtype: list[bytes or str]
+    """
+    pages = []
+    for entry in clean.load_pages(archive_path, json_path):
+        pages.append(entry['html'])
+        if limit and len(pages) >= limit:
+            break
+    print(f"Loaded {len(pages)} pages")
+    return pages
+
+
+def _time(func, pages, repeat):
+    """Run func over every page ``repeat`` times; return (seconds, last results)."""
+    results = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        results = [func(page) for page in pages]
+    return time.perf_counter() - started, results
+
+
+def bench_extract(pages, repeat=3, backends=None):
+    """
+    Time each result-ID extractor backend and check they return the same IDs.
+
+    :param pages: Raw page contents
+    :type pages: list[bytes or str]
+    :param repeat: Passes over the corpus per backend
+    :type repeat: int, optional
+    :param backends: Backend names to compare, defaults to all of scrape.EXTRACTORS
+    :type backends: list[str], optional
+    :return: Pages per second for each backend
+    :rtype: dict[str, float]
+    """
+    backends = backends or sorted(scrape.EXTRACTORS)
+    rates = {}
+    outputs = {}
+    for backend in backends:
+        elapsed, outputs[backend] = _time(
+            lambda page: scrape.extract_result_ids(page, backend=backend), pages, repeat
+        )
+        rates[backend] = len(pages) * repeat / elapsed if elapsed else float('inf')
+        print(f"{backend:<6} {len(pages)} pages x {repeat} in {elapsed:6.3f}s  {rates[backend]:8.1f} pages/sec")
+
+    reference = outputs[backends[0]]
+    mismatches = [
+        index for backend in backends[1:]
+        for index, ids in enumerate(outputs[backend]) if ids != reference[index]
+    ]
+    if mismatches:
+        print(f"Backends disagree on {len(set(mismatches))} pages")
+    else:
+        print(f"Backends agree on all {len(pages)} pages")
+    return rates
+
+
+def bench_clean(pages, repeat=3, engines=None):
+    """
+    Time each clean_html engine and check they return identical rows.
+
+    :param pages: Raw page contents
+    :type pages: list[bytes or str]
+    :param repeat: Passes over the corpus per engine
+    :type repeat: int, optional
+    :param engines: Engine names to compare, defaults to all of clean.ENGINES
+    :type engines: list[str], optional
+    :return: Rows per second for each engine
+    :rtype: dict[str, float]
+    """
+    engines = engines or sorted(clean.ENGINES)
+    rates = {}
+    outputs = {}
+    for engine in engines:
+        elapsed, outputs[engine] = _time(
+            lambda page: clean.clean_html(page, engine=engine), pages, repeat
+        )
+        rows = sum(len(page_rows) for page_rows in outputs[engine])
+        rates[engine] = rows * repeat / elapsed if elapsed else float('inf')
+        print(f"{engine:<6} {rows} rows x {repeat} in {elapsed:6.3f}s  {rates[engine]:8.1f} rows/sec")
+
+    reference = outputs[engines[0]]
+    mismatches = {
+        index for engine in engines[1:]
+        for index, rows in enumerate(outputs[engine]) if rows != reference[index]
+    }
+    if mismatches:
+        print(f"Engines disagree on {len(mismatches)} pages")
+    else:
+        print(f"Engines agree on all {len(pages)} pages")
+    return rates
+
+
+def _percentile(values, percent):
+    """Return the nearest-rank percentile of a list of numbers."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))  # ceil without floats
+    return ordered[int(rank) - 1]
+
+
+def _run_variant(variant, concurrency):
+    """Run one fetch loop with existing_ids=set() and return its pages."""
+    if variant == "serial":
+        return scrape.fetch_pages(existing_ids=set(), concurrency=1, adaptive=False)
+    if variant == "concurrent":
+        return scrape.fetch_pages(existing_ids=set(), concurrency=concurrency, adaptive=False)
+    if variant == "adaptive":
+        return scrape.fetch_pages(existing_ids=set(), concurrency=concurrency, adaptive=True)
+    if variant == "gallop":
+        return scrape.fetch_pages_gallop(existing_ids=set(), concurrency=concurrency)
+    raise ValueError(f"Unknown scrape variant {variant!r}; expected one of {SCRAPE_VARIANTS}")
+
+
+def bench_scrape(pages, variants=SCRAPE_VARIANTS, concurrency=scrape.SCRAPE_CONCURRENCY,
+                 latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0):
+    """
+    Time the scraper's fetch/parse loops against a local replay server.
+
+    Page latency is measured around each :func:`scrape.new_results` call, so
+    it covers the request (with retries) and the result-ID extraction.
+
+    :param pages: Mapping of page number to recorded page bytes
+    :type pages: dict[int, bytes]
+    :param variants: Fetch loops to run, from SCRAPE_VARIANTS
+    :type variants: iterable[str], optional
+    :param concurrency: Pages in flight (starting limit for 'adaptive')
+    :type concurrency: int, optional
+    :param latency: Seconds the server adds to every response
+    :type latency: float, optional
+    :param jitter: Maximum extra random seconds per response
+    :type jitter: float, optional
+    :param error_rate: Fraction of requests the server answers with 503
+    :type error_rate: float, optional
+    :param throttle_rate: Fraction of requests the server answers with 429
+    :type throttle_rate: float, optional
+    :return: Per-variant pages, seconds, pages/sec and p50/p99 latency (seconds)
+    :rtype: dict[str, dict]
+    """
+    original = (scrape.BASE_URL, scrape.http, scrape.new_results)
+    results = {}
+    try:
+        for variant in variants:
+            server, scrape.BASE_URL = replay_server.start(
+                pages, latency=latency, jitter=jitter, error_rate=error_rate, throttle_rate=throttle_rate
+            )
+            scrape.http = http_client.ResilientClient(maxsize=scrape.SCRAPE_MAX_CONCURRENCY)
+            latencies = []
+
+            def timed(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return original[2](*args, **kwargs)
+                finally:
+                    latencies.append(time.perf_counter() - started)
+
+            scrape.new_results = timed
+            try:
+                started = time.perf_counter()
+                _run_variant(variant, concurrency)
+                elapsed = time.perf_counter() - started
+            finally:
+                server.shutdown()
+                server.server_close()
+
+            results[variant] = {
+                "pages": len(latencies),
+                "seconds": elapsed,
+                "pages_per_sec": len(latencies) / elapsed if elapsed else float('inf'),
+                "p50": _percentile(latencies, 50),
+                "p99": _percentile(latencies, 99),
+            }
+            r = results[variant]
+            print(f"{variant:<11} {r['pages']:4d} pages in {elapsed:6.3f}s  {r['pages_per_sec']:7.1f} pages/sec"
+                  f"  p50 {r['p50'] * 1000:7.1f}ms  p99 {r['p99'] * 1000:7.1f}ms"
+                  f"  {scrape.http.stats_snapshot()}")
+    finally:
+        scrape.BASE_URL, scrape.http, scrape.new_results = original
+    return results
+
+
+def main(argv=None):
+    """Parse command line arguments and run the selected benchmark."""
+    parser = argparse.ArgumentParser(description="Benchmark scraper and cleaner hot paths.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    extract = subparsers.add_parser("extract", help="Compare result-ID extractor backends.")
+    extract.add_argument("--archive", default=clean.RAW_ARCHIVE_PATH, help="Raw page archive to read.")
+    extract.add_argument("--json", default=clean.RAW_JSON_PATH, help="Legacy raw JSON fallback.")
+    extract.add_argument("--limit", type=int, default=None, help="Maximum pages to load.")
+    extract.add_argument("--repeat", type=int, default=3, help="Passes over the corpus.")
+
+    clean_cmd = subparsers.add_parser("clean", help="Compare clean_html engines (rows/sec).")
+    clean_cmd.add_argument("--archive", default=clean.RAW_ARCHIVE_PATH, help="Raw page archive to read.")
+    clean_cmd.add_argument("--json", default=clean.RAW_JSON_PATH, help="Legacy raw JSON fallback.")
+    clean_cmd.add_argument("--limit", type=int, default=None, help="Maximum pages to load.")
+    clean_cmd.add_argument("--repeat", type=int, default=3, help="Passes over the corpus.")
+
+    scrape_cmd = subparsers.add_parser("scrape", help="Scrape a local replay server; report pages/sec and p99.")
+    scrape_cmd.add_argument("--archive", default=clean.RAW_ARCHIVE_PATH,
+                            help="Raw page archive or backfill directory to replay.")
+    scrape_cmd.add_argument("--json", default=clean.RAW_JSON_PATH, help="Legacy raw JSON fallback.")
+    scrape_cmd.add_argument("--variants", nargs="+", default=list(SCRAPE_VARIANTS), choices=SCRAPE_VARIANTS,
+                            help="Fetch loops to compare.")
+    scrape_cmd.add_argument("--concurrency", type=int, default=scrape.SCRAPE_CONCURRENCY,
+                            help="Pages in flight (starting limit for adaptive).")
+    scrape_cmd.add_argument("--latency", type=float, default=50, help="Milliseconds added to every response.")
+    scrape_cmd.add_argument("--jitter", type=float, default=25, help="Maximum extra random milliseconds.")
+    scrape_cmd.add_argument("--error-rate", type=float, default=0, help="Fraction of requests answered with 503.")
+    scrape_cmd.add_argument("--throttle-rate", type=float, default=0, help="Fraction of requests answered with 429.")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "extract":
+        bench_extract(load_corpus(args.archive, args.json, args.limit), repeat=args.repeat)
+    elif args.command == "clean":
+        bench_clean(load_corpus(args.archive, args.json, args.limit), repeat=args.repeat)
+    elif args.command == "scrape":
+        pages = replay_server.load_pages(args.archive, args.json)
+        print(f"Loaded {len(pages)} pages")
+        bench_scrape(pages, variants=args.variants, concurrency=args.concurrency,
+                     latency=args.latency / 1000, jitter=args.jitter / 1000,
+                     error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -7,9 +7,10 @@ The module handles complex HTML parsing, data extraction, and integration with
 external LLM services for data standardization and enhancement.
 
 The cleaning process involves multiple stages:
-1. Loading raw HTML data from JSON files
+1. Loading raw HTML pages from the compressed page archive (or legacy JSON files)
 2. Parsing HTML to extract applicant fields (university, program, scores, etc.)
 3. Structuring data into standardized dictionaries
+   (optionally filling empty fields from each entry's detail page)
 4. Processing through LLM for data enhancement and standardization
 5. Outputting clean, structured JSON files for analysis
 
@@ -23,14 +24,20 @@ The cleaning process involves multiple stages:
 
 Dependencies:
     - BeautifulSoup4: For HTML parsing and data extraction
-    - json: For data serialization and file I/O
-    - subprocess: For LLM CLI integration
+    - importlib: For loading the LLM standardizer (llm_hosting/app.py) in-process
     - re: For regex-based field extraction
     - os: For file path management
-
-Output Files:
-    - update_applicant_data.json: Initially cleaned data
-    - update_llm_extend_applicant_data.json: LLM-enhanced data
+    - raw_archive: For reading the compressed raw page archive
+    - enrich: For optional detail page enrichment
+    - page_cache: For skipping pages whose HTML was cleaned on an earlier run
+    - json_stream: For reading legacy raw JSON files one page at a time and
+      writing the compact JSON Lines passed to the LLM step
+    - applicant_record: For converting and validating scores once, at parse time
+    - concurrent.futures: For cleaning pages in parallel worker processes
+
+Output Files (compact JSON Lines):
+    - update_applicant_data.jsonl: Initially cleaned data
+    - update_llm_extend_applicant_data.jsonl: LLM-enhanced data
 
 Example Usage:
     >>> import clean
@@ -45,36 +52,84 @@ Example Usage:
 import time
 from bs4 import BeautifulSoup
 import re
-import json
-import subprocess
+import importlib.util
 import os
+import threading
+import itertools
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import raw_archive
+import enrich
+import page_cache
+import json_stream
+import applicant_record
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:  # lxml is listed in requirements.txt, but keep bs4 working without it
+    lxml = None
+
+# Raw page archive written by scrape.main(), and the legacy JSON it replaced
+RAW_ARCHIVE_PATH = 'jhu_software_concepts/module_3/web_scraper/update_raw_applicant_pages.gz'
+RAW_JSON_PATH = 'jhu_software_concepts/module_3/web_scraper/update_raw_applicant_data.json'
+
+RESULT_ID_RE = re.compile(r'/result/(\d+)')
+
+# clean_html engine: 'bs4' (reference) or 'lxml' (same output, faster)
+CLEAN_ENGINE = os.getenv('CLEAN_ENGINE', 'bs4')
+
+# Fetch /result/{id} detail pages to fill fields missing from the listing
+ENRICH_DETAILS = os.getenv('ENRICH_DETAILS') == '1'
+
+# Version of the rows clean_html() produces; bump it whenever the output of
+# the parser changes so rows cached by page_cache are parsed again
+PARSER_VERSION = 3
+
+# Directory of the LLM standardizer module (app.py) used by llm_standardize_stream()
+LLM_DIR = os.getenv('LLM_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'llm_hosting'))
+
+# Standardizer modules loaded by load_standardizer(), by app.py path
+_STANDARDIZERS = {}
+_STANDARDIZERS_LOCK = threading.Lock()
+
+# Worker processes used by clean_pages(); 1 cleans in the calling process
+CLEAN_WORKERS = int(os.getenv('CLEAN_WORKERS', str(os.cpu_count() or 1)))
+
+# Pages sent to a worker per task
+CLEAN_CHUNK_SIZE = int(os.getenv('CLEAN_CHUNK_SIZE', '16'))
+
+# Inputs with fewer pages are cleaned serially; starting workers would cost more
+CLEAN_PARALLEL_MIN_PAGES = int(os.getenv('CLEAN_PARALLEL_MIN_PAGES', '64'))
 
 
-def save_data(data, filename='applicant_data.json'):
+def save_data(data, filename='applicant_data.jsonl'):
     """
-    Save a list of dictionaries to a JSON file with proper formatting.
+    Save applicant rows to a compact JSON Lines file.
     
-    This function serializes applicant data to JSON format with indentation
-    for human readability. It handles the file creation and ensures proper
-    encoding for international characters.
+    Rows are written one per line with no indentation (see
+    :func:`json_stream.write_file`), the intermediate format read by the LLM
+    step and by :func:`load_data.load_data`.
     
-    :param data: List of cleaned applicant data dictionaries
-    :type data: list[dict]
-    :param filename: Output file path for JSON data
+    :param data: Cleaned applicant data dictionaries; may be a generator
+    :type data: iterable[dict]
+    :param filename: Output file path
     :type filename: str, optional
+    :return: Number of rows written
+    :rtype: int
     :raises IOError: When file cannot be written
     :raises TypeError: When data cannot be JSON serialized
     
     .. note::
-       Uses indent=2 for readable JSON formatting. File is created with
-       default system encoding.
+       The file is written as UTF-8 and replaced only once every row is written.
        
     Example:
         >>> applicant_data = [{"program": "CS", "gpa": 3.8}]
-        >>> save_data(applicant_data, "cleaned_data.json")
+        >>> save_data(applicant_data, "cleaned_data.jsonl")
+        1
     """
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=2)
+    return json_stream.write_file(filename, data)
 
 
 def load_data(filename):
@@ -94,18 +149,48 @@ def load_data(filename):
     
     .. note::
        Expected JSON structure: List of dictionaries with 'html' keys
-       containing raw HTML content from scraped pages.
+       containing raw HTML content from scraped pages. JSONL files are
+       accepted too. Use :func:`json_stream.iter_file` (as :func:`load_pages`
+       does) to avoid holding every page in memory.
        
     Example:
         >>> raw_data = load_data("raw_applicant_data.json")
         >>> print(len(raw_data))
         250
     """
-    with open(filename, 'r') as f:
-        return json.load(f)
+    return list(json_stream.iter_file(filename))
 
 
-def clean_html(html):
+def load_pages(archive_path=RAW_ARCHIVE_PATH, json_path=RAW_JSON_PATH):
+    """
+    Iterate over scraped pages, preferring the compressed page archive.
+
+    Pages are yielded one at a time straight from the archive, so only the
+    page currently being cleaned is held in memory. When no archive exists,
+    the legacy raw JSON file is streamed instead, also one page at a time.
+
+    :param archive_path: Path to the raw page archive written by the scraper
+    :type archive_path: str, optional
+    :param json_path: Path to a legacy raw JSON file used as a fallback
+    :type json_path: str, optional
+    :return: Iterator of dictionaries with 'page' and 'html' keys
+    :rtype: iterator[dict]
+    :raises FileNotFoundError: When neither file exists
+
+    Example:
+        >>> for entry in load_pages():
+        ...     print(entry['page'])
+        1
+        2
+    """
+    if os.path.exists(archive_path):
+        return iter(raw_archive.RawArchive(archive_path))
+    if not os.path.exists(json_path):
+        raise FileNotFoundError(json_path)
+    return json_stream.iter_file(json_path)
+
+
+def clean_html(html, known_ids=None, engine=None):
     """
     Parse a single HTML page and extract applicant data from table rows.
     
@@ -114,10 +199,19 @@ def clean_html(html):
     for field extraction, handling the complex nested structure of the survey
     result tables.
     
-    :param html: Raw HTML content of a survey page
-    :type html: str
+    :param html: Raw HTML content of a survey page, or a page already parsed
+        with BeautifulSoup (as handed over by the scraper in fused mode)
+    :type html: str or bytes or bs4.BeautifulSoup
+    :param known_ids: Result IDs already in the database, as a set or a
+        membership callable; rows for these IDs are skipped before any field
+        extraction
+    :type known_ids: set[int] or callable, optional
+    :param engine: 'bs4' (BeautifulSoup, the reference) or 'lxml' (faster,
+        identical output); defaults to the CLEAN_ENGINE environment variable
+    :type engine: str, optional
     :return: List of extracted applicant data dictionaries
     :rtype: list[dict]
+    :raises ValueError: When the engine name is unknown
     
     .. note::
        The function processes table rows in pairs, as The GradCafe displays
@@ -130,6 +224,9 @@ def clean_html(html):
         - date_added: Date when entry was added to The GradCafe
         - url: Direct URL to the applicant's detailed entry
         - status: Application status (Accepted/Rejected with date)
+        - decision, decision_date: Decision read from the status cell
+          (accepted/rejected/interview/wait_listed/other) and its ISO date
+        - term_season, term_year: Term split into season and year
         - Term: Application semester (Fall/Spring/Summer + year)
         - US/International: Applicant nationality category
         - gre: GRE Quantitative score
@@ -138,6 +235,9 @@ def clean_html(html):
         - Degree: Degree type (Masters/PhD/etc.)
         - gpa: Grade Point Average
         
+        Scores are floats, converted once by :class:`applicant_record.ApplicantRecord`;
+        a score that is missing, 0 or outside its plausible range is None.
+
     HTML Structure Assumptions:
         - Data is contained in <tr> elements within tables
         - University name in first <td> with specific CSS class
@@ -149,6 +249,8 @@ def clean_html(html):
         - Returns None for missing or unparseable fields
         - Continues processing even if individual fields fail
         - Skips rows with insufficient data (<5 td elements)
+        - Skips rows whose /result/ ID is in known_ids, together with their
+          detail rows, without running the field regexes
         
     Example:
         >>> html_content = "<table><tr><td>...</td></tr></table>"
@@ -156,7 +258,24 @@ def clean_html(html):
         >>> print(applicants[0]['program'])
         "Computer Science, Stanford University"
     """
-    soup = BeautifulSoup(html, "html.parser")
+    engine = engine or CLEAN_ENGINE
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown clean engine {engine!r}; expected one of {sorted(ENGINES)}")
+    if engine == 'lxml' and (lxml is None or isinstance(html, BeautifulSoup)):
+        engine = 'bs4'  # A fused scraper hands over its BeautifulSoup tree; reuse it
+
+    if known_ids is None:
+        is_known = None
+    elif callable(known_ids):
+        is_known = known_ids
+    else:
+        is_known = known_ids.__contains__
+
+    return ENGINES[engine](html, is_known)
+
+def _clean_html_bs4(html, is_known):
+    """BeautifulSoup engine for :func:`clean_html` (the reference implementation)."""
+    soup = html if isinstance(html, BeautifulSoup) else BeautifulSoup(html, "html.parser")
     rows = soup.find_all('tr') # Find all table rows 
     extracted_data = []
 
@@ -167,6 +286,17 @@ def clean_html(html):
         if not tds or len(tds) < 5: # Ensure there are enough TDs to extract data
             i += 1
             continue
+
+        # Extract Applicant URL first, so rows we already have cost one lookup
+        link_tag = tds[4].find('a', href=lambda x: x and "/result/" in x)
+        if link_tag:
+            applicant_url = "https://www.thegradcafe.com" + link_tag['href']
+            result_id = RESULT_ID_RE.search(link_tag['href'])
+            if is_known is not None and result_id and is_known(int(result_id.group(1))):
+                i += 2 # Skip the known row and its detail row
+                continue
+        else:
+            applicant_url = None
         
         # Extract University name using BeautifulSoup string methods
         university = tds[0].find("div", class_="tw-font-medium tw-text-gray-900 tw-text-sm")
@@ -184,18 +314,12 @@ def clean_html(html):
         degree_span = program_div.find('span', class_='tw-text-gray-500') if program_div else None 
         degree = degree_span.get_text(strip=True) if degree_span else None #Return None if degree not found
 
-        # Extract Applicant URL
-        link_tag = tds[4].find('a', href=lambda x: x and "/result/" in x)
-        if link_tag:
-            applicant_url = "https://www.thegradcafe.com" + link_tag['href']
-        else:
-            applicant_url = None
-
         # Extract Applicant Status using regex
         status_match = re.search(
             r'<div[^>]*>\s*((Accepted|Rejected)\s+on\s+[A-Za-z0-9 ,]+)\s*</div>', str(tds[3])
         )
         applicant_status = status_match.group(1) if status_match else None #Return None if status not found
+        decision, decision_date = applicant_record.parse_decision(tds[3].get_text(" "), added_on)
 
         semester = nationality = gre = gre_v = gre_aw = gpa = comment = None #Initialize optional fields to None
 
@@ -205,7 +329,7 @@ def clean_html(html):
             next_tds = next_tr.find_all('td')
             if next_tds:
                 tds_html = str(next_tds)
-                
+
                 # Extract Semester using regex
                 semester_match = re.search(r'(Spring|Summer|Fall|Winter)\s+\d{4}', tds_html)
                 semester = semester_match.group(0) if semester_match else None #Return None if semester not found
@@ -216,7 +340,7 @@ def clean_html(html):
 
                 # Extract GRE scores using regex
                 gre_match = re.search(r'<div[^>]*>\s*GRE (\d+)\s*</div>', tds_html)
-                gre = gre_match.group(1) if gre_match else None #Return None if gre not found   
+                gre = gre_match.group(1) if gre_match else None #Return None if gre not found
 
                 # Extract GRE V score using regex
                 gre_v_match = re.search(r'<div[^>]*>\s*GRE V (\d+)\s*</div>', tds_html)
@@ -225,7 +349,7 @@ def clean_html(html):
                 # Extract GRE AW score using regex
                 gre_aw_match = re.search(r'<div[^>]*>\s*GRE AW ([\d.]+)\s*</div>', tds_html)
                 gre_aw = gre_aw_match.group(1) if gre_aw_match else None #Return None if gre_aw not found
-                
+
                 # Extract GPA using regex
                 gpa_match = re.search(r'<div[^>]*>\s*GPA ([\d.]+)\s*</div>', tds_html)
                 gpa = gpa_match.group(1) if gpa_match else None #Return None if gpa not found
@@ -247,55 +371,424 @@ def clean_html(html):
         else:
             combined_program = None
 
-        entry = {
-            "program": combined_program,
-            "comments": comment,
-            "date_added": added_on,
-            "url": applicant_url,
-            "status": applicant_status,
-            "Term": semester,
-            "US/International": nationality,
-            "gre": gre,
-            "gre_v": gre_v,
-            "Degree": degree,
-            "gpa": gpa,
-            "gre_aw": gre_aw
-        }
-        extracted_data.append(entry)
+        entry = applicant_record.ApplicantRecord(
+            program=combined_program,
+            comments=comment,
+            date_added=added_on,
+            url=applicant_url,
+            status=applicant_status,
+            term=semester,
+            us_or_international=nationality,
+            gre=gre,
+            gre_v=gre_v,
+            degree=degree,
+            gpa=gpa,
+            gre_aw=gre_aw,
+            decision=decision,
+            decision_date=decision_date,
+        )
+        extracted_data.append(entry.to_dict())
         i += 2 #Skip the next row since it's already processed
     return extracted_data
 
+# Patterns of _clean_html_bs4 applied to one element's text instead of to
+# serialized HTML; a regex match on '<div ...>TEXT</div>' is a fullmatch on
+# the text of a div that has no child nodes
+_STATUS_TEXT_RE = re.compile(r'\s*((Accepted|Rejected)\s+on\s+[A-Za-z0-9 ,]+)\s*')
+_SEMESTER_RE = re.compile(r'(Spring|Summer|Fall|Winter)\s+\d{4}')
+_NATIONALITY_TEXT_RE = re.compile(r'\s*(International|American)\s*')
+_GRE_TEXT_RE = re.compile(r'\s*GRE (\d+)\s*')
+_GRE_V_TEXT_RE = re.compile(r'\s*GRE V (\d+)\s*')
+_GRE_AW_TEXT_RE = re.compile(r'\s*GRE AW ([\d.]+)\s*')
+_GPA_TEXT_RE = re.compile(r'\s*GPA ([\d.]+)\s*')
+_COMMENT_CLASSES = ['tw-text-gray-500', 'tw-text-sm', 'tw-my-0']
+
+# Attributes BeautifulSoup splits on whitespace and re-joins with one space
+_MULTI_VALUED_ATTRS = {'class', 'rel', 'rev', 'accept-charset', 'headers', 'accesskey', 'dropzone'}
+
+if lxml is not None:
+    _xp_university = etree.XPath(
+        './/div[normalize-space(@class)="tw-font-medium tw-text-gray-900 tw-text-sm"][1]'
+    )
+    _xp_program_div = etree.XPath(
+        './/div[contains(concat(" ", normalize-space(@class), " "), " tw-text-gray-900 ")][1]'
+    )
+    _xp_degree_span = etree.XPath(
+        './/span[contains(concat(" ", normalize-space(@class), " "), " tw-text-gray-500 ")][1]'
+    )
+    _xp_first_span = etree.XPath('.//span[1]')
+    _xp_result_link = etree.XPath('.//a[contains(@href, "/result/")][1]')
+    _xp_text = etree.XPath('.//text()')
+
+def _escape(text):
+    """Escape text the way BeautifulSoup serializes it (minimal formatter)."""
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+def _lxml_text(el):
+    """Equivalent of BeautifulSoup's get_text(strip=True)."""
+    return ''.join(s.strip() for s in _xp_text(el))
+
+def _leaf_text(el):
+    """Escaped text of an element with no child nodes, else None."""
+    if len(el) or not el.text:
+        return None
+    return _escape(el.text)
+
+def _first_leaf_match(cells, pattern, group=1):
+    """First div (document order) whose whole text matches pattern, like the bs4 regexes."""
+    for cell in cells:
+        for div in cell.iter('div'):
+            text = _leaf_text(div)
+            if text is not None:
+                match = pattern.fullmatch(text)
+                if match:
+                    return match.group(group)
+    return None
+
+def _markup_strings(el, top=True):
+    """Attribute values and text (incl. comments) of el in serialized order."""
+    if isinstance(el.tag, str):
+        for name, value in el.attrib.items():
+            yield ' '.join(value.split()) if name in _MULTI_VALUED_ATTRS else value
+    if el.text:
+        yield el.text
+    for child in el:
+        yield from _markup_strings(child, top=False)
+    if not top and el.tail:
+        yield el.tail
+
+def _first_search(cells, pattern):
+    """First pattern match anywhere in the cells' markup, like re.search on str(cells)."""
+    for cell in cells:
+        for text in _markup_strings(cell):
+            match = pattern.search(text)
+            if match:
+                return match.group(0)
+    return None
+
+def _lxml_comment(tr):
+    """Comment paragraph text, matching _clean_html_bs4's comment regex."""
+    for p in tr.iter('p'):
+        if list(p.attrib) != ['class'] or p.attrib['class'].split() != _COMMENT_CLASSES:
+            continue
+        text = _leaf_text(p)
+        if text is not None:
+            return text.strip()
+    return None
+
+def _clean_html_lxml(html, is_known):
+    """
+    lxml engine for :func:`clean_html`.
+
+    Walks the same rows and cells as :func:`_clean_html_bs4` but reads text
+    and attributes straight from the lxml tree instead of re-serializing
+    cells to run regexes over their HTML. Every field rule is the structural
+    equivalent of the bs4 engine's ``find`` call or regex, so both engines
+    return identical rows (see tests/test_clean_engines.py).
+    """
+    if isinstance(html, bytes):
+        try:
+            html = html.decode('utf-8')
+        except UnicodeDecodeError:
+            html = BeautifulSoup(html, "html.parser").decode()
+    if not html.strip():
+        return []
+
+    root = lxml.html.document_fromstring(html)
+    rows = list(root.iter('tr'))
+    extracted_data = []
+
+    i = 0
+    while i < len(rows):
+        tds = list(rows[i].iterdescendants('td'))
+        if len(tds) < 5:
+            i += 1
+            continue
+
+        links = _xp_result_link(tds[4])
+        if links:
+            href = links[0].get('href')
+            applicant_url = "https://www.thegradcafe.com" + href
+            result_id = RESULT_ID_RE.search(href)
+            if is_known is not None and result_id and is_known(int(result_id.group(1))):
+                i += 2
+                continue
+        else:
+            applicant_url = None
+
+        university = _xp_university(tds[0])
+        university_text = _lxml_text(university[0]) if university else None
+
+        program_div = _xp_program_div(tds[1])
+        program_span = _xp_first_span(tds[1])
+        program_name = _lxml_text(program_span[0]) if program_span else None
+
+        added_on = _lxml_text(tds[2])
+
+        degree_span = _xp_degree_span(program_div[0]) if program_div else None
+        degree = _lxml_text(degree_span[0]) if degree_span else None
+
+        applicant_status = _first_leaf_match([tds[3]], _STATUS_TEXT_RE)
+        decision, decision_date = applicant_record.parse_decision(' '.join(_xp_text(tds[3])), added_on)
+
+        semester = nationality = gre = gre_v = gre_aw = gpa = comment = None
+
+        if i + 1 < len(rows):
+            next_tds = list(rows[i + 1].iterdescendants('td'))
+            if next_tds:
+                semester = _first_search(next_tds, _SEMESTER_RE)
+                nationality = _first_leaf_match(next_tds, _NATIONALITY_TEXT_RE)
+                gre = _first_leaf_match(next_tds, _GRE_TEXT_RE)
+                gre_v = _first_leaf_match(next_tds, _GRE_V_TEXT_RE)
+                gre_aw = _first_leaf_match(next_tds, _GRE_AW_TEXT_RE)
+                gpa = _first_leaf_match(next_tds, _GPA_TEXT_RE)
+                comment = _lxml_comment(rows[i + 2]) if i + 2 < len(rows) else None
+
+        if program_name and university_text:
+            combined_program = f"{program_name}, {university_text}"
+        else:
+            combined_program = program_name or university_text or None
+
+        extracted_data.append(applicant_record.ApplicantRecord(
+            program=combined_program,
+            comments=comment,
+            date_added=added_on,
+            url=applicant_url,
+            status=applicant_status,
+            term=semester,
+            us_or_international=nationality,
+            gre=gre,
+            gre_v=gre_v,
+            degree=degree,
+            gpa=gpa,
+            gre_aw=gre_aw,
+            decision=decision,
+            decision_date=decision_date,
+        ).to_dict())
+        i += 2
+    return extracted_data
+
+ENGINES = {
+    'bs4': _clean_html_bs4,
+    'lxml': _clean_html_lxml,
+}
+
+# Set in each worker process by _init_clean_worker()
+_worker_known_ids = None
+_worker_engine = None
+
+def _init_clean_worker(known_ids, engine):
+    global _worker_known_ids, _worker_engine
+    _worker_known_ids = known_ids
+    _worker_engine = engine
+
+def _clean_chunk(pages):
+    """Clean a chunk of pages inside a worker process; one row list per page."""
+    return [clean_html(html, known_ids=_worker_known_ids, engine=_worker_engine) for html in pages]
+
+def _iter_page_rows(pages, known_ids, engine, workers, chunk_size, min_pages):
+    """Yield the rows of each page in page order, from worker processes for large inputs."""
+    pages = iter(pages)
+    head = list(itertools.islice(pages, min_pages))
+
+    if workers <= 1 or len(head) < min_pages:
+        for html in itertools.chain(head, pages):
+            yield clean_html(html, known_ids=known_ids, engine=engine)
+        return
+
+    chunks = iter(lambda: list(itertools.islice(pages, chunk_size)), [])
+    head_chunks = [head[i:i + chunk_size] for i in range(0, len(head), chunk_size)]
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_clean_worker,
+                             initargs=(known_ids, engine or CLEAN_ENGINE)) as executor:
+        in_flight = deque()
+        for chunk in itertools.chain(head_chunks, chunks):
+            in_flight.append(executor.submit(_clean_chunk, chunk))
+            if len(in_flight) >= 2 * workers:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+def _drop_known(rows, known_ids):
+    """Leave out rows whose result ID is known, as clean_html(known_ids=...) does."""
+    if known_ids is None:
+        return rows
+    is_known = known_ids if callable(known_ids) else known_ids.__contains__
+    kept = []
+    for row in rows:
+        match = RESULT_ID_RE.search(row['url'] or '')
+        if not (match and is_known(int(match.group(1)))):
+            kept.append(row)
+    return kept
+
+def _iter_cached_page_rows(pages, known_ids, cache, clean_misses):
+    """
+    Yield the rows of each page in page order, parsing only pages missing from cache.
+
+    clean_misses gets an iterable of the missed pages and must yield their
+    rows (unfiltered) in the same order; it may read ahead of its output.
+    """
+    pending = deque()  # (key, cached rows or None) for every page read so far
+
+    def misses():
+        for html in pages:
+            key = cache.key(html)
+            rows = cache.get(key)
+            pending.append((key, rows))
+            if rows is None:
+                yield html
+
+    for fresh in clean_misses(misses()):
+        while pending[0][1] is not None:
+            yield _drop_known(pending.popleft()[1], known_ids)
+        cache.put(pending.popleft()[0], fresh)
+        yield _drop_known(fresh, known_ids)
+    while pending:
+        yield _drop_known(pending.popleft()[1], known_ids)
+
+def clean_pages(pages, known_ids=None, engine=None, workers=CLEAN_WORKERS,
+                chunk_size=CLEAN_CHUNK_SIZE, min_pages=CLEAN_PARALLEL_MIN_PAGES, cache=None):
+    """
+    Run :func:`clean_html` over many pages, spread across worker processes.
+
+    Pages are sent to a process pool in chunks of chunk_size. Results are
+    collected in submission order, so the rows come out in page order exactly
+    as a serial loop would return them. At most two chunks per worker are in
+    flight, so a streamed archive is never held in memory all at once.
+
+    With a cache, pages whose content was cleaned before are not parsed
+    again; only the missed pages go to the workers (and count towards
+    min_pages), and their rows are stored for the next run.
+
+    :param pages: Raw HTML of each page, in page order
+    :type pages: iterable[str or bytes]
+    :param known_ids: Result IDs to leave out (see :func:`clean_html`)
+    :type known_ids: set[int] or callable, optional
+    :param engine: Parser engine, defaults to CLEAN_ENGINE
+    :type engine: str, optional
+    :param workers: Worker processes; 1 cleans serially in this process
+    :type workers: int, optional
+    :param chunk_size: Pages per worker task
+    :type chunk_size: int, optional
+    :param min_pages: Fewer pages than this are cleaned serially
+    :type min_pages: int, optional
+    :param cache: Rows of previously cleaned pages (see :mod:`page_cache`)
+    :type cache: page_cache.PageCache, optional
+    :return: Applicant rows of all pages, in page order
+    :rtype: list[dict]
+
+    .. note::
+       Workers are started with the 'spawn' method (the caller may be running
+       scraper or web threads), so known_ids must be picklable: a set, or a
+       module-level function rather than a lambda.
+
+    Example:
+        >>> rows = clean_pages(entry['html'] for entry in load_pages())
+        >>> len(rows)
+        181160
+    """
+    if cache is None:
+        page_rows = _iter_page_rows(pages, known_ids, engine, workers, chunk_size, min_pages)
+    else:
+        # Misses are parsed without known_ids, so the cached rows suit any later run
+        def clean_misses(missed):
+            return _iter_page_rows(missed, None, engine, workers, chunk_size, min_pages)
+        page_rows = _iter_cached_page_rows(pages, known_ids, cache, clean_misses)
+    return [row for rows in page_rows for row in rows]
+
+def load_standardizer(llm_dir=None):
+    """
+    Import the LLM standardizer (``llm_hosting/app.py``) into this process once.
+
+    The module is kept for the life of the process, and it keeps its model
+    loaded after the first row, so later rescrapes in the same process (the
+    web app, the pipeline) skip interpreter startup, the Flask/huggingface
+    imports and the GGUF model load.
+
+    :param llm_dir: Directory containing the LLM app.py, defaults to LLM_DIR
+        (the llm_hosting directory next to this module)
+    :type llm_dir: str, optional
+    :return: The standardizer module, with ``standardize_rows(rows)``
+    :rtype: module
+    :raises FileNotFoundError: When llm_dir has no app.py
+
+    Example:
+        >>> standardizer = load_standardizer()
+        >>> next(standardizer.standardize_rows([{"program": "CS, MIT"}]))['llm-generated-university']
+        'Massachusetts Institute of Technology'
+    """
+    path = os.path.join(os.path.abspath(llm_dir or LLM_DIR), 'app.py')
+    with _STANDARDIZERS_LOCK:
+        module = _STANDARDIZERS.get(path)
+        if module is None:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"LLM standardizer not found: {path}")
+            spec = importlib.util.spec_from_file_location(
+                f"llm_standardizer_{len(_STANDARDIZERS)}", path
+            )
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            _STANDARDIZERS[path] = module
+    return module
+
+def llm_standardize_stream(rows, llm_dir=None, stats=None):
+    """
+    Stream applicant rows through the in-process LLM standardizer.
+
+    Rows are pulled from ``rows`` one at a time and yielded as soon as each is
+    standardized, so a caller can keep producing rows (for example from pages
+    that are still downloading) while earlier rows are already being
+    standardized. The model is loaded once per process (see
+    :func:`load_standardizer`) and reused by every later stream.
+
+    :param rows: Iterable of cleaned applicant dictionaries; may be a generator
+    :type rows: iterable[dict]
+    :param llm_dir: Directory containing the LLM app.py, defaults to LLM_DIR
+    :type llm_dir: str, optional
+    :param stats: Dictionary with 'hits' and 'misses' keys, incremented for
+        each row answered from (or missing in) the LLM result cache
+    :type stats: dict, optional
+    :return: Iterator of rows with 'llm-generated-program' and
+        'llm-generated-university' added, in input order
+    :rtype: iterator[dict]
+
+    Example:
+        >>> for row in llm_standardize_stream(clean_html(html)):
+        ...     print(row['llm-generated-university'])
+        Stanford University
+    """
+    yield from load_standardizer(llm_dir).standardize_rows(rows, stats)
+
 def llm_clean_command():
     """
-    Process applicant data using LLM CLI mode to enhance and standardize the data.
+    Process applicant data using the in-process LLM standardizer.
     
-    This function integrates with an external LLM service to further clean and
-    enhance the initially parsed applicant data. It handles the subprocess
-    execution, data format conversion, and error handling for the LLM processing
-    pipeline.
+    This function integrates with the local LLM standardizer to further clean
+    and enhance the initially parsed applicant data. Rows are streamed from
+    the compact JSON Lines input through :func:`llm_standardize_stream` and
+    written to the output file one at a time, so neither file is held in
+    memory and the model stays loaded for the next rescrape.
     
     :return: True if LLM processing completed successfully, False otherwise
     :rtype: bool
-    :raises subprocess.TimeoutExpired: When LLM processing exceeds 600 seconds
-    :raises json.JSONDecodeError: When LLM output is not valid JSON
-    :raises FileNotFoundError: When LLM CLI application is not found
-    :raises IOError: When input/output files cannot be accessed
     
     .. note::
-       The function expects the LLM CLI application to be located at
-       'jhu_software_concepts/module_3/web_scraper/llm_hosting/app.py'
-       relative to the current working directory.
+       The LLM standardizer is ``llm_hosting/app.py`` next to this module
+       (override with env ``LLM_DIR``). File paths are relative to the
+       current working directory.
        
     Processing Pipeline:
         1. Sets up file paths for input and output
-        2. Constructs CLI command with appropriate parameters
-        3. Executes LLM processing
-        4. Handles both JSON and JSONL output formats
-        5. Saves enhanced data to output file
+        2. Streams rows through the resident model; program strings seen on
+           an earlier run are answered from the LLM result cache
+        3. Writes the output file, replacing it once every row is written
+        4. Reports result cache hits and misses
         
     Input/Output Files:
-        - Input: update_applicant_data.json (initially cleaned data)
-        - Output: update_llm_extend_applicant_data.json (LLM-enhanced data)
+        - Input: update_applicant_data.jsonl (initially cleaned data)
+        - Output: update_llm_extend_applicant_data.jsonl (LLM-enhanced data)
         
     LLM Enhancements:
         - University name standardization
@@ -305,76 +798,34 @@ def llm_clean_command():
         - Format standardization
         
     Error Handling:
-        - Captures and reports subprocess errors
-        - Handles JSON parsing failures gracefully
-        - Supports JSONL format as fallback
-        - Provides detailed error messages
+        - Reports any error while loading the model, reading or writing
+        - The previous output file is kept when processing fails
         
     Example:
         >>> success = llm_clean_command()
+        LLM cache: 1180 hits, 45 misses
         LLM processing completed successfully
         >>> print(success)
         True
     """
-    import subprocess
-    import os
-    import json
-    
     # Setup paths
     current_dir = os.getcwd()
-    llm_dir = os.path.join(current_dir, "jhu_software_concepts", "module_3", "web_scraper", "llm_hosting")
-    input_file = os.path.join(current_dir, "jhu_software_concepts", "module_3", "update_applicant_data.json")
-    output_file = os.path.join(current_dir, "jhu_software_concepts", "module_3", "update_llm_extend_applicant_data.json")
-    
-    # Build CLI command
-    cli_command = [
-        'python', 
-        'app.py', 
-        '--file', 
-        input_file,
-        '--stdout'
-    ]
+    input_file = os.path.join(current_dir, "jhu_software_concepts", "module_3", "update_applicant_data.jsonl")
+    output_file = os.path.join(current_dir, "jhu_software_concepts", "module_3", "update_llm_extend_applicant_data.jsonl")
     
+    stats = {"hits": 0, "misses": 0}
     try:
-        # Run the CLI command
-        result = subprocess.run(
-            cli_command,
-            cwd=llm_dir,
-            capture_output=True,
-            text=True,
-        )
-        
-        if result.returncode == 0:
-            # Parse and save output
-            try:
-                output_data = json.loads(result.stdout)
-            except json.JSONDecodeError:
-                # Handle JSONL format
-                lines = result.stdout.strip().split('\n')
-                records = []
-                for line in lines:
-                    if line.strip():
-                        try:
-                            records.append(json.loads(line))
-                        except json.JSONDecodeError:
-                            continue
-                output_data = {"rows": records}
-            
-            # Save to output file
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(output_data, f, indent=2)
-            
-            print("LLM processing completed successfully")
-            return True
-        else:
-            print(f"LLM processing failed: {result.stderr}")
-            return False
-            
+        rows = json_stream.iter_file(input_file)
+        json_stream.write_file(output_file, llm_standardize_stream(rows, stats=stats))
+        print(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses")
+        print("LLM processing completed successfully")
+        return True
     except Exception as e:
         print(f"LLM processing error: {e}")
         return False
 
-def main():
+def main(rows=None, enrich_details=ENRICH_DETAILS, known_ids=None, workers=CLEAN_WORKERS,
+         cache_path=page_cache.DEFAULT_CACHE_PATH):
     """
     Execute the complete data cleaning pipeline from raw HTML to LLM-enhanced data.
     
@@ -382,25 +833,43 @@ def main():
     process. It loads raw scraped data, processes it through HTML parsing,
     saves intermediate results, and then enhances the data through LLM processing.
     
+    :param rows: Applicant rows already extracted by the scraper in fused mode;
+        when given, the raw page archive is not read or parsed again
+    :type rows: list[dict], optional
+    :param enrich_details: Fill empty fields from each row's detail page
+        (see :func:`enrich.enrich_rows`)
+    :type enrich_details: bool, optional
+    :param known_ids: Result IDs to leave out when parsing the archive (see
+        :func:`clean_html`)
+    :type known_ids: set[int] or callable, optional
+    :param workers: Processes used to parse the archive (see :func:`clean_pages`)
+    :type workers: int, optional
+    :param cache_path: SQLite page cache used when parsing the archive (see
+        :mod:`page_cache`); empty to parse every page
+    :type cache_path: str, optional
     :raises FileNotFoundError: When input raw data file is not found
     :raises IOError: When intermediate or output files cannot be written
     :raises Exception: When HTML parsing or LLM processing fails
     
     .. note::
-       The function expects raw data to be available at
-       'jhu_software_concepts/module_3/web_scraper/update_raw_applicant_data.json'
+       The function reads the raw page archive at RAW_ARCHIVE_PATH, falling
+       back to the legacy JSON file at RAW_JSON_PATH if no archive exists.
        
     Processing Steps:
-        1. Load raw HTML data from JSON file
-        2. Process each HTML entry through clean_html() function
+        1. Stream raw HTML pages from the page archive (skipped when rows are given)
+        2. Process each HTML entry through clean_html(), in parallel worker
+           processes for large archives (see clean_pages()); pages cleaned on
+           an earlier run are read from the page cache instead
         3. Aggregate all extracted applicant data
-        4. Save initially cleaned data to update_applicant_data.json
+           (and fill empty fields from detail pages when enrich_details is set,
+           for result IDs not already in the database)
+        4. Save initially cleaned data to update_applicant_data.jsonl
         5. Process data through LLM for enhancement
-        6. Output final enhanced data to update_llm_extend_applicant_data.json
+        6. Output final enhanced data to update_llm_extend_applicant_data.jsonl
         
-    Output Files Created:
-        - update_applicant_data.json: Initially parsed and cleaned data
-        - update_llm_extend_applicant_data.json: LLM-enhanced final data
+    Output Files Created (compact JSON Lines, see :mod:`json_stream`):
+        - update_applicant_data.jsonl: Initially parsed and cleaned data
+        - update_llm_extend_applicant_data.jsonl: LLM-enhanced final data
         
     Data Flow:
         Raw HTML → HTML Parsing → Initial Cleaning → LLM Enhancement → Final Output
@@ -409,18 +878,34 @@ def main():
         >>> main()
         LLM processing completed successfully
         # Creates two output files with cleaned applicant data
-    """
-    scraped_data = load_data('jhu_software_concepts/module_3/web_scraper/update_raw_applicant_data.json')
-    application_data = []
 
-    for entry in scraped_data:
-        application = clean_html(entry['html'])
-        if application:
-                application_data.extend(application)
-
-    save_data(application_data, 'jhu_software_concepts/module_3/update_applicant_data.json')
+        >>> main(rows=scrape.main(fused=True))  # Single-parse rescrape
+    """
+    if rows is not None:
+        application_data = list(rows)
+    else:
+        cache = page_cache.PageCache(cache_path, version=PARSER_VERSION) if cache_path else None
+        try:
+            application_data = clean_pages((entry['html'] for entry in load_pages()),
+                                           known_ids=known_ids, workers=workers, cache=cache)
+        finally:
+            if cache is not None:
+                cache.close()
+                print(f"Page cache: {cache.stats['hits']} hits, {cache.stats['misses']} misses, "
+                      f"{cache.stats['evicted']} evicted")
+
+    if enrich_details:
+        enrich_known = None
+        if rows is None and known_ids is None:
+            # Archived pages also list rows stored by earlier runs; only new
+            # result IDs need their detail pages fetched
+            import scrape  # Imported here because scrape imports this module
+            enrich_known = scrape.find_existing_ids(set(enrich.result_ids(application_data)))
+        enrich.enrich_rows(application_data, known_ids=enrich_known)
+
+    save_data(application_data, 'jhu_software_concepts/module_3/update_applicant_data.jsonl')
     llm_clean_command()
 
 
-if __name__ == "__main__":
+if __name__ == "__main__":  # pragma: no cover
     main()
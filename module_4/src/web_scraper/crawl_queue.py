@@ -0,0 +1,440 @@
+"""
+Module for sharing a full re-crawl between processes and hosts through Postgres.
+
+:mod:`backfill` splits the page range across worker processes on one machine.
+This module puts the page range in a ``crawl_pages`` table instead, so any
+number of scraper processes, on any number of hosts, can work through it
+with nothing but the database in common:
+
+1. **Seed**: one row per survey page, status ``pending``.
+2. **Claim**: a worker takes the next few claimable pages in a single
+   ``UPDATE ... WHERE page IN (SELECT ... FOR UPDATE SKIP LOCKED)``. Rows
+   locked by another worker's claim are skipped, not waited on, so workers
+   never block each other or claim the same page.
+3. **Complete**: the fetched page is stored (gzip-compressed) in the row and
+   the page is marked ``done``.
+
+Every claim carries a lease. If a worker dies, its pages become claimable
+again once the lease expires. A worker that comes back after losing its
+lease cannot overwrite the new owner's result: completion only succeeds
+while the row is still claimed by that worker.
+
+Table crawl_pages:
+    - page: survey page number (primary key)
+    - status: 'pending', 'claimed', 'done' or 'failed'
+    - claimed_by: worker ID holding the claim
+    - lease_expires: when the claim may be taken over
+    - attempts: number of claims so far; pages fail after MAX_ATTEMPTS
+    - html: gzip-compressed page bytes once done
+    - error: last fetch error
+    - updated_at: last state change
+
+.. note::
+   Database access goes through :data:`scrape.db_pool` and requests through
+   :data:`scrape.http`, so timeouts, retries and the circuit breaker apply
+   here as well. Each worker paces itself with :func:`scrape.get_controller`,
+   spacing its requests by the robots.txt crawl delay times the number of
+   local worker processes; workers on other hosts are not counted. While the
+   circuit breaker is open, claimed pages are handed back without using up
+   an attempt. Local worker processes are started with the 'spawn' method
+   so each one opens its own connection pool.
+
+Example Usage:
+    $ python crawl_queue.py seed --start 0 --end 9058
+    Seeded 9058 pages
+    $ python crawl_queue.py work --workers 4        # on each host
+    $ python crawl_queue.py status
+    {'done': 9050, 'failed': 2, 'claimed': 6}
+    $ python crawl_queue.py requeue-failed     # give failed pages another try
+    Requeued 2 pages
+    $ python crawl_queue.py export --out raw_pages.gz
+
+.. seealso::
+   :mod:`backfill` for the single-machine sharded crawl
+   :mod:`raw_archive` for the archive written by export
+"""
+
+import argparse
+import gzip
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+
+import http_client
+import raw_archive
+import scrape
+
+# Seconds a claim is valid before another worker may take the page over
+LEASE_SECONDS = int(os.getenv('CRAWL_LEASE_SECONDS', '300'))
+
+# Pages claimed per round trip
+CLAIM_BATCH_SIZE = int(os.getenv('CRAWL_CLAIM_BATCH_SIZE', '10'))
+
+# Claims per page before it is marked failed
+MAX_ATTEMPTS = int(os.getenv('CRAWL_MAX_ATTEMPTS', '5'))
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS crawl_pages (
+        page INTEGER PRIMARY KEY,
+        status TEXT NOT NULL DEFAULT 'pending',
+        claimed_by TEXT,
+        lease_expires TIMESTAMPTZ,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        html BYTEA,
+        error TEXT,
+        updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    CREATE INDEX IF NOT EXISTS crawl_pages_claimable_idx
+        ON crawl_pages (status, lease_expires);
+"""
+
+CLAIM_SQL = """
+    UPDATE crawl_pages
+    SET status = 'claimed',
+        claimed_by = %(worker)s,
+        lease_expires = now() + make_interval(secs => %(lease)s),
+        attempts = attempts + 1,
+        updated_at = now()
+    WHERE page IN (
+        SELECT page
+        FROM crawl_pages
+        WHERE (status = 'pending' OR (status = 'claimed' AND lease_expires < now()))
+            AND attempts < %(max_attempts)s
+        ORDER BY page
+        LIMIT %(limit)s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING page
+"""
+
+
+def worker_id():
+    """Return a worker ID that is unique across hosts and processes."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def create_table(pool=None):
+    """
+    Create the crawl_pages table and its claim index if they do not exist.
+
+    :param pool: Connection pool, defaults to scrape.db_pool
+    :type pool: psycopg_pool.ConnectionPool, optional
+    """
+    with (pool or scrape.db_pool).connection() as conn:
+        conn.execute(CREATE_TABLE_SQL)
+
+
+def seed(start, end, pool=None):
+    """
+    Add one pending row per page in [start, end); existing rows are kept.
+
+    :param start: First page number
+    :type start: int
+    :param end: One past the last page number
+    :type end: int
+    :param pool: Connection pool, defaults to scrape.db_pool
+    :type pool: psycopg_pool.ConnectionPool, optional
+    :return: Number of pages added
+    :rtype: int
+    """
+    create_table(pool)
+    with (pool or scrape.db_pool).connection() as conn:
+        cur = conn.execute("""
+                INSERT INTO crawl_pages (page)
+                SELECT generate_series(%s, %s - 1)
+                ON CONFLICT (page) DO NOTHING
+                    """, (start, end))
+        return cur.rowcount
+
+
+def claim(worker, limit=CLAIM_BATCH_SIZE, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS,
+          pool=None):
+    """
+    Claim up to ``limit`` pending or lease-expired pages for a worker.
+
+    :param worker: ID of the claiming worker
+    :type worker: str
+    :param limit: Maximum number of pages to claim
+    :type limit: int, optional
+    :param lease_seconds: Seconds before the claim may be taken over
+    :type lease_seconds: int, optional
+    :param max_attempts: Pages claimed this many times are no longer handed out
+    :type max_attempts: int, optional
+    :param pool: Connection pool, defaults to scrape.db_pool
+    :type pool: psycopg_pool.ConnectionPool, optional
+    :return: Claimed page numbers in ascending order
+    :rtype: list[int]
+    """
+    with (pool or scrape.db_pool).connection() as conn:
+        cur = conn.execute(CLAIM_SQL, {
+            "worker": worker,
+            "lease": lease_seconds,
+            "max_attempts": max_attempts,
+            "limit": limit,
+        })
+        return sorted(row[0] for row in cur.fetchall())
+
+
+def complete(page, worker, html, pool=None):
+    """
+    Store a fetched page and mark it done, if the worker still holds the claim.
+
+    :param page: Survey page number
+    :type page: int
+    :param worker: ID of the worker that claimed the page
+    :type worker: str
+    :param html: Raw page bytes
+    :type html: bytes
+    :param pool: Connection pool, defaults to scrape.db_pool
+    :type pool: psycopg_pool.ConnectionPool, optional
+    :return: False when the lease was lost to another worker
+    :rtype: bool
+    """
+    with (pool or scrape.db_pool).connection() as conn:
+        cur = conn.execute("""
+                UPDATE crawl_pages
+                SET status = 'done', html = %s, error = NULL,
+                    lease_expires = NULL, updated_at = now()
+                WHERE page = %s AND claimed_by = %s AND status = 'claimed'
+                    """, (gzip.compress(html), page, worker))
+        return cur.rowcount == 1
+
+
+def fail(page, worker, error, max_attempts=MAX_ATTEMPTS, pool=None):
+    """
+    Release a page after a failed fetch; mark it failed once out of attempts.
+
+    :param page: Survey page number
+    :type page: int
+    :param worker: ID of the worker that claimed the page
+    :type worker: str
+    :param error: Error message to record
+    :type error: str
+    :param max_attempts: Attempts after which the page is marked failed
+    :type max_attempts: int, optional
+    :param pool: Connection pool, defaults to scrape.db_pool
+    :type pool: psycopg_pool.ConnectionPool, optional
+    """
+    with (pool or scrape.db_pool).connection() as conn:
+        conn.execute("""
+                UPDATE crawl_pages
+                SET status = CASE WHEN attempts >= %s THEN 'failed' ELSE 'pending' END,
+                    claimed_by = NULL, lease_expires = NULL, error = %s, updated_at = now()
+                WHERE page = %s AND claimed_by = %s AND status = 'claimed'
+                    """, (max_attempts, error, page, worker))
+
+
+def release(page, worker, pool=None):
+    """
+    Hand a claimed page back as pending without counting the attempt.
+
+    Used when the fetch never reached the site (the circuit breaker was
+    open), so the page should not move closer to being marked failed.
+
+    :param page: Survey page number
+    :type page: int
+    :param worker: ID of the worker that claimed the page
+    :type worker: str
+    :param pool: Connection pool, defaults to scrape.db_pool
+    :type pool: psycopg_pool.ConnectionPool, optional
+    """
+    with (pool or scrape.db_pool).connection() as conn:
+        conn.execute("""
+                UPDATE crawl_pages
+                SET status = 'pending', attempts = GREATEST(attempts - 1, 0),
+                    claimed_by = NULL, lease_expires = NULL, updated_at = now()
+                WHERE page = %s AND claimed_by = %s AND status = 'claimed'
+                    """, (page, worker))
+
+
+def requeue_failed(pool=None):
+    """
+    Give every failed page a fresh set of attempts.
+
+    :param pool: Connection pool, defaults to scrape.db_pool
+    :type pool: psycopg_pool.ConnectionPool, optional
+    :return: Number of pages set back to pending
+    :rtype: int
+    """
+    with (pool or scrape.db_pool).connection() as conn:
+        cur = conn.execute("""
+                UPDATE crawl_pages
+                SET status = 'pending', attempts = 0, claimed_by = NULL,
+                    lease_expires = NULL, updated_at = now()
+                WHERE status = 'failed'
+                    """)
+        return cur.rowcount
+
+
+def reap_expired(max_attempts=MAX_ATTEMPTS, pool=None):
+    """
+    Mark lease-expired pages that are out of attempts as failed.
+
+    Such pages can no longer be claimed, so without this they would stay
+    'claimed' and keep other workers waiting for them.
+
+    :param max_attempts: Attempts after which a page is given up on
+    :type max_attempts: int, optional
+    :param pool: Connection pool, defaults to scrape.db_pool
+    :type pool: psycopg_pool.ConnectionPool, optional
+    :return: Number of pages marked failed
+    :rtype: int
+    """
+    with (pool or scrape.db_pool).connection() as conn:
+        cur = conn.execute("""
+                UPDATE crawl_pages
+                SET status = 'failed', claimed_by = NULL, lease_expires = NULL,
+                    error = COALESCE(error, 'lease expired'), updated_at = now()
+                WHERE status = 'claimed' AND lease_expires < now() AND attempts >= %s
+                    """, (max_attempts,))
+        return cur.rowcount
+
+
+def progress(pool=None):
+    """
+    Count pages by status.
+
+    :param pool: Connection pool, defaults to scrape.db_pool
+    :type pool: psycopg_pool.ConnectionPool, optional
+    :return: Mapping of status to page count
+    :rtype: dict[str, int]
+    """
+    with (pool or scrape.db_pool).connection() as conn:
+        cur = conn.execute("SELECT status, COUNT(*) FROM crawl_pages GROUP BY status")
+        return dict(cur.fetchall())
+
+
+def run_worker(batch_size=CLAIM_BATCH_SIZE, lease_seconds=LEASE_SECONDS, idle_wait=5.0, processes=1):
+    """
+    Claim and fetch pages until none are pending or claimed by anyone.
+
+    While other workers still hold live claims, the worker waits and tries
+    again, so it can take over pages whose owner dies before finishing.
+
+    When the circuit breaker rejects a request, the worker hands back the
+    rest of its claimed pages without using up their attempts and sleeps for
+    the breaker's cool-down, so an outage does not mark pages failed.
+
+    :param batch_size: Pages claimed per round trip
+    :type batch_size: int, optional
+    :param lease_seconds: Lease length for each claim; keep it well above
+        batch_size times the slowest expected page fetch
+    :type lease_seconds: int, optional
+    :param idle_wait: Seconds to wait when nothing is claimable yet
+    :type idle_wait: float, optional
+    :param processes: Local worker processes sharing the robots.txt crawl delay
+    :type processes: int, optional
+    :return: Number of pages this worker completed
+    :rtype: int
+    """
+    scrape.get_controller(initial=1, adaptive=False, processes=processes)
+    worker = worker_id()
+    completed = 0
+    while True:
+        pages = claim(worker, batch_size, lease_seconds)
+        if not pages:
+            reap_expired()
+            remaining = progress()
+            if not remaining.get('pending') and not remaining.get('claimed'):
+                break
+            time.sleep(idle_wait)
+            continue
+
+        for index, page in enumerate(pages):
+            try:
+                response = scrape.http.request('GET', f"{scrape.BASE_URL}/survey/?page={page}")
+            except http_client.CircuitOpenError:
+                for unfetched in pages[index:]:
+                    release(unfetched, worker)
+                cooldown = scrape.http.breaker.reset_timeout
+                print(f"Worker {worker}: circuit open; waiting {cooldown}s before claiming again")
+                time.sleep(cooldown)
+                break
+            except Exception as e:
+                print(f"Worker {worker}: page {page} failed: {e}")
+                fail(page, worker, str(e))
+                continue
+            if complete(page, worker, response.data):
+                completed += 1
+            else:
+                print(f"Worker {worker}: lease on page {page} expired; result discarded")
+
+    print(f"Worker {worker}: completed {completed} pages")
+    return completed
+
+
+def run_workers(workers=4, batch_size=CLAIM_BATCH_SIZE, lease_seconds=LEASE_SECONDS):
+    """
+    Run several workers as local processes and return the pages they completed.
+
+    :param workers: Number of worker processes
+    :type workers: int, optional
+    :param batch_size: Pages claimed per round trip
+    :type batch_size: int, optional
+    :param lease_seconds: Lease length for each claim
+    :type lease_seconds: int, optional
+    :return: Total pages completed by these processes
+    :rtype: int
+    """
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(processes=max(1, workers)) as pool:
+        results = [pool.apply_async(run_worker, (batch_size, lease_seconds, 5.0, max(1, workers)))
+                   for _ in range(max(1, workers))]
+        return sum(result.get() for result in results)
+
+
+def export(out_path, pool=None):
+    """
+    Write every done page to a raw page archive, in page order.
+
+    :param out_path: Archive path (replaced if it exists)
+    :type out_path: str
+    :param pool: Connection pool, defaults to scrape.db_pool
+    :type pool: psycopg_pool.ConnectionPool, optional
+    :return: The written archive, readable by clean.load_pages
+    :rtype: raw_archive.RawArchive
+    """
+    archive = raw_archive.RawArchive.create(out_path)
+    with (pool or scrape.db_pool).connection() as conn:
+        # Server-side cursor: pages stream in instead of loading the whole crawl
+        with conn.cursor(name='crawl_pages_export') as cur:
+            cur.execute("SELECT page, html FROM crawl_pages WHERE status = 'done' ORDER BY page")
+            for page, html in cur:
+                archive.append(page, gzip.decompress(html))
+    print(f"Exported {len(archive)} pages to {out_path}")
+    return archive
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Postgres work queue for distributed GradCafe crawls.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    seed_cmd = subparsers.add_parser("seed", help="Add pending rows for a page range.")
+    seed_cmd.add_argument("--start", type=int, default=0, help="First page number.")
+    seed_cmd.add_argument("--end", type=int, default=9058, help="One past the last page number.")
+
+    work_cmd = subparsers.add_parser("work", help="Claim and fetch pages until the queue is drained.")
+    work_cmd.add_argument("--workers", type=int, default=4, help="Worker processes on this host.")
+    work_cmd.add_argument("--batch-size", type=int, default=CLAIM_BATCH_SIZE, help="Pages per claim.")
+    work_cmd.add_argument("--lease", type=int, default=LEASE_SECONDS, help="Lease length in seconds.")
+
+    subparsers.add_parser("status", help="Show page counts by status.")
+    subparsers.add_parser("requeue-failed", help="Set failed pages back to pending with fresh attempts.")
+
+    export_cmd = subparsers.add_parser("export", help="Write done pages to a raw page archive.")
+    export_cmd.add_argument("--out", default=scrape.RAW_ARCHIVE_PATH, help="Archive path.")
+
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        print(f"Seeded {seed(args.start, args.end)} pages")
+    elif args.command == "work":
+        print(f"Completed {run_workers(args.workers, args.batch_size, args.lease)} pages")
+    elif args.command == "status":
+        print(progress())
+    elif args.command == "requeue-failed":
+        print(f"Requeued {requeue_failed()} pages")
+    elif args.command == "export":
+        export(args.out)
@@ -0,0 +1,341 @@
+"""
+Module for enriching applicant rows with data from GradCafe detail pages.
+
+The survey listing only shows part of each entry, and :func:`clean.clean_html`
+keeps the ``url`` of the entry's ``/result/{id}`` page without fetching it.
+This module fetches those detail pages in parallel and fills fields the
+listing left empty (GPA, GRE scores, nationality, degree, notes).
+
+Every fetched page is stored in a content-addressed on-disk cache, so a
+result ID is fetched at most once across runs:
+
+    - objects/ab/ab12...ef.gz: gzip-compressed page, named by the SHA-256 of
+      its bytes (identical pages are stored once)
+    - ids/<result_id>: the SHA-256 of the page fetched for that ID, or empty
+      when the page answered with a permanent client error (404, 410, ...),
+      so dead IDs are not requested again
+
+Files are written to a temporary name and renamed into place, so an
+interrupted run never leaves a truncated page in the cache.
+
+.. note::
+   Enrichment only fills fields that are None in the row. Values parsed from
+   the listing always win, so enabling enrichment cannot change existing data.
+
+Configuration (environment variables):
+    - ENRICH_CONCURRENCY: detail pages fetched in parallel (default 8)
+    - ENRICH_CACHE_DIR: cache directory (default detail_cache in SCRAPER_CACHE_DIR,
+      see :mod:`page_cache`)
+
+Example Usage:
+    >>> import enrich
+    >>> rows = clean.clean_html(page_html)
+    >>> enrich.enrich_rows(rows)
+    Detail pages: 3 cached, 22 fetched, 0 gone, 0 failed
+    >>> rows[0]['gpa']
+    3.85
+
+.. seealso::
+   :mod:`clean` for the listing rows being enriched
+   :mod:`http_client` for the retrying HTTP client used for fetches
+"""
+
+import gzip
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from bs4 import BeautifulSoup
+
+import applicant_record
+import http_client
+import page_cache
+
+BASE_URL = os.getenv('GRADCAFE_BASE_URL', 'https://www.thegradcafe.com')
+DETAIL_URL = BASE_URL + "/result/{}"
+
+DEFAULT_CACHE_DIR = os.getenv('ENRICH_CACHE_DIR', os.path.join(page_cache.CACHE_DIR, 'detail_cache'))
+
+# Number of detail pages fetched at the same time
+ENRICH_CONCURRENCY = int(os.getenv('ENRICH_CONCURRENCY', '8'))
+
+RESULT_ID_RE = re.compile(r'/result/(\d+)')
+NUMBER_RE = re.compile(r'\d+(?:\.\d+)?')
+
+# Detail page label (lowercase, without trailing colon) -> row field
+DETAIL_FIELDS = {
+    "degree type": "Degree",
+    "degree's country of origin": "US/International",
+    "undergrad gpa": "gpa",
+    "gre general": "gre",
+    "gre verbal": "gre_v",
+    "analytical writing": "gre_aw",
+    "notes": "comments",
+}
+
+# Fields whose values are scores, converted with applicant_record.to_score
+NUMERIC_FIELDS = set(applicant_record.SCORE_RANGES)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _http():
+    """Return the shared HTTP client, created and paced to robots.txt on first use."""
+    global _client
+    # Fetch workers call this concurrently; only one of them may create the client
+    with _client_lock:
+        if _client is None:
+            client = http_client.ResilientClient(maxsize=ENRICH_CONCURRENCY)
+            client.pace(BASE_URL, initial=ENRICH_CONCURRENCY, max_limit=ENRICH_CONCURRENCY)
+            _client = client
+        return _client
+
+
+def _is_permanent(error):
+    """Return True for client errors that will not change on a later run (404, 410, ...)."""
+    return (isinstance(error, http_client.HTTPStatusError)
+            and 400 <= error.status < 500 and error.status not in http_client.RETRY_STATUSES)
+
+
+class DetailCache:
+    """
+    Content-addressed on-disk cache of detail pages keyed by result ID.
+
+    :param root: Cache directory, created if missing
+    :type root: str, optional
+
+    Example:
+        >>> cache = DetailCache('detail_cache')
+        >>> cache.put(123456, b'<html>...</html>')
+        '9f86d0...'
+        >>> cache.get(123456)
+        b'<html>...</html>'
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR):
+        self.root = root
+        os.makedirs(os.path.join(root, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(root, 'ids'), exist_ok=True)
+
+    def _object_path(self, digest):
+        return os.path.join(self.root, 'objects', digest[:2], digest + '.gz')
+
+    def _id_path(self, result_id):
+        return os.path.join(self.root, 'ids', str(result_id))
+
+    def _write(self, path, data):
+        """Write data to path atomically (temporary file, then rename)."""
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def __contains__(self, result_id):
+        return os.path.exists(self._id_path(result_id))
+
+    def get(self, result_id):
+        """
+        Return the cached page for a result ID.
+
+        :param result_id: GradCafe result ID
+        :type result_id: int
+        :return: Page bytes, b'' when the ID is recorded as gone, or None
+            when the ID has not been fetched
+        :rtype: bytes or None
+        """
+        try:
+            with open(self._id_path(result_id), 'r', encoding='utf-8') as f:
+                digest = f.read().strip()
+            if not digest:
+                return b''
+            with open(self._object_path(digest), 'rb') as f:
+                return gzip.decompress(f.read())
+        except (OSError, EOFError):
+            return None
+
+    def put(self, result_id, html):
+        """
+        Store a page and point the result ID at it.
+
+        :param result_id: GradCafe result ID
+        :type result_id: int
+        :param html: Page bytes
+        :type html: bytes
+        :return: SHA-256 hex digest the page is stored under
+        :rtype: str
+        """
+        digest = hashlib.sha256(html).hexdigest()
+        if not os.path.exists(self._object_path(digest)):
+            self._write(self._object_path(digest), gzip.compress(html))
+        self._write(self._id_path(result_id), digest.encode('utf-8'))
+        return digest
+
+    def put_gone(self, result_id):
+        """
+        Record that a result ID has no detail page, so it is not fetched again.
+
+        :param result_id: GradCafe result ID
+        :type result_id: int
+        """
+        self._write(self._id_path(result_id), b'')
+
+
+def _row_result_id(row):
+    """Return the result ID in a row's url, or None if it has none."""
+    match = RESULT_ID_RE.search(row.get('url') or '')
+    return int(match.group(1)) if match else None
+
+
+def result_ids(rows):
+    """
+    Return the result IDs linked from rows, in row order.
+
+    :param rows: Rows produced by :func:`clean.clean_html`
+    :type rows: list[dict]
+    :return: Result IDs of the rows that have a ``/result/{id}`` url
+    :rtype: list[int]
+    """
+    return [result_id for result_id in map(_row_result_id, rows) if result_id is not None]
+
+
+def parse_detail(html):
+    """
+    Extract row fields from a ``/result/{id}`` detail page.
+
+    The detail page lists each entry as label/value pairs (``<dt>``/``<dd>``).
+    Labels in DETAIL_FIELDS are mapped to row fields and formatted like the
+    values :func:`clean.clean_html` produces; other labels are ignored.
+
+    :param html: Raw detail page content
+    :type html: bytes or str
+    :return: Row fields found on the page (missing, zero or implausible scores omitted)
+    :rtype: dict
+
+    Example:
+        >>> parse_detail('<dl><dt>Undergrad GPA</dt><dd>3.85</dd></dl>')
+        {'gpa': 3.85}
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    fields = {}
+    for dt in soup.find_all('dt'):
+        field = DETAIL_FIELDS.get(dt.get_text(strip=True).rstrip(':').strip().lower())
+        dd = dt.find_next_sibling('dd')
+        if field is None or dd is None:
+            continue
+        value = dd.get_text(" ", strip=True)
+
+        if field in NUMERIC_FIELDS:
+            match = NUMBER_RE.search(value)
+            value = applicant_record.to_score(field, match.group(0)) if match else None
+        elif field == "US/International":
+            value = value if value in ("International", "American") else None
+
+        if value:
+            fields[field] = value
+    return fields
+
+
+def fetch_details(result_ids, cache=None, concurrency=ENRICH_CONCURRENCY):
+    """
+    Return detail pages for result IDs, fetching only IDs not already cached.
+
+    :param result_ids: GradCafe result IDs
+    :type result_ids: iterable[int]
+    :param cache: Cache to read from and store fetched pages in
+    :type cache: DetailCache, optional
+    :param concurrency: Maximum number of detail pages fetched at the same time
+    :type concurrency: int, optional
+    :return: Mapping of result ID to page bytes; IDs that failed or are gone are missing
+    :rtype: dict[int, bytes]
+
+    .. note::
+       A failed fetch is reported and skipped so one bad ID does not stop the
+       rescrape. Permanent client errors (404, 410, ...) are cached as gone
+       and not requested again; any other failure is retried on the next run.
+    """
+    cache = cache or DetailCache()
+    pages = {}
+    missing = []
+    gone = 0
+    for result_id in dict.fromkeys(result_ids):
+        html = cache.get(result_id)
+        if html is None:
+            missing.append(result_id)
+        elif html:
+            pages[result_id] = html
+        else:
+            gone += 1
+    cached = len(pages)
+
+    def fetch(result_id):
+        try:
+            html = _http().request('GET', DETAIL_URL.format(result_id)).data
+        except Exception as e:
+            print(f"Error fetching detail page {result_id}: {e}")
+            if _is_permanent(e):
+                cache.put_gone(result_id)
+                return result_id, b''
+            return result_id, None
+        cache.put(result_id, html)
+        return result_id, html
+
+    failed = 0
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+            for result_id, html in executor.map(fetch, missing):
+                if html is None:
+                    failed += 1
+                elif html:
+                    pages[result_id] = html
+                else:
+                    gone += 1
+
+    print(f"Detail pages: {cached} cached, {len(pages) - cached} fetched, "
+          f"{gone} gone, {failed} failed")
+    return pages
+
+
+def enrich_rows(rows, cache=None, concurrency=ENRICH_CONCURRENCY, known_ids=None):
+    """
+    Fill empty row fields from each row's detail page.
+
+    :param rows: Rows produced by :func:`clean.clean_html`
+    :type rows: list[dict]
+    :param cache: Detail page cache
+    :type cache: DetailCache, optional
+    :param concurrency: Maximum number of detail pages fetched at the same time
+    :type concurrency: int, optional
+    :param known_ids: Result IDs already in the database; their rows are left
+        as they are and their detail pages are not fetched
+    :type known_ids: set[int], optional
+    :return: The same rows, updated in place
+    :rtype: list[dict]
+
+    Example:
+        >>> rows = [{"url": "https://www.thegradcafe.com/result/123456", "gpa": None}]
+        >>> enrich_rows(rows)[0]['gpa']
+        3.85
+    """
+    known_ids = known_ids or set()
+    row_ids = [None if result_id in known_ids else result_id for result_id in map(_row_result_id, rows)]
+
+    pages = fetch_details([result_id for result_id in row_ids if result_id is not None],
+                          cache, concurrency)
+
+    for row, result_id in zip(rows, row_ids):
+        if result_id not in pages:
+            continue
+        for field, value in parse_detail(pages[result_id]).items():
+            if row.get(field) is None:
+                row[field] = value
+    return rows
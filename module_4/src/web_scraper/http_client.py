@@ -0,0 +1,491 @@
+"""
+Module providing a resilient HTTP client for requests to The GradCafe.
+
+A bare ``PoolManager.request('GET', url)`` has no timeout, no retry and no
+status check, so a single hung socket can stall a whole rescrape (and the web
+worker running it). :class:`ResilientClient` wraps the same urllib3 pool with:
+
+- connect and read timeouts on every request
+- redirects followed by urllib3 itself, up to SCRAPE_MAX_REDIRECTS hops
+- retries with jittered exponential backoff on 429 and 5xx responses and on
+  connection errors or timeouts, honoring ``Retry-After`` when sent
+- a circuit breaker that fails fast once requests keep failing, and lets a
+  single trial request through after a cool-down
+- thread-safe counters for requests, retries, failures and breaker trips
+- an optional controller that is told before every attempt and about its
+  outcome; :class:`AdaptiveConcurrency` uses it for pacing and AIMD
+
+:meth:`ResilientClient.pace` attaches one :class:`AdaptiveConcurrency` per
+site and process, paced to the site's robots.txt crawl delay. Every client
+that paces itself to the same site shares that controller, so the scraper,
+the pipeline, the backfill and the crawl queue all honor the same delay.
+
+The client keeps the ``request(method, url)`` signature of urllib3, so it can
+replace a PoolManager without changing call sites.
+
+Configuration (environment variables):
+    - SCRAPE_CONNECT_TIMEOUT: connect timeout in seconds (default 5)
+    - SCRAPE_READ_TIMEOUT: read timeout in seconds (default 30)
+    - SCRAPE_MAX_RETRIES: retries after the first attempt (default 4)
+    - SCRAPE_MAX_REDIRECTS: redirects followed per attempt (default 5)
+    - SCRAPE_BREAKER_THRESHOLD: consecutive failures that open the breaker (default 5)
+    - SCRAPE_BREAKER_RESET: seconds the breaker stays open (default 60)
+
+Example Usage:
+    >>> import http_client
+    >>> client = http_client.ResilientClient()
+    >>> response = client.request('GET', 'https://www.thegradcafe.com/survey/?page=1')
+    >>> response.status
+    200
+    >>> client.stats_snapshot()
+    {'requests': 1, 'retries': 0, 'failures': 0, 'breaker_trips': 0, 'breaker_rejections': 0}
+
+.. seealso::
+   :mod:`scrape` for the survey crawler that uses this client
+"""
+
+import os
+import random
+import threading
+import time
+import urllib.robotparser
+
+import urllib3
+
+CONNECT_TIMEOUT = float(os.getenv('SCRAPE_CONNECT_TIMEOUT', '5'))
+READ_TIMEOUT = float(os.getenv('SCRAPE_READ_TIMEOUT', '30'))
+MAX_RETRIES = int(os.getenv('SCRAPE_MAX_RETRIES', '4'))
+MAX_REDIRECTS = int(os.getenv('SCRAPE_MAX_REDIRECTS', '5'))
+BREAKER_THRESHOLD = int(os.getenv('SCRAPE_BREAKER_THRESHOLD', '5'))
+BREAKER_RESET = float(os.getenv('SCRAPE_BREAKER_RESET', '60'))
+
+# Responses worth retrying: throttling and server-side errors
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# One AdaptiveConcurrency per site in this process, built by ResilientClient.pace
+_site_controllers = {}
+_site_controllers_lock = threading.Lock()
+
+
+class HTTPStatusError(urllib3.exceptions.HTTPError):
+    """Raised when a request still has an error status after all retries."""
+
+    def __init__(self, url, status):
+        super().__init__(f"GET {url} returned HTTP {status}")
+        self.url = url
+        self.status = status
+
+
+class CircuitOpenError(urllib3.exceptions.HTTPError):
+    """Raised without contacting the server while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with a half-open trial request.
+
+    :param threshold: Consecutive failures that open the breaker
+    :type threshold: int, optional
+    :param reset_timeout: Seconds to stay open before allowing a trial request
+    :type reset_timeout: float, optional
+
+    States:
+        - closed: requests flow normally
+        - open: requests are rejected until reset_timeout has passed
+        - half-open: one trial request is allowed; success closes the
+          breaker, failure opens it again
+    """
+
+    def __init__(self, threshold=BREAKER_THRESHOLD, reset_timeout=BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """Return 'closed', 'open' or 'half-open'."""
+        with self._lock:
+            return self._state()
+
+    def _state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def allow(self):
+        """
+        Return True if a request may be sent now.
+
+        In the half-open state only one caller gets True until that trial
+        request reports its outcome.
+        """
+        with self._lock:
+            state = self._state()
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return True
+            return False
+
+    def release_trial(self):
+        """Free the half-open trial slot without recording an outcome."""
+        with self._lock:
+            self.trial_in_flight = False
+
+    def record_success(self):
+        """Close the breaker and reset the failure count."""
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def record_failure(self):
+        """
+        Count a failure; return True if this failure tripped the breaker open.
+        """
+        with self._lock:
+            self.failures += 1
+            was_trial = self.trial_in_flight
+            self.trial_in_flight = False
+            if was_trial or (self.opened_at is None and self.failures >= self.threshold):
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+class AdaptiveConcurrency:
+    """
+    Additive-increase/multiplicative-decrease limit on requests in flight.
+
+    The limit grows by roughly one request per round trip of healthy
+    responses and is halved when the site pushes back, so throughput settles
+    just below the highest rate The GradCafe will sustain. Pushback is a
+    429 or 5xx response, a failed request, or a latency well above the
+    fastest latency seen so far (a queue building up on the server).
+
+    Every request attempt, retries included, waits in :meth:`before_request`
+    until fewer than ``limit`` attempts are in flight, so a lowered limit takes
+    effect immediately rather than once the page window drains. The
+    controller also paces request starts to the robots.txt crawl delay, if
+    there is one, however large the concurrency limit is.
+
+    :param initial: Starting limit
+    :type initial: int, optional
+    :param min_limit: Lowest limit after decreases
+    :type min_limit: int, optional
+    :param max_limit: Highest limit after increases
+    :type max_limit: int, optional
+    :param crawl_delay: Minimum seconds between request starts, or None
+    :type crawl_delay: float, optional
+    :param latency_factor: Latency above this multiple of the fastest
+        observed latency counts as pushback
+    :type latency_factor: float, optional
+    :param backoff: Multiplier applied to the limit on pushback
+    :type backoff: float, optional
+
+    .. note::
+       Only one decrease is applied per cooldown (the latest slow latency),
+       so a burst of errors from requests that were already in flight halves
+       the limit once rather than collapsing it to the minimum.
+
+    Example:
+        >>> controller = AdaptiveConcurrency(initial=8, crawl_delay=None)
+        >>> controller.observe(200, 0.3)
+        >>> controller.limit
+        8
+        >>> controller.observe(429, 0.3)
+        >>> controller.limit
+        4
+    """
+
+    def __init__(self, initial=8, min_limit=1, max_limit=32, crawl_delay=None,
+                 latency_factor=3.0, backoff=0.5):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.crawl_delay = crawl_delay or 0
+        self.latency_factor = latency_factor
+        self.backoff = backoff
+        self.stats = {"increases": 0, "decreases": 0}
+        self._limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self._fastest = None
+        self._cooldown_until = 0.0
+        self._next_start = 0.0
+        self._active = 0
+        self._lock = threading.Condition()
+
+    @property
+    def limit(self):
+        """Current number of requests allowed in flight."""
+        return int(self._limit)
+
+    def before_request(self):
+        """
+        Block until an attempt may start: below the limit and past the crawl delay.
+
+        Must be followed by exactly one :meth:`observe` call for the attempt.
+        """
+        with self._lock:
+            while self._active >= self.limit:
+                self._lock.wait()
+            self._active += 1
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.crawl_delay
+        if start > now:
+            time.sleep(start - now)
+
+    def observe(self, status, latency):
+        """
+        Adjust the limit from the outcome of one request attempt.
+
+        :param status: HTTP status, or None when the attempt raised
+        :type status: int or None
+        :param latency: Seconds the attempt took
+        :type latency: float
+        """
+        with self._lock:
+            self._active = max(0, self._active - 1)
+            self._lock.notify_all()
+            now = time.monotonic()
+            if status is not None and status < 500 and status != 429:
+                if self._fastest is None or latency < self._fastest:
+                    self._fastest = latency
+                slow = latency > self._fastest * self.latency_factor
+            else:
+                slow = False
+
+            if status is None or status == 429 or status >= 500 or slow:
+                if now >= self._cooldown_until:
+                    self._limit = max(self.min_limit, self._limit * self.backoff)
+                    self._cooldown_until = now + latency
+                    self.stats["decreases"] += 1
+            elif self._limit < self.max_limit:
+                before = int(self._limit)
+                self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+                if int(self._limit) > before:
+                    self.stats["increases"] += 1
+
+
+def get_crawl_delay(client, base_url, user_agent='*'):
+    """
+    Read the crawl delay for a site from its robots.txt.
+
+    Both ``Crawl-delay`` and ``Request-rate`` are honored; the slower of
+    the two wins.
+
+    :param client: Client used to fetch robots.txt
+    :type client: ResilientClient
+    :param base_url: Site root, e.g. 'https://www.thegradcafe.com'
+    :type base_url: str
+    :param user_agent: User agent whose rules apply
+    :type user_agent: str, optional
+    :return: Minimum seconds between requests, or None if robots.txt sets no
+        limit or cannot be read
+    :rtype: float or None
+    """
+    try:
+        response = client.request('GET', f"{base_url}/robots.txt")
+    except HTTPStatusError as e:
+        if e.status != 404:
+            print(f"Error reading robots.txt: {e}")
+        return None  # No robots.txt means no crawl delay
+    except Exception as e:
+        print(f"Error reading robots.txt: {e}")
+        return None
+
+    parser = urllib.robotparser.RobotFileParser()
+    parser.parse(response.data.decode('utf-8', errors='replace').splitlines())
+    parser.modified()  # crawl_delay() ignores rules that were never marked as read
+
+    delays = []
+    crawl_delay = parser.crawl_delay(user_agent)
+    if crawl_delay:
+        delays.append(float(crawl_delay))
+    request_rate = parser.request_rate(user_agent)
+    if request_rate and request_rate.requests:
+        delays.append(request_rate.seconds / request_rate.requests)
+    return max(delays) if delays else None
+
+
+class ResilientClient:
+    """
+    urllib3 pool wrapper with timeouts, jittered retries and a circuit breaker.
+
+    :param maxsize: Connections kept per host (match the crawl concurrency)
+    :type maxsize: int, optional
+    :param connect_timeout: Seconds to wait for a TCP connection
+    :type connect_timeout: float, optional
+    :param read_timeout: Seconds to wait between bytes of the response
+    :type read_timeout: float, optional
+    :param max_retries: Retries after the first attempt
+    :type max_retries: int, optional
+    :param max_redirects: Redirects followed within one attempt
+    :type max_redirects: int, optional
+    :param backoff_base: First backoff delay in seconds, doubled per retry
+    :type backoff_base: float, optional
+    :param backoff_cap: Longest backoff delay in seconds
+    :type backoff_cap: float, optional
+    :param breaker: Circuit breaker shared by all requests of this client
+    :type breaker: CircuitBreaker, optional
+    :param controller: Object with ``before_request()`` and
+        ``observe(status, latency)``, called around every attempt (status is
+        None when the attempt raised); every before_request() call is matched
+        by exactly one observe() call
+    :type controller: object, optional
+
+    Example:
+        >>> client = ResilientClient(maxsize=8, max_retries=2)
+        >>> client.request('GET', url).data[:15]
+        b'<!DOCTYPE html>'
+    """
+
+    def __init__(self, maxsize=1, connect_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 max_retries=MAX_RETRIES, max_redirects=MAX_REDIRECTS, backoff_base=0.5,
+                 backoff_cap=30.0, breaker=None, controller=None):
+        # urllib3 only follows redirects; every other retry is made by request()
+        # so it can back off and feed the breaker. Retry(total=False) would
+        # also force redirect=0, so the other counters are zeroed one by one.
+        self.pool = urllib3.PoolManager(
+            maxsize=maxsize,
+            timeout=urllib3.Timeout(connect=connect_timeout, read=read_timeout),
+            retries=urllib3.Retry(total=None, connect=0, read=0, status=0, other=0,
+                                  redirect=max_redirects),
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.breaker = breaker or CircuitBreaker()
+        self.controller = controller
+        self.stats = {
+            "requests": 0,
+            "retries": 0,
+            "failures": 0,
+            "breaker_trips": 0,
+            "breaker_rejections": 0,
+        }
+        self._stats_lock = threading.Lock()
+
+    def pace(self, base_url, processes=1, **options):
+        """
+        Attach the site's shared :class:`AdaptiveConcurrency` controller.
+
+        The first call for a site in this process reads its robots.txt and
+        builds the controller; later calls, from this or any other client,
+        attach the same controller and ignore their options.
+
+        :param base_url: Site root whose robots.txt sets the crawl delay
+        :type base_url: str
+        :param processes: Processes crawling the site at once; the crawl delay
+            is multiplied by it so their combined rate still honors robots.txt
+        :type processes: int, optional
+        :param options: Keyword arguments for AdaptiveConcurrency (initial,
+            min_limit, max_limit, ...) used when the controller is built
+        :return: The attached controller
+        :rtype: AdaptiveConcurrency
+
+        Example:
+            >>> client.pace('https://www.thegradcafe.com', initial=8).crawl_delay
+            10.0
+        """
+        with _site_controllers_lock:
+            controller = _site_controllers.get(base_url)
+            if controller is None:
+                crawl_delay = get_crawl_delay(self, base_url)
+                if crawl_delay:
+                    crawl_delay *= max(1, processes)
+                controller = AdaptiveConcurrency(crawl_delay=crawl_delay, **options)
+                _site_controllers[base_url] = controller
+        self.controller = controller
+        return controller
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def stats_snapshot(self):
+        """Return a copy of the request counters."""
+        with self._stats_lock:
+            return dict(self.stats)
+
+    def _backoff(self, attempt, response=None):
+        """Seconds to wait before the next attempt: full jitter, at least Retry-After."""
+        delay = random.uniform(0, self.backoff_base * (2 ** attempt))
+        if response is not None:
+            retry_after = response.headers.get('Retry-After')
+            if retry_after and retry_after.isdigit():
+                delay = max(delay, float(retry_after))
+        return min(delay, self.backoff_cap)
+
+    def _failed(self):
+        self._count("failures")
+        if self.breaker.record_failure():
+            self._count("breaker_trips")
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request, retrying throttled, failed or timed-out attempts.
+
+        :param method: HTTP method, e.g. 'GET'
+        :type method: str
+        :param url: Absolute URL
+        :type url: str
+        :return: The successful response (2xx status, redirects followed)
+        :rtype: urllib3.response.BaseHTTPResponse
+        :raises CircuitOpenError: When the breaker is open
+        :raises HTTPStatusError: When the last attempt returned an error status,
+            or a 3xx response that could not be followed
+        :raises urllib3.exceptions.HTTPError: When the last attempt failed to connect or timed out
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._count("breaker_rejections")
+                raise CircuitOpenError(f"Circuit open; not requesting {url}")
+
+            controller = self.controller
+            if controller is not None:
+                controller.before_request()
+
+            self._count("requests")
+            response = None
+            settled = False  # True once the breaker has been told the outcome
+            started = time.monotonic()
+            try:
+                try:
+                    response = self.pool.request(method, url, **kwargs)
+                finally:
+                    if controller is not None:
+                        status = response.status if response is not None else None
+                        controller.observe(status, time.monotonic() - started)
+            except urllib3.exceptions.HTTPError:
+                settled = True
+                self._failed()
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                settled = True
+                if response.status < 300:
+                    self.breaker.record_success()
+                    return response
+                if response.status not in RETRY_STATUSES:
+                    # A client error (or a redirect urllib3 could not follow) will not
+                    # improve with retries; it is not a server fault
+                    self.breaker.record_success()
+                    raise HTTPStatusError(url, response.status)
+                self._failed()
+                if attempt >= self.max_retries:
+                    raise HTTPStatusError(url, response.status)
+            finally:
+                if not settled:
+                    # An unexpected error must not hold the half-open trial slot forever
+                    self.breaker.release_trial()
+
+            self._count("retries")
+            time.sleep(self._backoff(attempt, response))
+            attempt += 1
@@ -1,14 +1,28 @@
 # -*- coding: utf-8 -*-
-"""Flask + tiny local LLM standardizer with incremental JSONL CLI output."""
+"""Flask + tiny local LLM standardizer with incremental JSONL CLI output.
+
+Also usable as a library: :func:`standardize_rows` standardizes rows in the
+calling process and keeps the model loaded between calls, so a caller such as
+``clean.py`` pays the model load once per process instead of once per run.
+
+Results are memoized in a SQLite file (``LLM_CACHE_PATH``) keyed by the
+normalized program text and a hash of the model, prompt and canonical lists,
+so a program string seen before never reaches the model again. The least
+recently used results are evicted once ``LLM_CACHE_MAX_MB`` is exceeded.
+"""
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
 import re
+import sqlite3
 import sys
 import difflib
-from typing import Any, Dict, List, Tuple
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
 
 from flask import Flask, jsonify, request
 from huggingface_hub import hf_hub_download
@@ -30,12 +44,25 @@ N_THREADS = int(os.getenv("N_THREADS", str(os.cpu_count() or 2)))
 N_CTX = int(os.getenv("N_CTX", "2048"))
 N_GPU_LAYERS = int(os.getenv("N_GPU_LAYERS", "0"))  # 0 → CPU-only
 
-CANON_UNIS_PATH = os.getenv("CANON_UNIS_PATH", "canon_universities.txt")
-CANON_PROGS_PATH = os.getenv("CANON_PROGS_PATH", "canon_programs.txt")
+# Data files live next to this module, whatever the caller's working directory
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.getenv("MODEL_DIR", os.path.join(HERE, "models"))
+
+# Result cache (SQLite; empty path disables it) and its size limit. It lives
+# with the scraper's other caches (SCRAPER_CACHE_DIR, see page_cache)
+CACHE_DIR = os.getenv("SCRAPER_CACHE_DIR", os.path.join(os.path.dirname(HERE), "cache"))
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(CACHE_DIR, "llm_cache.sqlite3"))
+LLM_CACHE_MAX_BYTES = int(float(os.getenv("LLM_CACHE_MAX_MB", "64")) * 1024 * 1024)
+
+CANON_UNIS_PATH = os.getenv("CANON_UNIS_PATH", os.path.join(HERE, "canon_universities.txt"))
+CANON_PROGS_PATH = os.getenv("CANON_PROGS_PATH", os.path.join(HERE, "canon_programs.txt"))
 
 # Precompiled, non-greedy JSON object matcher to tolerate chatter around JSON
 JSON_OBJ_RE = re.compile(r"\{.*?\}", re.DOTALL)
 
+# Compact JSON Lines output: no spaces after separators
+JSONL_SEPARATORS = (",", ":")
+
 # ---------------- Canonical lists + abbrev maps ----------------
 def _read_lines(path: str) -> List[str]:
     """Read non-empty, stripped lines from a file (UTF-8)."""
@@ -112,29 +139,33 @@ FEW_SHOTS: List[Tuple[Dict[str, str], Dict[str, str]]] = [
 
 _LLM: Llama | None = None
 
+# llama.cpp contexts are not thread-safe; serializes loading and completions
+_LLM_LOCK = threading.Lock()
+
 
 def _load_llm() -> Llama:
-    """Download (or reuse) the GGUF file and initialize llama.cpp."""
+    """Download (or reuse) the GGUF file and initialize llama.cpp once per process."""
     global _LLM
-    if _LLM is not None:
-        return _LLM
-
-    model_path = hf_hub_download(
-        repo_id=MODEL_REPO,
-        filename=MODEL_FILE,
-        local_dir="models",
-        local_dir_use_symlinks=False,
-        force_filename=MODEL_FILE,
-    )
+    with _LLM_LOCK:
+        if _LLM is not None:
+            return _LLM
+
+        model_path = hf_hub_download(
+            repo_id=MODEL_REPO,
+            filename=MODEL_FILE,
+            local_dir=MODEL_DIR,
+            local_dir_use_symlinks=False,
+            force_filename=MODEL_FILE,
+        )
 
-    _LLM = Llama(
-        model_path=model_path,
-        n_ctx=N_CTX,
-        n_threads=N_THREADS,
-        n_gpu_layers=N_GPU_LAYERS,
-        verbose=False,
-    )
-    return _LLM
+        _LLM = Llama(
+            model_path=model_path,
+            n_ctx=N_CTX,
+            n_threads=N_THREADS,
+            n_gpu_layers=N_GPU_LAYERS,
+            verbose=False,
+        )
+        return _LLM
 
 
 def _split_fallback(text: str) -> Tuple[str, str]:
@@ -205,7 +236,7 @@ def _post_normalize_university(uni: str) -> str:
     return match or u or "Unknown"
 
 
-def _call_llm(program_text: str) -> Dict[str, str]:
+def _query_llm(program_text: str) -> Dict[str, str]:
     """Query the tiny LLM and return standardized fields."""
     llm = _load_llm()
 
@@ -227,12 +258,13 @@ def _call_llm(program_text: str) -> Dict[str, str]:
         }
     )
 
-    out = llm.create_chat_completion(
-        messages=messages,
-        temperature=0.0,
-        max_tokens=128,
-        top_p=1.0,
-    )
+    with _LLM_LOCK:
+        out = llm.create_chat_completion(
+            messages=messages,
+            temperature=0.0,
+            max_tokens=128,
+            top_p=1.0,
+        )
 
     text = (out["choices"][0]["message"]["content"] or "").strip()
     try:
@@ -251,6 +283,174 @@ def _call_llm(program_text: str) -> Dict[str, str]:
     }
 
 
+# ---------------- Result cache ----------------
+def _cache_version() -> str:
+    """Hash of everything that shapes a result; changing any of it retires old entries."""
+    parts = [
+        MODEL_REPO, MODEL_FILE, SYSTEM_PROMPT, FEW_SHOTS, CANON_UNIS, CANON_PROGS,
+        ABBREV_UNI, COMMON_UNI_FIXES, COMMON_PROG_FIXES,
+    ]
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """SQLite memo of standardized results with LRU eviction by stored size.
+
+    Keys are the SHA-256 of the cache version and the program text with case
+    and whitespace normalized. Entries of an older version are never read
+    again and age out through eviction. Safe to share between threads.
+    """
+
+    # Fraction of max_bytes kept after eviction
+    EVICT_TO = 0.9
+
+    def __init__(self, path: str, max_bytes: int, version: str) -> None:
+        self.max_bytes = max_bytes
+        self.version = version.encode("utf-8")
+        self.lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results("
+            "key TEXT PRIMARY KEY, result TEXT NOT NULL, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS results_last_used ON results(last_used)"
+        )
+        self.conn.commit()
+        self.total_bytes = self.conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()[0]
+
+    def key(self, program_text: str) -> str:
+        """Cache key of a program string (case and whitespace insensitive)."""
+        text = " ".join(program_text.split()).casefold().encode("utf-8")
+        return hashlib.sha256(self.version + b"\0" + text).hexdigest()
+
+    def get(self, key: str) -> Dict[str, str] | None:
+        """Return the stored result for a key, or None."""
+        with self.lock:
+            found = self.conn.execute(
+                "SELECT result FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if found is None:
+                return None
+            self.conn.execute(
+                "UPDATE results SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self.conn.commit()
+        return json.loads(found[0])
+
+    def put(self, key: str, result: Dict[str, str]) -> None:
+        """Store a result, evicting least recently used ones when over the limit."""
+        blob = json.dumps(result, ensure_ascii=False)
+        with self.lock:
+            old = self.conn.execute(
+                "SELECT size FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results(key, result, size, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            self.total_bytes += len(blob) - (old[0] if old else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+            self.conn.commit()
+
+    def _evict(self) -> None:
+        target = self.max_bytes * self.EVICT_TO
+        doomed = []
+        for key, size in self.conn.execute(
+            "SELECT key, size FROM results ORDER BY last_used"
+        ):
+            if self.total_bytes <= target:
+                break
+            doomed.append((key,))
+            self.total_bytes -= size
+        self.conn.executemany("DELETE FROM results WHERE key = ?", doomed)
+
+
+_CACHE: ResultCache | None = None
+_CACHE_LOCK = threading.Lock()
+
+# Process-wide hit/miss counters of the result cache
+CACHE_STATS: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def _get_cache() -> ResultCache | None:
+    """Open the result cache on first use; None when LLM_CACHE_PATH is empty."""
+    global _CACHE
+    if not LLM_CACHE_PATH:
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = ResultCache(LLM_CACHE_PATH, LLM_CACHE_MAX_BYTES, _cache_version())
+        return _CACHE
+
+
+def _count(stats: Dict[str, int] | None, outcome: str) -> None:
+    with _CACHE_LOCK:
+        CACHE_STATS[outcome] += 1
+    if stats is not None:
+        stats[outcome] += 1
+
+
+def _call_llm(program_text: str, stats: Dict[str, int] | None = None) -> Dict[str, str]:
+    """Return standardized fields, from the result cache when the text was seen before."""
+    cache = _get_cache()
+    if cache is None:
+        return _query_llm(program_text)
+
+    key = cache.key(program_text)
+    result = cache.get(key)
+    if result is not None:
+        _count(stats, "hits")
+        return result
+    _count(stats, "misses")
+    result = _query_llm(program_text)
+    cache.put(key, result)
+    return result
+
+
+# ---------------- Library API ----------------
+def load_model() -> None:
+    """Load the model now (it stays resident) so the first row does not wait for it."""
+    _load_llm()
+
+
+def standardize_row(
+    row: Dict[str, Any], stats: Dict[str, int] | None = None
+) -> Dict[str, Any]:
+    """Add llm-generated-program/university to one row (in place) and return it.
+
+    ``stats``, when given, counts result cache ``hits`` and ``misses``.
+    """
+    program_text = (row or {}).get("program") or ""
+    result = _call_llm(program_text, stats)
+    row["llm-generated-program"] = result["standardized_program"]
+    row["llm-generated-university"] = result["standardized_university"]
+    return row
+
+
+def standardize_rows(
+    rows: Iterable[Dict[str, Any]], stats: Dict[str, int] | None = None
+) -> Iterator[Dict[str, Any]]:
+    """Yield each row standardized, in input order, using the resident model.
+
+    Rows are pulled lazily, so ``rows`` may be a generator that is still being
+    produced (e.g. pages still downloading) while earlier rows are yielded.
+    ``stats``, when given, counts result cache ``hits`` and ``misses``.
+    """
+    for row in rows:
+        yield standardize_row(row, stats)
+
+
 def _normalize_input(payload: Any) -> List[Dict[str, Any]]:
     """Accept either a list of rows or {'rows': [...]}."""
     if isinstance(payload, list):
@@ -272,15 +472,15 @@ def standardize() -> Any:
     payload = request.get_json(force=True, silent=True)
     rows = _normalize_input(payload)
 
-    out: List[Dict[str, Any]] = []
-    for row in rows:
-        program_text = (row or {}).get("program") or ""
-        result = _call_llm(program_text)
-        row["llm-generated-program"] = result["standardized_program"]
-        row["llm-generated-university"] = result["standardized_university"]
-        out.append(row)
+    stats = {"hits": 0, "misses": 0}
+    out: List[Dict[str, Any]] = list(standardize_rows(rows, stats))
+
+    return jsonify({"rows": out, "cache": stats})
 
-    return jsonify({"rows": out})
+
+def _iter_jsonl(lines) -> Any:
+    """Yield the rows of JSON Lines input, skipping blank lines."""
+    return (json.loads(line) for line in lines if line.strip())
 
 
 def _cli_process_file(
@@ -289,9 +489,19 @@ def _cli_process_file(
     append: bool,
     to_stdout: bool,
 ) -> None:
-    """Process a JSON file and write JSONL incrementally."""
-    with open(in_path, "r", encoding="utf-8") as f:
-        rows = _normalize_input(json.load(f))
+    """Process a JSON or JSONL file (or JSONL on stdin with '-') and write JSONL incrementally."""
+    in_file = None
+    if in_path == "-":
+        # Stream rows as they arrive so a caller can keep one model loaded
+        rows = _iter_jsonl(sys.stdin)
+        to_stdout = to_stdout or out_path is None
+    elif in_path.endswith(".jsonl"):
+        # Compact pipeline files are read one row at a time
+        in_file = open(in_path, "r", encoding="utf-8")
+        rows = _iter_jsonl(in_file)
+    else:
+        with open(in_path, "r", encoding="utf-8") as f:
+            rows = _normalize_input(json.load(f))
 
     sink = sys.stdout if to_stdout else None
     if not to_stdout:
@@ -301,19 +511,19 @@ def _cli_process_file(
 
     assert sink is not None  # for type-checkers
 
+    stats = {"hits": 0, "misses": 0}
     try:
-        for row in rows:
-            program_text = (row or {}).get("program") or ""
-            result = _call_llm(program_text)
-            row["llm-generated-program"] = result["standardized_program"]
-            row["llm-generated-university"] = result["standardized_university"]
-
-            json.dump(row, sink, ensure_ascii=False)
+        for row in standardize_rows(rows, stats):
+            json.dump(row, sink, ensure_ascii=False, separators=JSONL_SEPARATORS)
             sink.write("\n")
             sink.flush()
+        # stderr, so the counts never mix with JSON Lines on stdout
+        print(f"LLM cache: {stats['hits']} hits, {stats['misses']} misses", file=sys.stderr)
     finally:
         if sink is not sys.stdout:
             sink.close()
+        if in_file is not None:
+            in_file.close()
 
 
 if __name__ == "__main__":
@@ -324,7 +534,8 @@ if __name__ == "__main__":
     )
     parser.add_argument(
         "--file",
-        help="Path to JSON input (list of rows or {'rows': [...]})",
+        help="Path to JSON input (list of rows or {'rows': [...]}), "
+        "a .jsonl file, or '-' to stream JSON Lines from stdin",
         default=None,
     )
     parser.add_argument(
@@ -0,0 +1,169 @@
+"""
+Module for caching cleaned rows by the content hash of each raw page.
+
+Every :func:`clean.main` run used to parse every page of the raw archive,
+even pages whose HTML had already been cleaned on an earlier run (overlapping
+rescrapes store the same survey pages again). :class:`PageCache` keeps the
+rows extracted from each page in a SQLite file, keyed by the SHA-256 of the
+page bytes, so only pages whose content changed are parsed again.
+
+Table layout (one SQLite file):
+    - key: SHA-256 hex digest of the parser version and the page bytes
+    - rows: zlib-compressed JSON list of the page's rows
+    - size: length of the stored blob in bytes
+    - last_used: time of the last read or write, for eviction
+
+When the stored blobs exceed max_bytes, the least recently used pages are
+deleted until the cache is back under 90% of the limit.
+
+.. note::
+   Rows are stored as parsed with no known-ID filtering, so one cached page
+   serves any ``known_ids``. The key includes the parser version given by the
+   caller (:data:`clean.PARSER_VERSION`); bumping it invalidates every entry.
+
+Configuration (environment variables):
+    - SCRAPER_CACHE_DIR: directory of all scraper caches (default web_scraper/cache)
+    - CLEAN_CACHE_PATH: SQLite file (default clean_cache.sqlite3 in SCRAPER_CACHE_DIR;
+      empty disables)
+    - CLEAN_CACHE_MAX_MB: size limit of the stored rows (default 512)
+
+Example Usage:
+    >>> cache = page_cache.PageCache('clean_cache.sqlite3')
+    >>> key = cache.key(page_html)
+    >>> cache.get(key) is None
+    True
+    >>> cache.put(key, rows)
+    >>> cache.get(key) == rows
+    True
+    >>> cache.close()
+
+.. seealso::
+   :func:`clean.clean_pages` for the cleaning loop that uses the cache
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+
+# Directory of the scraper's caches (page, detail page and LLM result caches),
+# next to this module unless set, so the working directory does not matter
+CACHE_DIR = os.getenv('SCRAPER_CACHE_DIR',
+                      os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cache'))
+
+DEFAULT_CACHE_PATH = os.getenv('CLEAN_CACHE_PATH', os.path.join(CACHE_DIR, 'clean_cache.sqlite3'))
+
+CACHE_MAX_BYTES = int(float(os.getenv('CLEAN_CACHE_MAX_MB', '512')) * 1024 * 1024)
+
+# Pages kept after eviction, as a fraction of max_bytes
+EVICT_TO = 0.9
+
+
+class PageCache:
+    """
+    SQLite cache of cleaned rows keyed by page content hash, with LRU size eviction.
+
+    :param path: SQLite file, created if missing
+    :type path: str, optional
+    :param max_bytes: Total size of stored rows before eviction starts
+    :type max_bytes: int, optional
+    :param version: Parser version mixed into every key
+    :type version: str or int, optional
+
+    Example:
+        >>> with PageCache('clean_cache.sqlite3', max_bytes=64 * 1024 * 1024) as cache:
+        ...     rows = cache.get(cache.key(html))
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=CACHE_MAX_BYTES, version=1):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.version = str(version).encode('utf-8')
+        self.stats = {"hits": 0, "misses": 0, "evicted": 0}
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages(
+                key TEXT PRIMARY KEY,
+                rows BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS pages_last_used ON pages(last_used)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def key(self, html):
+        """
+        Return the cache key of a raw page.
+
+        :param html: Raw page content
+        :type html: str or bytes
+        :return: SHA-256 hex digest of the parser version and the page
+        :rtype: str
+        """
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        return hashlib.sha256(self.version + b'\0' + html).hexdigest()
+
+    def get(self, key):
+        """
+        Return the cached rows for a key, or None on a miss.
+
+        :param key: Key from :meth:`key`
+        :type key: str
+        :rtype: list[dict] or None
+        """
+        found = self.conn.execute("SELECT rows FROM pages WHERE key = ?", (key,)).fetchone()
+        if found is None:
+            self.stats["misses"] += 1
+            return None
+        self.stats["hits"] += 1
+        self.conn.execute("UPDATE pages SET last_used = ? WHERE key = ?", (time.time(), key))
+        return json.loads(zlib.decompress(found[0]))
+
+    def put(self, key, rows):
+        """
+        Store the rows of a page, evicting old pages when over the size limit.
+
+        :param key: Key from :meth:`key`
+        :type key: str
+        :param rows: Rows parsed from the page (JSON-serializable)
+        :type rows: list[dict]
+        """
+        blob = zlib.compress(json.dumps(rows, ensure_ascii=False).encode('utf-8'))
+        old = self.conn.execute("SELECT size FROM pages WHERE key = ?", (key,)).fetchone()
+        self.conn.execute("INSERT OR REPLACE INTO pages(key, rows, size, last_used) VALUES (?, ?, ?, ?)",
+                          (key, blob, len(blob), time.time()))
+        self.total_bytes += len(blob) - (old[0] if old else 0)
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Delete least recently used pages until the cache is under EVICT_TO of max_bytes."""
+        target = self.max_bytes * EVICT_TO
+        doomed = []
+        for key, size in self.conn.execute("SELECT key, size FROM pages ORDER BY last_used"):
+            if self.total_bytes <= target:
+                break
+            doomed.append((key,))
+            self.total_bytes -= size
+        self.conn.executemany("DELETE FROM pages WHERE key = ?", doomed)
+        self.stats["evicted"] += len(doomed)
+        self.conn.commit()
+
+    def close(self):
+        """Commit pending writes and close the database."""
+        self.conn.commit()
+        self.conn.close()
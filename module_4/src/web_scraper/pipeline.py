@@ -0,0 +1,226 @@
+"""
+Module for running the rescrape as a streaming, overlapping pipeline.
+
+The batch rescrape runs ``scrape.main()``, ``clean.main()`` and the database
+load one after another, with a full file handoff between each step. This
+module connects the same building blocks with bounded queues instead, so
+every stage works at the same time:
+
+1. **Fetch + parse**: :func:`scrape.iter_pages` keeps several pages in flight
+   (paced by the shared controller, see :func:`scrape.get_controller`) and,
+   in fused mode, extracts the applicant rows from each page as soon as
+   it arrives. Raw pages are appended to the page archive as they come in.
+2. **Standardize**: rows stream through the LLM model, loaded once and kept
+   in this process (:func:`clean.llm_standardize_stream`), while later pages
+   still download.
+3. **Load**: standardized rows are committed in batches with
+   :func:`load_data.insert_applicant_rows` over one database connection,
+   held for the whole stage, while later rows are still being standardized.
+
+Each queue is bounded, so a slow stage pushes back on the stages before it
+instead of letting work pile up in memory. End-to-end time approaches the
+time of the slowest stage rather than the sum of all of them.
+
+.. note::
+   If any stage fails, the other stages are told to stop, and the first error
+   is raised from :func:`run` once all stage threads have finished. Batches
+   committed before the failure stay in the database, but the crawl cursor
+   only advances once every stage has finished without error, so the next
+   run fetches the pages whose rows were not stored.
+
+Example Usage:
+    >>> import pipeline
+    >>> pipeline.run()
+    Page 1: 25 new results out of 25 total
+    ...
+    Loaded batch of 50 rows (0 already in the database)
+    {'pages': 3, 'rows': 62, 'batches': 2, 'skipped': 0}
+
+.. seealso::
+   :mod:`scrape` for page fetching
+   :mod:`clean` for row extraction and LLM standardization
+   :mod:`load_data` for database insertion
+"""
+
+import itertools
+import os
+import queue
+import threading
+
+import clean
+import enrich
+import load_data
+import raw_archive
+import scrape
+
+# Rows committed per database transaction
+LOAD_BATCH_SIZE = int(os.getenv('PIPELINE_LOAD_BATCH_SIZE', '50'))
+
+# Maximum items waiting between two stages before the producer blocks
+QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '16'))
+
+# Marks the end of a stage's output
+_DONE = object()
+
+
+def _put(q, item, stop):
+    """Put an item on a bounded queue, giving up if the pipeline is stopping."""
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _drain(q, stop):
+    """Yield items from a queue until the end marker or a pipeline stop."""
+    while not stop.is_set():
+        try:
+            item = q.get(timeout=0.1)
+        except queue.Empty:
+            continue
+        if item is _DONE:
+            return
+        yield item
+
+
+def run(concurrency=scrape.SCRAPE_CONCURRENCY, batch_size=LOAD_BATCH_SIZE,
+        queue_size=QUEUE_SIZE, archive_path=scrape.RAW_ARCHIVE_PATH, llm_dir=None,
+        enrich_details=clean.ENRICH_DETAILS):
+    """
+    Run fetch, parse, standardize and load as overlapping pipeline stages.
+
+    :param concurrency: Number of survey pages fetched in parallel
+    :type concurrency: int, optional
+    :param batch_size: Rows committed per database transaction
+    :type batch_size: int, optional
+    :param queue_size: Capacity of each inter-stage queue (backpressure)
+    :type queue_size: int, optional
+    :param archive_path: Raw page archive to append pages to, or None to skip it
+    :type archive_path: str or None, optional
+    :param llm_dir: Directory containing the LLM app.py (see clean.llm_standardize_stream)
+    :type llm_dir: str, optional
+    :param enrich_details: Fill empty fields of each page's rows from their
+        detail pages before standardization (see :func:`enrich.enrich_rows`)
+    :type enrich_details: bool, optional
+    :return: Counts of pages fetched, rows loaded, batches committed and rows
+        skipped because their result_id was already stored
+    :rtype: dict
+    :raises Exception: The first error raised by any stage
+
+    Stage Threads:
+        - fetch: iterates scrape.iter_pages(fused=True), archives each raw
+          page, optionally enriches its rows and queues them
+        - standardize: feeds queued rows through the resident LLM model and
+          queues the standardized rows
+        - load: groups rows into batches of ``batch_size`` and commits each
+          batch over a single connection from scrape.db_pool
+
+    The crawl cursor is moved to the newest loaded result ID after all three
+    stages have succeeded.
+
+    Example:
+        >>> run(concurrency=8, batch_size=100)
+        {'pages': 3, 'rows': 62, 'batches': 1, 'skipped': 0}
+    """
+    pages_q = queue.Queue(maxsize=queue_size)
+    rows_q = queue.Queue(maxsize=queue_size * batch_size)
+    stop = threading.Event()
+    errors = []
+    stats = {"pages": 0, "rows": 0, "batches": 0, "skipped": 0}
+    newest_ids = []
+
+    def fetch():
+        archive = raw_archive.RawArchive.create(archive_path) if archive_path else None
+        high_water_mark = scrape.get_high_water_mark()
+        pages = scrape.iter_pages(concurrency=concurrency, high_water_mark=high_water_mark, fused=True)
+        try:
+            for entry in pages:
+                if archive is not None:
+                    archive.append(entry['page'], entry['html'])
+                stats["pages"] += 1
+                if enrich_details:
+                    enrich.enrich_rows(entry['rows'])
+                if not _put(pages_q, entry['rows'], stop):
+                    break
+        finally:
+            pages.close()
+
+    def standardize():
+        def rows():
+            for page_rows in _drain(pages_q, stop):
+                yield from page_rows
+
+        pending = rows()
+        first = next(pending, None)
+        if first is None:
+            return  # Nothing new, so skip starting the model at all
+
+        for row in clean.llm_standardize_stream(itertools.chain([first], pending), llm_dir=llm_dir):
+            if not _put(rows_q, row, stop):
+                break
+
+    def load():
+        load_data.ensure_schema()
+        with scrape.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                def commit(batch):
+                    result_ids = load_data.insert_applicant_rows(cur, batch)
+                    inserted = cur.rowcount
+                    conn.commit()
+                    loaded_ids = [result_id for result_id in result_ids if result_id is not None]
+                    if loaded_ids:
+                        newest_ids.append(max(loaded_ids))
+                    stats["rows"] += inserted
+                    stats["skipped"] += len(batch) - inserted
+                    stats["batches"] += 1
+                    print(f"Loaded batch of {len(batch)} rows ({len(batch) - inserted} already in the database)")
+
+                batch = []
+                for row in _drain(rows_q, stop):
+                    batch.append(row)
+                    if len(batch) >= batch_size:
+                        commit(batch)
+                        batch = []
+                if batch and not stop.is_set():
+                    commit(batch)
+
+    def stage(target, output):
+        try:
+            target()
+        except Exception as e:
+            errors.append(e)
+            stop.set()
+        finally:
+            if output is not None:
+                _put(output, _DONE, stop)
+
+    threads = [
+        threading.Thread(target=stage, args=(fetch, pages_q), name="pipeline-fetch"),
+        threading.Thread(target=stage, args=(standardize, rows_q), name="pipeline-standardize"),
+        threading.Thread(target=stage, args=(load, None), name="pipeline-load"),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if errors:
+        raise errors[0]
+
+    if newest_ids:
+        # Only a fully loaded run may move the mark past its rows
+        with scrape.db_pool.connection() as conn:
+            with conn.cursor() as cur:
+                load_data.advance_crawl_cursor(cur, [max(newest_ids)])
+            conn.commit()
+
+    if stats["pages"] == 0:
+        print("No new data to scrape.")
+    return stats
+
+
+if __name__ == "__main__":  # pragma: no cover
+    print(run())
@@ -0,0 +1,172 @@
+"""
+Module for storing raw GradCafe survey pages in a compressed, indexed archive.
+
+The scraper used to prettify every page and dump all of them into a single
+indented JSON file, which then had to be loaded back in full before cleaning.
+This module keeps the original response bytes instead. Each page is gzip
+compressed on its own and appended to a data file, and a small JSON Lines
+index records where every page starts. Any page can therefore be read without
+decompressing, or even loading, the rest of the archive.
+
+Files:
+    - <path>: concatenated gzip members, one per page (also a valid .gz file)
+    - <path>.idx: one JSON object per line with 'page', 'offset' and 'length'
+
+The index line is only written after the page bytes have been flushed, so a
+crash can at worst leave unindexed bytes at the end of the data file. Those
+bytes are ignored on read and overwritten by the next append.
+
+.. note::
+   Pages are stored as the exact bytes returned by the server. BeautifulSoup
+   accepts bytes directly, so no decoding step is needed before cleaning.
+
+Example Usage:
+    >>> import raw_archive
+    >>> archive = raw_archive.RawArchive.create('raw_pages.gz')
+    >>> archive.append(1, b'<html>...</html>')
+    >>> archive.read(1)
+    b'<html>...</html>'
+    >>> [entry['page'] for entry in archive]
+    [1]
+
+.. seealso::
+   :mod:`scrape` for writing pages to the archive
+   :mod:`clean` for reading pages back for parsing
+"""
+
+import gzip
+import json
+import os
+
+
+class RawArchive:
+    """
+    Append-only archive of gzip-compressed raw pages with an offset index.
+
+    :param path: Path of the data file; the index is stored at ``path + '.idx'``
+    :type path: str
+    :param compresslevel: gzip compression level used for new pages (1-9)
+    :type compresslevel: int, optional
+
+    .. note::
+       If the same page number is appended more than once, the latest copy
+       wins for :meth:`read`, and iteration yields each page once.
+
+    Example:
+        >>> archive = RawArchive('raw_pages.gz')
+        >>> 3 in archive
+        True
+    """
+
+    def __init__(self, path, compresslevel=6):
+        self.path = path
+        self.index_path = path + '.idx'
+        self.compresslevel = compresslevel
+        self._index = {}
+        self._end = 0
+        self._load_index()
+
+    @classmethod
+    def create(cls, path, compresslevel=6):
+        """
+        Create an empty archive, replacing any existing files at ``path``.
+
+        :param path: Path of the data file
+        :type path: str
+        :param compresslevel: gzip compression level used for new pages
+        :type compresslevel: int, optional
+        :return: The new, empty archive
+        :rtype: RawArchive
+        """
+        for filename in (path, path + '.idx'):
+            if os.path.exists(filename):
+                os.remove(filename)
+        return cls(path, compresslevel=compresslevel)
+
+    def _load_index(self):
+        """Read the offset index, ignoring a torn final line from a crash."""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self._index[entry['page']] = (entry['offset'], entry['length'])
+                self._end = max(self._end, entry['offset'] + entry['length'])
+
+    def append(self, page, html, fsync=False):
+        """
+        Compress and append one page, then record it in the index.
+
+        :param page: Survey page number
+        :type page: int
+        :param html: Raw page content; str is encoded as UTF-8
+        :type html: bytes or str
+        :param fsync: Force both files to disk before returning
+        :type fsync: bool, optional
+        :raises IOError: When the archive cannot be written
+        """
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        blob = gzip.compress(html, compresslevel=self.compresslevel)
+
+        # Write after the last indexed page so unindexed crash leftovers are overwritten
+        mode = 'r+b' if os.path.exists(self.path) else 'wb'
+        with open(self.path, mode) as f:
+            f.seek(self._end)
+            f.write(blob)
+            f.truncate()
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+
+        with open(self.index_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"page": page, "offset": self._end, "length": len(blob)}) + '\n')
+            f.flush()
+            if fsync:
+                os.fsync(f.fileno())
+
+        self._index[page] = (self._end, len(blob))
+        self._end += len(blob)
+
+    def read(self, page):
+        """
+        Return the raw bytes of a single page.
+
+        :param page: Survey page number
+        :type page: int
+        :return: Original page bytes
+        :rtype: bytes
+        :raises KeyError: When the page is not in the archive
+        """
+        offset, length = self._index[page]
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            return gzip.decompress(f.read(length))
+
+    def pages(self):
+        """
+        Return the archived page numbers in ascending order.
+
+        :return: Sorted page numbers
+        :rtype: list[int]
+        """
+        return sorted(self._index)
+
+    def __contains__(self, page):
+        return page in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+    def __iter__(self):
+        """
+        Yield ``{"page": n, "html": bytes}`` entries in page order.
+
+        Only one page is decompressed at a time, and the entries have the same
+        shape as the records in the legacy raw JSON file.
+        """
+        for page in self.pages():
+            yield {"page": page, "html": self.read(page)}
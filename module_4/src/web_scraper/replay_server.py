@@ -0,0 +1,205 @@
+"""
+Local HTTP server that replays recorded GradCafe survey pages.
+
+The scraper tests serve a few scripted pages, so they say nothing about how
+fast the real fetch/parse loop is over a full crawl. This server answers
+``/survey/?page=N`` from a raw page archive (or a backfill directory, or the
+legacy raw JSON file) the same way the real site does, so the unmodified
+scraper can be pointed at it with ``GRADCAFE_BASE_URL`` or ``scrape.BASE_URL``.
+
+Injected conditions:
+    - latency: fixed delay before every response
+    - jitter: extra uniformly random delay on top of the latency
+    - error rate: fraction of survey requests answered with HTTP 503
+    - throttle rate: fraction of survey requests answered with HTTP 429
+
+Pages that were not recorded are served as a survey page with no results, so
+the scraper stops on its usual empty-page rule. ``/robots.txt`` allows
+everything, and any other path returns 404.
+
+Example Usage:
+    $ python replay_server.py --archive update_raw_applicant_pages.gz --latency 80 --jitter 40
+    Replaying 120 pages on http://127.0.0.1:8765
+
+    $ GRADCAFE_BASE_URL=http://127.0.0.1:8765 python scrape.py
+
+    >>> server, base_url = replay_server.start(pages, latency=0.05)
+    >>> scrape.BASE_URL = base_url
+    >>> server.shutdown()
+
+.. seealso::
+   :mod:`bench` for the scraper throughput benchmark built on this server
+"""
+
+import argparse
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import backfill
+import clean
+
+EMPTY_PAGE = b"<html><body><table><tbody></tbody></table></body></html>"
+
+
+def load_pages(source=clean.RAW_ARCHIVE_PATH, json_path=clean.RAW_JSON_PATH):
+    """
+    Load recorded pages into memory, keyed by page number.
+
+    :param source: Raw page archive, or a backfill output directory
+    :type source: str, optional
+    :param json_path: Legacy raw JSON file used when the archive is missing
+    :type json_path: str, optional
+    :return: Mapping of page number to page bytes
+    :rtype: dict[int, bytes]
+    """
+    if os.path.isdir(source):
+        entries = backfill.iter_archived_pages(source)
+    else:
+        entries = clean.load_pages(source, json_path)
+
+    pages = {}
+    for entry in entries:
+        html = entry['html']
+        pages[entry['page']] = html.encode('utf-8') if isinstance(html, str) else html
+    return pages
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Serve recorded survey pages with the server's injected conditions."""
+
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real site
+
+    def log_message(self, format, *args):
+        pass  # One line per request would swamp benchmark output
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+
+        if url.path == "/robots.txt":
+            self._send(200, b"User-agent: *\nAllow: /\n")
+            return
+        if url.path.rstrip("/") != "/survey":
+            self._send(404)
+            return
+
+        server.count("requests")
+        delay = server.latency + random.uniform(0, server.jitter)
+        if delay:
+            time.sleep(delay)
+
+        roll = random.random()
+        if roll < server.error_rate:
+            server.count("errors")
+            self._send(503)
+            return
+        if roll < server.error_rate + server.throttle_rate:
+            server.count("throttled")
+            self._send(429, headers={"Retry-After": "1"})
+            return
+
+        try:
+            page = int(parse_qs(url.query).get("page", ["1"])[0])
+        except ValueError:
+            self._send(400)
+            return
+        self._send(200, server.pages.get(page, EMPTY_PAGE))
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding the recorded pages and injection settings.
+
+    :param address: (host, port) to bind; port 0 picks a free port
+    :type address: tuple[str, int]
+    :param pages: Mapping of page number to page bytes
+    :type pages: dict[int, bytes]
+    :param latency: Seconds added to every survey response
+    :type latency: float, optional
+    :param jitter: Maximum extra random seconds per survey response
+    :type jitter: float, optional
+    :param error_rate: Fraction of survey requests answered with HTTP 503
+    :type error_rate: float, optional
+    :param throttle_rate: Fraction of survey requests answered with HTTP 429
+    :type throttle_rate: float, optional
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, pages, latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0):
+        super().__init__(address, ReplayHandler)
+        self.pages = pages
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0}
+        self._stats_lock = threading.Lock()
+
+    def count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    @property
+    def base_url(self):
+        """Root URL to use as scrape.BASE_URL."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start(pages, host="127.0.0.1", port=0, **conditions):
+    """
+    Start a replay server on a background thread.
+
+    :param pages: Mapping of page number to page bytes
+    :type pages: dict[int, bytes]
+    :param host: Interface to bind
+    :type host: str, optional
+    :param port: Port to bind; 0 picks a free port
+    :type port: int, optional
+    :param conditions: latency, jitter, error_rate and throttle_rate for ReplayServer
+    :return: The running server and its base URL; call ``server.shutdown()`` when done
+    :rtype: tuple[ReplayServer, str]
+    """
+    server = ReplayServer((host, port), pages, **conditions)
+    threading.Thread(target=server.serve_forever, name="replay-server", daemon=True).start()
+    return server, server.base_url
+
+
+if __name__ == "__main__":  # pragma: no cover
+    parser = argparse.ArgumentParser(description="Replay recorded GradCafe survey pages over HTTP.")
+    parser.add_argument("--archive", default=clean.RAW_ARCHIVE_PATH,
+                        help="Raw page archive or backfill directory to replay.")
+    parser.add_argument("--json", default=clean.RAW_JSON_PATH, help="Legacy raw JSON fallback.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to bind.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to bind.")
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds added to every response.")
+    parser.add_argument("--jitter", type=float, default=0, help="Maximum extra random milliseconds.")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests answered with 503.")
+    parser.add_argument("--throttle-rate", type=float, default=0, help="Fraction of requests answered with 429.")
+    args = parser.parse_args()
+
+    recorded = load_pages(args.archive, args.json)
+    server = ReplayServer((args.host, args.port), recorded, latency=args.latency / 1000,
+                          jitter=args.jitter / 1000, error_rate=args.error_rate,
+                          throttle_rate=args.throttle_rate)
+    print(f"Replaying {len(recorded)} pages on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -8,9 +8,16 @@ HTML data for subsequent cleaning and processing.
 
 The scraping process is designed to be efficient and respectful:
 - Checks existing database entries to avoid duplicate scraping
-- Stops automatically when no new data is found across multiple pages
+- Stops at the crawl cursor's high-water mark, the highest result ID of the
+  last fully loaded run, once a page's IDs are confirmed to be stored
+- Otherwise stops automatically when no new data is found across multiple pages
 - Uses connection pooling for efficient HTTP requests
-- Saves raw HTML data in structured JSON format for processing
+- Bounds every request with timeouts, retries throttled or failed requests
+  with jittered backoff, and fails fast through a circuit breaker
+- Adapts the number of requests in flight to the site's latency and 429/5xx
+  responses (AIMD), and honors the Crawl-delay in robots.txt
+- Saves the original page bytes to a compressed, indexed page archive
+- Optionally hands each parsed page straight to the cleaning stage (fused mode)
 
 .. note::
    This module requires network connectivity and access to The GradCafe website.
@@ -22,24 +29,27 @@ The scraping process is designed to be efficient and respectful:
 
 Dependencies:
     - urllib3: For HTTP request handling with connection pooling
-    - BeautifulSoup4: For HTML parsing and link extraction
+    - http_client: For timeouts, retries and the circuit breaker around urllib3
+    - concurrent.futures: For bounded parallel page fetching
+    - lxml: For fast XPath extraction of result links (optional)
+    - BeautifulSoup4: For HTML parsing and link extraction (fallback backend)
     - psycopg_pool: For PostgreSQL database connectivity
-    - json: For data serialization
+    - json_stream: For writing compact JSON Lines (save_data)
+    - raw_archive: For the compressed per-page HTML archive
+    - clean: For extracting applicant rows from already-parsed pages in fused mode
 
 Database Requirements:
     - PostgreSQL database with 'applicants' table
-    - Table must have 'url' field containing result URLs
-    - URLs should follow pattern '/result/{id}' for ID extraction
+    - Table must have an indexed 'result_id' column (see load_data.create_applicant_table)
 
 Output:
-    - update_raw_applicant_data.json: Raw HTML content with page metadata
+    - update_raw_applicant_pages.gz: gzip-compressed raw HTML, one member per page
+    - update_raw_applicant_pages.gz.idx: page offset index for random access
 
 Example Usage:
     >>> import scrape
     >>> scrape.main()
-    Checking page 1...
     Page 1: 25 new results out of 25 total
-    Checking page 2...
     Page 2: 20 new results out of 25 total
     ...
 
@@ -48,24 +58,94 @@ Example Usage:
    :mod:`load_data` for database operations
 """
 
-import urllib3
-from bs4 import BeautifulSoup   
-import json
+from bs4 import BeautifulSoup
 import psycopg_pool
 import os
+from concurrent.futures import ThreadPoolExecutor
+import raw_archive
+import clean
+import http_client
+import json_stream
+
+try:
+    import lxml.html
+except ImportError:  # lxml is listed in requirements.txt, but keep bs4 working without it
+    lxml = None
 
 DATABASE_URL = os.getenv('DATABASE_URL', "postgresql://postgres@localhost:5432/module_3_db")
 db_pool = psycopg_pool.ConnectionPool(DATABASE_URL)
 
-http = urllib3.PoolManager()
+# Raw page archive written by main() and read by clean.main()
+RAW_ARCHIVE_PATH = 'jhu_software_concepts/module_3/web_scraper/update_raw_applicant_pages.gz'
+
+# Name of the crawl_cursor row maintained by load_data.add_applicant_data
+CRAWL_CURSOR_NAME = 'gradcafe_survey'
+
+# Backend used to pull result IDs out of a page: 'lxml' (fast path) or 'bs4'
+EXTRACTOR_BACKEND = os.getenv('SCRAPE_EXTRACTOR', 'lxml')
+
+# Number of survey pages kept in flight at once (the starting point when adaptive)
+SCRAPE_CONCURRENCY = int(os.getenv('SCRAPE_CONCURRENCY', '8'))
+
+# Upper bound for the adaptive concurrency limit
+SCRAPE_MAX_CONCURRENCY = int(os.getenv('SCRAPE_MAX_CONCURRENCY', '32'))
+
+# Set to 0 to keep the concurrency limit fixed (the crawl delay still applies)
+SCRAPE_ADAPTIVE = os.getenv('SCRAPE_ADAPTIVE', '1') != '0'
+
+# Size the connection pool so every in-flight page can reuse a keep-alive socket.
+# All requests share one circuit breaker, so a failing site stops the whole crawl fast.
+http = http_client.ResilientClient(maxsize=SCRAPE_MAX_CONCURRENCY)
+
+# Site root; point at a replay_server.py instance to benchmark offline
+BASE_URL = os.getenv('GRADCAFE_BASE_URL', 'https://www.thegradcafe.com')
+
+def get_controller(initial=SCRAPE_CONCURRENCY, adaptive=SCRAPE_ADAPTIVE, processes=1):
+    """
+    Return the controller that paces and limits every request made through :data:`http`.
+
+    The first call reads The GradCafe's robots.txt and attaches one
+    :class:`http_client.AdaptiveConcurrency` to the shared client (see
+    :meth:`http_client.ResilientClient.pace`); later calls return the same
+    controller. Every entry point that fetches survey pages calls this, so
+    the crawl delay applies to the batch scrape, the streaming pipeline, the
+    boundary search and the crawl queue alike.
+
+    :param initial: Starting limit on requests in flight
+    :type initial: int, optional
+    :param adaptive: Adjust the limit with AIMD; when False it stays at ``initial``
+    :type adaptive: bool, optional
+    :param processes: Local processes crawling at once; each one spaces its
+        requests by ``processes`` times the crawl delay
+    :type processes: int, optional
+    :return: The shared controller
+    :rtype: http_client.AdaptiveConcurrency
+
+    .. note::
+       The options only take effect on the first call in a process.
+
+    Example:
+        >>> get_controller(initial=8).limit
+        8
+    """
+    if adaptive:
+        options = {"initial": initial, "max_limit": SCRAPE_MAX_CONCURRENCY}
+    else:
+        options = {"initial": initial, "min_limit": initial, "max_limit": initial}
+    first = http.controller is None
+    controller = http.pace(BASE_URL, processes=processes, **options)
+    if first and controller.crawl_delay:
+        print(f"Honoring robots.txt crawl delay of {controller.crawl_delay}s")
+    return controller
 
-def save_data(data, filename='raw_applicant_data.json'):
+def save_data(data, filename='raw_applicant_data.jsonl'):
     """
-    Save scraped HTML data to a JSON file with proper formatting.
+    Save scraped HTML data to a compact JSON Lines file.
     
-    This function serializes the list of scraped page data to JSON format,
-    preserving the page numbers and HTML content for subsequent processing.
-    The output is formatted with indentation for human readability.
+    This function writes one page per line with no indentation (see
+    :func:`json_stream.write_file`), preserving the page numbers and HTML
+    content for subsequent processing; :func:`clean.load_pages` streams it
+    back one page at a time.
     
     :param data: List of dictionaries containing scraped HTML and page metadata
     :type data: list[dict]
@@ -79,20 +159,41 @@ def save_data(data, filename='raw_applicant_data.json'):
        representing the page number and raw HTML content respectively.
        
     Data Structure:
-        [
-            {"page": 1, "html": "<html>...</html>"},
-            {"page": 2, "html": "<html>...</html>"},
-            ...
-        ]
+        {"page":1,"html":"<html>...</html>"}
+        {"page":2,"html":"<html>...</html>"}
+        ...
         
     Example:
         >>> scraped_pages = [{"page": 1, "html": "<html>content</html>"}]
-        >>> save_data(scraped_pages, "raw_data.json")
+        >>> save_data(scraped_pages, "raw_data.jsonl")
     """ 
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=2)
+    json_stream.write_file(filename, data)
    
 
+def save_archive(data, filename=RAW_ARCHIVE_PATH):
+    """
+    Save scraped pages to a compressed raw page archive.
+
+    Each page is gzip-compressed on its own and indexed by page number, so
+    :mod:`clean` can stream pages back one at a time instead of loading a
+    single large JSON document. Any previous archive at ``filename`` is replaced.
+
+    :param data: List of dictionaries with 'page' and 'html' keys
+    :type data: list[dict]
+    :param filename: Path to the archive data file
+    :type filename: str, optional
+    :return: The written archive
+    :rtype: raw_archive.RawArchive
+    :raises IOError: When the archive cannot be written
+
+    Example:
+        >>> save_archive([{"page": 1, "html": b"<html>content</html>"}])
+    """
+    archive = raw_archive.RawArchive.create(filename)
+    for entry in data:
+        archive.append(entry['page'], entry['html'])
+    return archive
+
 def scrape_data(url):
     """
     Fetch and return the prettified HTML content of the given URL.
@@ -105,17 +206,16 @@ def scrape_data(url):
     :type url: str
     :return: Prettified HTML content of the page
     :rtype: str
-    :raises urllib3.exceptions.HTTPError: When HTTP request fails
-    :raises urllib3.exceptions.TimeoutError: When request times out
+    :raises urllib3.exceptions.HTTPError: When HTTP request fails after retries
+    :raises urllib3.exceptions.TimeoutError: When request times out after retries
+    :raises http_client.CircuitOpenError: When recent requests kept failing
     :raises Exception: When HTML parsing fails
     
     .. note::
-       This function uses the global urllib3.PoolManager for connection reuse
-       and improved performance across multiple requests.
-       
-    .. warning::
-       No rate limiting is implemented. Consider adding delays between
-       requests for large-scale scraping operations.
+       This function uses the global http_client.ResilientClient for connection
+       reuse, timeouts and retries across multiple requests. Requests are
+       paced by the robots.txt crawl delay and the adaptive concurrency limit
+       (see :func:`get_controller`).
        
     Example:
         >>> html_content = scrape_data("https://www.thegradcafe.com/survey/?page=1")
@@ -125,36 +225,39 @@ def scrape_data(url):
         <head>
         ...
     """
+    get_controller()
     page = http.request('GET', url)
     soup = BeautifulSoup(page.data, 'html.parser')
     return soup.prettify()
 
-def get_existing_ids():
+def find_existing_ids(result_ids):
     """
-    Query database and retrieve existing result IDs from the URL field.
+    Return which of the given result IDs are already stored in the database.
     
-    This function connects to the PostgreSQL database and extracts result IDs
-    from existing applicant URLs. It uses regex pattern matching to extract
-    numeric IDs from URLs that follow The GradCafe's '/result/{id}' format.
-    The function returns a set of existing IDs for efficient duplicate checking.
+    This function checks only the IDs seen on a single page against the
+    indexed ``result_id`` column of the applicants table. Each membership test
+    is a unique-index probe, so the scraper never has to pull every stored ID
+    into memory.
     
-    :return: Set of existing result IDs, or empty set if query fails
+    :param result_ids: Result IDs found on a scraped page
+    :type result_ids: set[int]
+    :return: Subset of result_ids already in the database, or empty set if query fails
     :rtype: set[int]
     :raises psycopg.Error: When database connection or query fails
     
     .. note::
-       The function extracts IDs using SQL SUBSTRING with regex pattern
-       '/result/([0-9]+)' and casts results to INTEGER for proper comparison.
+       Requires the ``result_id`` column and unique index created by
+       :func:`load_data.create_applicant_table` (or added to an older table
+       with :func:`load_data.add_result_id_column`).
        
     .. warning::
        If database connection fails, the function returns an empty set and
        continues execution, which may result in duplicate data scraping.
        
     SQL Query Logic:
-        - Filters for URLs containing '/result/' pattern
-        - Extracts numeric ID using SUBSTRING with regex
-        - Casts extracted strings to INTEGER
-        - Returns DISTINCT values to avoid duplicates
+        - Passes the page's IDs as a single array parameter
+        - Matches them with ``result_id = ANY(%s)`` using the unique index
+        - Returns only the IDs that were found
         
     Error Handling:
         - Catches all database exceptions
@@ -163,24 +266,20 @@ def get_existing_ids():
         - Warns about potential duplicate data collection
         
     Example:
-        >>> existing_ids = get_existing_ids()
-        >>> print(len(existing_ids))
-        1250
-        >>> print(list(existing_ids)[:5])
-        [12345, 12346, 12347, 12348, 12349]
+        >>> find_existing_ids({12345, 99999})
+        {12345}
     """
-    try:
+    if not result_ids:
+        return set()
 
+    try:
         with db_pool.connection() as conn:
             cur = conn.cursor()
             cur.execute("""
-                        SELECT DISTINCT 
-                        CAST(
-                            SUBSTRING(url FROM '/result/([0-9]+)') AS INTEGER
-                        ) as result_id
-                    FROM applicants 
-                    WHERE url LIKE '%/result/%'
-                        """)
+                    SELECT result_id
+                    FROM applicants
+                    WHERE result_id = ANY(%s)
+                        """, (list(result_ids),))
             results = cur.fetchall()
             existing_ids = set(row[0] for row in results)
             return existing_ids
@@ -189,7 +288,109 @@ def get_existing_ids():
         print("Continuing with empty set - may scrape duplicate data")
         return set()
 
-def new_results(page_number, existing_ids):
+def get_high_water_mark():
+    """
+    Read the highest result ID already ingested from the crawl cursor.
+
+    The cursor is advanced by :func:`load_data.add_applicant_data` only after
+    a whole run of rows has been committed. A run that failed part-way can
+    still leave older rows below the mark missing, so the mark alone never
+    ends a crawl; see :func:`new_results`.
+
+    :return: The high-water mark, or None if no cursor exists or the query fails
+    :rtype: int or None
+
+    .. note::
+       Returning None disables the early stop and falls back to the
+       consecutive-empty-page rule.
+
+    Example:
+        >>> get_high_water_mark()
+        987654
+    """
+    try:
+        with db_pool.connection() as conn:
+            cur = conn.cursor()
+            cur.execute("""
+                    SELECT high_water_mark
+                    FROM crawl_cursor
+                    WHERE name = %s
+                        """, (CRAWL_CURSOR_NAME,))
+            row = cur.fetchone()
+            return row[0] if row else None
+    except Exception as e:
+        print(f"Error reading crawl cursor: {e}")
+        print("Continuing without high-water mark")
+        return None
+
+def _parse_result_id(href):
+    """Return the integer ID from a '/result/{id}' href, or None if it has none."""
+    if '/result/' not in href:
+        return None
+    try:
+        return int(href.split('/result/')[-1])
+    except (IndexError, ValueError):
+        return None
+
+def _result_ids_from_soup(soup):
+    """Collect result IDs from the links of an already-parsed BeautifulSoup page."""
+    page_result_ids = set()
+    for link in soup.find_all('a', href=True):
+        result_id = _parse_result_id(link['href'])
+        if result_id is not None:
+            page_result_ids.add(result_id)
+    return page_result_ids
+
+def _extract_ids_bs4(html):
+    """Extract result IDs by building a full BeautifulSoup tree (fallback backend)."""
+    return _result_ids_from_soup(BeautifulSoup(html, 'html.parser'))
+
+def _extract_ids_lxml(html):
+    """Extract result IDs with one lxml parse and an XPath over the href attributes."""
+    if not html or not html.strip():
+        return set()
+    tree = lxml.html.fromstring(html)
+    page_result_ids = set()
+    for href in tree.xpath("//a[contains(@href, '/result/')]/@href"):
+        result_id = _parse_result_id(href)
+        if result_id is not None:
+            page_result_ids.add(result_id)
+    return page_result_ids
+
+EXTRACTORS = {
+    'lxml': _extract_ids_lxml,
+    'bs4': _extract_ids_bs4,
+}
+
+def extract_result_ids(html, backend=None):
+    """
+    Extract the set of GradCafe result IDs linked from a survey page.
+
+    The lxml backend only runs an XPath over ``<a href>`` attributes and never
+    builds a BeautifulSoup tree. The bs4 backend is the original
+    implementation and is used whenever lxml is not installed.
+
+    :param html: Raw page content
+    :type html: bytes or str
+    :param backend: 'lxml' or 'bs4'; defaults to EXTRACTOR_BACKEND
+        (environment variable SCRAPE_EXTRACTOR)
+    :type backend: str, optional
+    :return: Result IDs found in links containing '/result/'
+    :rtype: set[int]
+    :raises ValueError: When the backend name is unknown
+
+    Example:
+        >>> extract_result_ids(b'<a href="/result/42">See More</a>')
+        {42}
+    """
+    backend = backend or EXTRACTOR_BACKEND
+    if backend not in EXTRACTORS:
+        raise ValueError(f"Unknown extractor backend: {backend}")
+    if backend == 'lxml' and lxml is None:
+        backend = 'bs4'
+    return EXTRACTORS[backend](html)
+
+def new_results(page_number, existing_ids=None, high_water_mark=None, fused=False):
     """
     Check a specific page for new results not already in the database.
     
@@ -200,29 +401,43 @@ def new_results(page_number, existing_ids):
     
     :param page_number: Page number to scrape from The GradCafe
     :type page_number: int
-    :param existing_ids: Set of result IDs already in database
-    :type existing_ids: set[int]
-    :return: Tuple containing (has_new_data, total_ids, new_ids_count, html_content)
-    :rtype: tuple[bool, int, int, str|None]
-    :raises urllib3.exceptions.HTTPError: When HTTP request fails
+    :param existing_ids: Known result IDs; when None, the page's IDs are looked
+        up in the database with :func:`find_existing_ids`
+    :type existing_ids: set[int], optional
+    :param high_water_mark: Highest result ID already ingested, if known
+    :type high_water_mark: int, optional
+    :param fused: Also extract applicant rows from the already-parsed page
+    :type fused: bool, optional
+    :return: Tuple containing (has_new_data, total_ids, new_ids_count, html_content, reached_mark)
+    :rtype: tuple[bool, int, int, bytes|dict|None, bool]
+    :raises urllib3.exceptions.HTTPError: When HTTP request fails after retries
     :raises Exception: When HTML parsing fails
     
     .. note::
        The function only returns HTML content if new results are found,
-       optimizing storage and processing for relevant data only.
+       optimizing storage and processing for relevant data only. The content
+       is the original response body, not a prettified re-serialization.
        
     Return Values:
         - has_new_data (bool): True if page contains new results
         - total_ids (int): Total number of result IDs found on page
         - new_ids_count (int): Number of new IDs not in database
-        - html_content (str|None): Prettified HTML if new data found, None otherwise
+        - html_content (bytes|None): Raw page bytes if new data found, None otherwise.
+          In fused mode this is a dict with 'html' (raw bytes) and 'rows'
+          (records from :func:`clean.clean_html` built from the same parse,
+          covering only the page's new IDs)
+        - reached_mark (bool): True if every ID on the page is at or below the
+          high-water mark and all of them are already stored, meaning older
+          pages hold nothing new. A page below the mark that still has new
+          IDs (rows lost by an earlier failed load) does not stop the crawl.
         
     Processing Logic:
         1. Constructs URL for specified page number
         2. Fetches page content via HTTP GET request
-        3. Parses HTML to find all links containing '/result/'
+        3. Finds all links containing '/result/' with :func:`extract_result_ids`
+           (in fused mode, with the BeautifulSoup tree that is also cleaned)
         4. Extracts numeric IDs from result URLs
-        5. Compares page IDs against existing database IDs
+        5. Compares page IDs against existing database IDs (index lookup)
         6. Returns HTML content only if new data is present
         
     URL Pattern Matching:
@@ -233,36 +448,303 @@ def new_results(page_number, existing_ids):
         
     Example:
         >>> existing = {12345, 12346, 12347}
-        >>> has_new, total, new_count, html = new_results(1, existing)
+        >>> has_new, total, new_count, html, reached_mark = new_results(1, existing)
         >>> print(f"Page 1: {new_count} new out of {total} total")
         Page 1: 22 new out of 25 total
         >>> print(has_new)
         True
     """
-    url = f"https://www.thegradcafe.com/survey/?page={page_number}"
+    url = f"{BASE_URL}/survey/?page={page_number}"
     page = http.request('GET', url)
-    soup = BeautifulSoup(page.data, 'html.parser')
 
-    links = soup.find_all('a', href=True)
-    page_result_ids = set()
+    if fused:
+        # The cleaner needs a BeautifulSoup tree anyway, so parse once for both
+        soup = BeautifulSoup(page.data, 'html.parser')
+        page_result_ids = _result_ids_from_soup(soup)
+    else:
+        page_result_ids = extract_result_ids(page.data)
 
-    for link in links:
-        href = link['href']
-        if '/result/' in href:
-            try:
-                result_id = int(href.split('/result/')[-1])
-                page_result_ids.add(result_id)
-            except (IndexError, ValueError):
-                continue
+    if existing_ids is None:
+        existing_ids = find_existing_ids(page_result_ids)
 
     new_ids = page_result_ids - existing_ids
     has_new = len(new_ids) > 0
 
-    html_content = soup.prettify() if has_new else None 
+    html_content = page.data if has_new else None
+    if has_new and fused:
+        # Reuse this parse for cleaning instead of re-parsing the saved HTML,
+        # and skip the rows this page already has in the database
+        rows = clean.clean_html(soup, known_ids=page_result_ids & existing_ids)
+        html_content = {"html": page.data, "rows": rows}
+
+    # The mark only ends the crawl once the page's IDs are confirmed stored
+    reached_mark = (
+        high_water_mark is not None
+        and bool(page_result_ids)
+        and not has_new
+        and max(page_result_ids) <= high_water_mark
+    )
+
+    return has_new, len(page_result_ids), len(new_ids), html_content, reached_mark
+
+def _page_entry(page_number, html_content, fused):
+    """Build the {'page', 'html'[, 'rows']} record for a page with new results."""
+    entry = {"page": page_number}
+    if fused:
+        entry.update(html_content)
+    else:
+        entry["html"] = html_content
+    return entry
+
+def iter_pages(existing_ids=None, concurrency=SCRAPE_CONCURRENCY, max_empty_pages=5, start_page=1,
+               high_water_mark=None, fused=False, controller=None, adaptive=SCRAPE_ADAPTIVE):
+    """
+    Fetch survey pages concurrently and yield pages with new results in page order.
+
+    Pages are submitted to a thread pool so that up to the controller's limit
+    of requests are in flight through the shared http_client.ResilientClient,
+    spaced by the robots.txt crawl delay. Results
+    are consumed strictly in page order, so the consecutive-empty-page counter
+    behaves exactly like the serial loop. Each page is yielded as soon as it
+    and every earlier page have arrived, which lets a downstream stage start
+    working while later pages are still downloading.
+
+    :param existing_ids: Known result IDs; when None, each page's IDs are looked
+        up in the database as the page arrives
+    :type existing_ids: set[int], optional
+    :param concurrency: Pages fetched at the same time (the starting limit
+        when adaptive)
+    :type concurrency: int, optional
+    :param max_empty_pages: Consecutive pages without new results before stopping
+    :type max_empty_pages: int, optional
+    :param start_page: First page number to fetch
+    :type start_page: int, optional
+    :param high_water_mark: Highest result ID already ingested; the crawl stops
+        at the first page whose IDs are all at or below it and already stored
+    :type high_water_mark: int, optional
+    :param fused: Parse each page once and attach its cleaned rows under 'rows'
+    :type fused: bool, optional
+    :param controller: Limit whose ``controller.limit`` sets the window after
+        every page; defaults to the shared :func:`get_controller`
+    :type controller: http_client.AdaptiveConcurrency, optional
+    :param adaptive: Let the shared controller adjust its limit (AIMD)
+    :type adaptive: bool, optional
+    :return: Iterator of dictionaries with 'page' and 'html' keys (plus 'rows'
+        in fused mode)
+    :rtype: iterator[dict]
+    :raises urllib3.exceptions.HTTPError: When HTTP requests fail
+
+    .. note::
+       Once the stopping rule is met, pages that were fetched speculatively
+       beyond the last empty page are discarded and any queued requests are
+       cancelled. At most ``controller.max_limit - 1`` extra pages are
+       requested. Closing the iterator early cancels queued requests the
+       same way.
+
+    Example:
+        >>> for entry in iter_pages(concurrency=4):
+        ...     print(entry["page"])
+        Page 1: 25 new results out of 25 total
+        1
+        ...
+    """
+    if controller is None:
+        controller = get_controller(max(1, concurrency), adaptive)
+
+    in_flight = {}
+    next_page = start_page
+    page_number = start_page
+    empty_page_count = 0
+
+    with ThreadPoolExecutor(max_workers=controller.max_limit) as executor:
+        try:
+            while empty_page_count < max_empty_pages:
+                # Keep the window full so the pool always has work queued
+                while len(in_flight) < controller.limit:
+                    in_flight[next_page] = executor.submit(
+                        new_results, next_page, existing_ids, high_water_mark, fused
+                    )
+                    next_page += 1
+
+                has_new, total_ids, new_ids, html_content, reached_mark = in_flight.pop(page_number).result()
+
+                if has_new:
+                    print(f"Page {page_number}: {new_ids} new results out of {total_ids} total")
+                    yield _page_entry(page_number, html_content, fused)
+                    empty_page_count = 0  # Reset counter if new data is found
+                else:
+                    print(f"Page {page_number}: No new results")
+                    empty_page_count += 1
+
+                if reached_mark:
+                    print(f"Page {page_number}: reached high-water mark {high_water_mark}")
+                    break
+
+                page_number += 1
+        finally:
+            for future in in_flight.values():
+                future.cancel()
+
+def fetch_pages(existing_ids=None, concurrency=SCRAPE_CONCURRENCY, max_empty_pages=5, start_page=1,
+                high_water_mark=None, fused=False, controller=None, adaptive=SCRAPE_ADAPTIVE):
+    """
+    Fetch survey pages concurrently and return every page with new results.
+
+    This is the list form of :func:`iter_pages`; see it for how pages are
+    kept in flight and when the crawl stops.
+
+    :param existing_ids: Known result IDs; when None, each page's IDs are looked
+        up in the database as the page arrives
+    :type existing_ids: set[int], optional
+    :param concurrency: Pages fetched at the same time (the starting limit
+        when adaptive)
+    :type concurrency: int, optional
+    :param max_empty_pages: Consecutive pages without new results before stopping
+    :type max_empty_pages: int, optional
+    :param start_page: First page number to fetch
+    :type start_page: int, optional
+    :param high_water_mark: Highest result ID already ingested
+    :type high_water_mark: int, optional
+    :param fused: Parse each page once and attach its cleaned rows under 'rows'
+    :type fused: bool, optional
+    :param controller: Concurrency limit; defaults to the shared :func:`get_controller`
+    :type controller: http_client.AdaptiveConcurrency, optional
+    :param adaptive: Let the shared controller adjust its limit (AIMD)
+    :type adaptive: bool, optional
+    :return: List of dictionaries with 'page' and 'html' keys (plus 'rows' in
+        fused mode) in page order
+    :rtype: list[dict]
+    :raises urllib3.exceptions.HTTPError: When HTTP requests fail
+
+    Example:
+        >>> pages = fetch_pages(concurrency=4)
+        Page 1: 25 new results out of 25 total
+        ...
+        >>> [p["page"] for p in pages]
+        [1, 2]
+    """
+    return list(iter_pages(existing_ids, concurrency, max_empty_pages, start_page,
+                           high_water_mark, fused, controller, adaptive))
+
+def find_new_data_boundary(existing_ids=None, high_water_mark=None, fused=False, max_page=None):
+    """
+    Find the last page with new results using a galloping (exponential) search.
+
+    GradCafe lists the newest results first, so pages with new results form a
+    prefix of the page range. Instead of walking pages one at a time, this
+    probes pages 1, 2, 4, 8, ... until a page has no new results, then binary
+    searches between the last page with new results and that page. Finding
+    the boundary takes O(log n) requests instead of O(n).
+
+    :param existing_ids: Known result IDs; when None, each probed page's IDs
+        are looked up in the database
+    :type existing_ids: set[int], optional
+    :param high_water_mark: Highest result ID already ingested, if known
+    :type high_water_mark: int, optional
+    :param fused: Extract rows from probed pages so they can be reused
+    :type fused: bool, optional
+    :param max_page: Upper bound for probing (e.g. the site's last page)
+    :type max_page: int, optional
+    :return: Tuple of (last page with new results or 0, probe results by page)
+    :rtype: tuple[int, dict[int, tuple]]
+
+    .. warning::
+       The search assumes the pages with new results are contiguous. A gap
+       of pages without new results inside the backlog ends the search
+       early, whereas the sequential crawl tolerates up to four such pages.
+
+    Example:
+        >>> boundary, probes = find_new_data_boundary()
+        >>> boundary, list(probes)
+        (37, [1, 2, 4, 8, 16, 32, 64, 48, 40, 36, 38, 37])
+    """
+    probes = {}
+
+    def has_new(page_number):
+        if page_number not in probes:
+            probes[page_number] = new_results(page_number, existing_ids, high_water_mark, fused)
+            print(f"Probe page {page_number}: {'new results' if probes[page_number][0] else 'no new results'}")
+        return probes[page_number][0]
+
+    if not has_new(1):
+        return 0, probes
+
+    # Gallop: double until a page without new results (or the last page) is found
+    low, high = 1, 2
+    while (max_page is None or high <= max_page) and has_new(high):
+        low, high = high, high * 2
+    if max_page is not None and high > max_page:
+        high = max_page + 1  # Treat one past the last page as having no new data
+        if low == max_page:
+            return low, probes
+
+    # Binary search: page `low` has new results, page `high` does not
+    while high - low > 1:
+        middle = (low + high) // 2
+        if has_new(middle):
+            low = middle
+        else:
+            high = middle
+
+    return low, probes
+
+def fetch_pages_gallop(existing_ids=None, concurrency=SCRAPE_CONCURRENCY, high_water_mark=None,
+                       fused=False, max_page=None):
+    """
+    Locate the new-data boundary by galloping search, then fetch the backlog in parallel.
 
-    return has_new, len(page_result_ids), len(new_ids), html_content
+    After :func:`find_new_data_boundary` finds the last page with new
+    results, every page up to it is fetched concurrently. Pages that were
+    already fetched as probes are reused instead of requested again. Probes
+    and fetches go through the shared controller (:func:`get_controller`), so
+    they are spaced by the robots.txt crawl delay.
+
+    :param existing_ids: Known result IDs; when None, pages are checked against
+        the database
+    :type existing_ids: set[int], optional
+    :param concurrency: Maximum number of pages fetched at the same time
+    :type concurrency: int, optional
+    :param high_water_mark: Highest result ID already ingested, if known
+    :type high_water_mark: int, optional
+    :param fused: Parse each page once and attach its cleaned rows under 'rows'
+    :type fused: bool, optional
+    :param max_page: Upper bound for the boundary search
+    :type max_page: int, optional
+    :return: List of dictionaries with 'page' and 'html' keys (plus 'rows' in
+        fused mode) in page order, same shape as :func:`fetch_pages`
+    :rtype: list[dict]
+
+    Example:
+        >>> pages = fetch_pages_gallop(concurrency=8)
+        Probe page 1: new results
+        ...
+        >>> len(pages)
+        37
+    """
+    get_controller(max(1, concurrency))
+    boundary, probes = find_new_data_boundary(existing_ids, high_water_mark, fused, max_page)
+    print(f"New-data boundary found at page {boundary} after {len(probes)} probes")
+
+    remaining = [page for page in range(1, boundary + 1) if page not in probes]
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as executor:
+        fetched = executor.map(
+            lambda page: new_results(page, existing_ids, high_water_mark, fused), remaining
+        )
+        results = dict(probes)
+        results.update(zip(remaining, fetched))
+
+    html_list = []
+    for page_number in range(1, boundary + 1):
+        has_new, total_ids, new_ids, html_content, _ = results[page_number]
+        if has_new:
+            print(f"Page {page_number}: {new_ids} new results out of {total_ids} total")
+            html_list.append(_page_entry(page_number, html_content, fused))
+        else:
+            print(f"Page {page_number}: No new results")
+    return html_list
 
-def main():
+def main(concurrency=SCRAPE_CONCURRENCY, fused=False, save_raw=True, boundary_search=False,
+         adaptive=SCRAPE_ADAPTIVE):
     """
     Execute the complete scraping pipeline with intelligent stopping criteria.
     
@@ -271,6 +753,22 @@ def main():
     scraping until multiple consecutive pages contain no new data, indicating
     that all available new results have been collected.
     
+    :param concurrency: Number of pages fetched in parallel (1 for serial); the
+        starting limit when adaptive
+    :type concurrency: int, optional
+    :param fused: Clean each page from the scraper's own parse and return the rows
+    :type fused: bool, optional
+    :param save_raw: Write the raw page archive (optional in fused mode)
+    :type save_raw: bool, optional
+    :param boundary_search: Find the last page with new results by galloping
+        search, then fetch the backlog in parallel (for large backlogs)
+    :type boundary_search: bool, optional
+    :param adaptive: Adjust the pages in flight with AIMD (see
+        :func:`get_controller`); requests follow the robots.txt crawl delay
+        either way
+    :type adaptive: bool, optional
+    :return: Cleaned applicant rows in page order when fused, otherwise None
+    :rtype: list[dict] or None
     :raises urllib3.exceptions.HTTPError: When HTTP requests fail
     :raises psycopg.Error: When database connection fails
     :raises IOError: When output file cannot be written
@@ -280,71 +778,87 @@ def main():
        balancing thoroughness with efficiency.
        
     Processing Algorithm:
-        1. Query database for existing result IDs
-        2. Initialize page counter and empty page tracker
-        3. For each page:
-           a. Check for new results against existing IDs
+        1. Read the crawl cursor's high-water mark
+        2. Fetch pages through fetch_pages(), keeping several requests in flight
+        3. For each page, in page order:
+           a. Look up the page's result IDs in the database
            b. If new results found: save HTML and reset empty counter
            c. If no new results: increment empty counter
-           d. Continue until max empty pages reached
-        4. Save all collected HTML data to output file
+           d. Stop if every ID on the page is at or below the high-water mark
+           e. Otherwise continue until max empty pages reached
+        4. Save all collected pages to the raw page archive
         
     Stopping Criteria:
-        - Stops after 5 consecutive pages with no new results
+        - Stops at the first page whose IDs are all at or below the high-water mark
+        - Otherwise stops after 5 consecutive pages with no new results
         - Prevents infinite scraping when reaching end of available data
         - Balances completeness with efficiency
         
+    Adaptive Concurrency:
+        - The limit starts at ``concurrency`` and moves between 1 and
+          ``SCRAPE_MAX_CONCURRENCY`` (additive increase, halved on 429/5xx,
+          errors or rising latency)
+        - Request starts are spaced by the robots.txt Crawl-delay, if any,
+          whether or not the limit adapts
+        - The controller is shared by every crawl in the process (pipeline,
+          crawl queue), so the limit it has learned carries over
+        - Boundary search keeps a fixed pool but is still paced and throttled
+
+    Boundary Search Mode:
+        - Probes pages 1, 2, 4, 8, ... then binary searches for the last page
+          with new results (O(log n) sequential requests)
+        - Fetches every page before the boundary in parallel
+        - Intended for large backlogs; see :func:`find_new_data_boundary`
+
+    Fused Mode:
+        - Each page is parsed once; the same BeautifulSoup tree feeds both the
+          result ID check and :func:`clean.clean_html`
+        - The cleaned rows are returned for :func:`clean.main` (``rows=``),
+          so clean does not reload or re-parse the archive
+        - ``save_raw=False`` skips the archive write entirely
+
     Output Behavior:
-        - Creates output file only if new data is found
+        - Creates the page archive only if new data is found
         - Prints informative messages about scraping progress
         - Reports statistics for each page processed
         
     Performance Considerations:
+        - Overlaps network round trips with a bounded thread pool
         - Uses connection pooling for efficient HTTP requests
-        - Minimizes database queries by checking existing IDs once
+        - Checks only each page's IDs with indexed result_id lookups
         - Only saves HTML for pages with new data
         
     Example Output:
         >>> main()
-        Checking page 1...
         Page 1: 25 new results out of 25 total
-        Checking page 2...
         Page 2: 20 new results out of 25 total
-        Checking page 3...
         Page 3: No new results
-        Checking page 4...
         Page 4: No new results
         ...
-        Checking page 8...
-        Page 8: No new results
+        Page 7: No new results
         # Stops after 5 consecutive empty pages
     """
-    html_list = []
-
-    existing_ids = get_existing_ids()
-
-    page_number = 1
-    empty_page_count = 0
-    max_empty_pages = 5  # Stop after 5 consecutive empty pages
+    high_water_mark = get_high_water_mark()
 
-    while empty_page_count < max_empty_pages:
-        print(f"Checking page {page_number}...")
+    controller = get_controller(max(1, concurrency), adaptive)
 
-        has_new, total_ids, new_ids, html_content = new_results(page_number, existing_ids)
-        
-        if has_new:
-            print(f"Page {page_number}: {new_ids} new results out of {total_ids} total")
-            html_list.append({"page": page_number, "html": html_content})
-            empty_page_count = 0  # Reset counter if new data is found
-        else:
-            print(f"Page {page_number}: No new results")
-            empty_page_count += 1
+    if boundary_search:
+        html_list = fetch_pages_gallop(concurrency=concurrency, high_water_mark=high_water_mark, fused=fused)
+    else:
+        html_list = fetch_pages(concurrency=concurrency, high_water_mark=high_water_mark, fused=fused,
+                                controller=controller)
 
-        page_number +=1
     if html_list:
-        save_data(html_list, 'jhu_software_concepts/module_3/web_scraper/update_raw_applicant_data.json')
+        if save_raw:
+            save_archive(html_list)
     else:
         print("No new data to scrape.")
 
-if __name__ == "__main__":
+    print(f"HTTP stats: {http.stats_snapshot()}")
+    print(f"Concurrency limit: {controller.limit} ({controller.stats})")
+
+    if fused:
+        return [row for entry in html_list for row in entry['rows']]
+
+if __name__ == "__main__":  # pragma: no cover
     main()
@@ -31,10 +31,12 @@ Key Components:
 Database Schema Requirements:
     The application expects an 'applicants' table with the following fields:
     - term: Application term (e.g., 'Fall 2025')
+    - term_season, term_year: Term split into indexed columns ('Fall', 2025)
     - us_or_international: Applicant type ('American', 'International')
     - gpa: Grade Point Average (numeric)
     - gre, gre_v, gre_aw: GRE scores (numeric)
     - status: Application status (contains 'Accepted', 'Rejected', etc.)
+    - decision: Decision derived from the status ('accepted', 'rejected', ...)
     - degree: Degree type ('Masters', 'PhD')
     - llm_generated_university: Standardized university names
 
@@ -69,7 +71,6 @@ import threading
 import clean
 import scrape
 import load_data
-import json
     
 
 # global variables for busy state tracking
@@ -92,6 +93,15 @@ def create_app(config=None):
     :return: Configured Flask application instance
     :rtype: Flask
     
+    .. note::
+       Set ``STREAMING_RESCRAPE`` (config key, or environment variable set to
+       '1') to run /rescrape through the overlapping streaming pipeline.
+
+    .. note::
+       Older applicants tables are migrated on startup
+       (:func:`load_data.ensure_schema`); a failed migration is printed and
+       the dashboard reports the database error.
+
     Example:
         >>> app = create_app({'TESTING': True, 'DATABASE_URL': 'test_db'})
         >>> client = app.test_client()
@@ -99,6 +109,7 @@ def create_app(config=None):
     app = Flask(__name__)
     
     # Load configuration
+    app.config['STREAMING_RESCRAPE'] = os.getenv('STREAMING_RESCRAPE') == '1'
     if config:
         app.config.update(config)
     
@@ -108,6 +119,14 @@ def create_app(config=None):
     
     global pool
     pool = psycopg_pool.ConnectionPool(database_url)
+
+    # The dashboard queries the decision and term columns, which older
+    # tables only get from the migrations
+    try:
+        load_data.ensure_schema()
+    except Exception as e:
+        print(f"Error migrating database schema: {e}")
+
     @app.route('/')
     def dashboard():
         """
@@ -173,7 +192,7 @@ def create_app(config=None):
         fall_2025_apps = """
                     SELECT COUNT (*) 
                     FROM applicants
-                    WHERE TERM = 'Fall 2025';
+                    WHERE term_season = 'Fall' AND term_year = 2025;
                     """
         # Percentage of international students
         international_percentage = """
@@ -223,7 +242,7 @@ def create_app(config=None):
                     FROM applicants
                     WHERE us_or_international = 'American'
                     AND
-                    term = 'Fall 2025'
+                    term_season = 'Fall' AND term_year = 2025
                     AND
                     gpa <= 5;
                     """
@@ -231,11 +250,11 @@ def create_app(config=None):
         fall_25_acceptance_percent = """
                     SELECT
                         ROUND(
-                            (COUNT(CASE WHEN status ILIKE '%Accepted%' THEN 1 END) * 100.00) / COUNT(*),
+                            (COUNT(CASE WHEN decision = 'accepted' THEN 1 END) * 100.00) / COUNT(*),
                             2
                         ) AS acceptance_percentage
                     FROM applicants
-                    WHERE term = 'Fall 2025';
+                    WHERE term_season = 'Fall' AND term_year = 2025;
                     """
         # How many entries are from applicants who applied to JHU for a masters degrees?
         jhu_apps = """
@@ -252,8 +271,8 @@ def create_app(config=None):
                     FROM applicants
                     WHERE llm_generated_university ILIKE '%Georgetown%'
                     AND degree ILIKE 'PhD'
-                    AND status ILIKE '%accept%'
-                    AND term ILIKE '%2025%';
+                    AND decision = 'accepted'
+                    AND term_year = 2025;
                     """
         # Ranked list of universities with highest acceptance rates for international vs. domestic applicants
         int_domestic_acceptance_rates = """
@@ -262,15 +281,15 @@ def create_app(config=None):
                         llm_generated_university,
                         us_or_international,
                         COUNT(*) as total_applications,
-                        COUNT(CASE WHEN status ILIKE '%accepted%' THEN 1 END) as acceptances,
+                        COUNT(CASE WHEN decision = 'accepted' THEN 1 END) as acceptances,
                         ROUND(
-                            (COUNT(CASE WHEN status ILIKE '%accepted%' THEN 1 END) * 100.0) / COUNT(*), 
+                            (COUNT(CASE WHEN decision = 'accepted' THEN 1 END) * 100.0) / COUNT(*),
                             2
                         ) AS acceptance_rate
                     FROM applicants 
                     WHERE llm_generated_university IS NOT NULL 
                     AND us_or_international IS NOT NULL
-                    AND status IS NOT NULL
+                    AND decision IS NOT NULL
                     GROUP BY llm_generated_university, us_or_international
                     HAVING COUNT(*) >= 5  -- Only universities with sufficient data
                     )
@@ -290,21 +309,21 @@ def create_app(config=None):
                     SELECT 
                     degree,
                     CASE 
-                        WHEN status ILIKE '%accepted%' THEN 'Accepted'
-                        WHEN status ILIKE '%rejected%' THEN 'Rejected'
+                        WHEN decision = 'accepted' THEN 'Accepted'
+                        WHEN decision = 'rejected' THEN 'Rejected'
                         ELSE 'Other'
                     END as admission_status,
                     ROUND(AVG(CAST(gpa AS NUMERIC)), 2) as average_gpa
                 FROM applicants 
                 WHERE gpa IS NOT NULL 
                 AND gpa <= 5
-                AND status IS NOT NULL
+                AND decision IS NOT NULL
                 AND degree IS NOT NULL
                 GROUP BY 
                     degree,
                     CASE 
-                        WHEN status ILIKE '%accepted%' THEN 'Accepted'
-                        WHEN status ILIKE '%rejected%' THEN 'Rejected'
+                        WHEN decision = 'accepted' THEN 'Accepted'
+                        WHEN decision = 'rejected' THEN 'Rejected'
                         ELSE 'Other'
                     END
                 ORDER BY degree, admission_status;        
@@ -367,6 +386,8 @@ def create_app(config=None):
             2. Set busy state and acquire lock
             3. Execute run_rescrape() for data collection
             4. Execute add_to_db() for database insertion
+               (with STREAMING_RESCRAPE, steps 3-4 are replaced by
+               run_streaming_rescrape(), which loads batches as it goes)
             5. Clear busy state and release lock
             6. Redirect to dashboard for updated results
             
@@ -399,8 +420,11 @@ def create_app(config=None):
         try:
             with scrape_lock:
                 is_scraping = True
-                run_rescrape()
-                add_to_db()
+                if app.config.get('STREAMING_RESCRAPE'):
+                    run_streaming_rescrape()
+                else:
+                    run_rescrape()
+                    add_to_db()
             
             response = jsonify({"ok": True})
             response.headers['Refresh'] = '2; url=' + url_for('dashboard')
@@ -526,11 +550,13 @@ def run_rescrape():
        rate limiting and compliance with website terms of service.
        
     Processing Pipeline:
-        1. scrape.main(): Collects new HTML data from The GradCafe
-        2. clean.main(): Processes HTML and extracts structured data
+        1. scrape.main(fused=True): Collects new pages from The GradCafe and
+           extracts applicant rows from the same parse
+        2. clean.main(rows=...): Saves the rows and runs LLM standardization
+           without re-reading or re-parsing the raw pages
         
     Side Effects:
-        - Creates/updates raw HTML data files
+        - Creates/updates the raw page archive
         - Creates/updates cleaned JSON data files
         - May take several minutes for large datasets
         
@@ -541,8 +567,35 @@ def run_rescrape():
         ...
         LLM processing completed successfully
     """
-    scrape.main()
-    clean.main()
+    rows = scrape.main(fused=True)
+    clean.main(rows=rows)
+
+def run_streaming_rescrape():
+    """
+    Execute scraping, cleaning, LLM standardization and loading as one streaming pipeline.
+
+    Unlike :func:`run_rescrape` followed by :func:`add_to_db`, the stages run
+    at the same time and are connected by bounded queues: rows from the first
+    pages are standardized while later pages download, and finished batches
+    are committed while later rows are still being cleaned.
+
+    :return: Counts of pages fetched, rows loaded, batches committed and
+        duplicate rows skipped
+    :rtype: dict
+    :raises Exception: The first error raised by any pipeline stage
+
+    .. seealso::
+       :mod:`pipeline` for the stage and queue layout
+
+    Example:
+        >>> run_streaming_rescrape()
+        Page 1: 25 new results out of 25 total
+        ...
+        {'pages': 2, 'rows': 45, 'batches': 1, 'skipped': 0}
+    """
+    import pipeline
+
+    return pipeline.run()
 
 def add_to_db():
     """
@@ -583,13 +636,13 @@ def add_to_db():
 
     current_dir = os.path.dirname(os.path.abspath(__file__))
     module_3_dir = os.path.dirname(current_dir)
-    cleaned_data_path = os.path.join(module_3_dir, 'update_llm_extend_applicant_data.json')
+    cleaned_data_path = os.path.join(module_3_dir, 'update_llm_extend_applicant_data.jsonl')
     
     try:
-        with open(cleaned_data_path, 'r', encoding='utf-8') as f:
-            cleaned_data = json.load(f)
+        # Rows are streamed from the file and inserted in batches
+        cleaned_rows = load_data.iter_rows(cleaned_data_path)
         
-        load_data.add_applicant_data(cleaned_data)
+        load_data.add_applicant_data({"rows": cleaned_rows})
         print("Data successfully added to database")
         
     except Exception as e:
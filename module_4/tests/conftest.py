@@ -0,0 +1,38 @@
+import http.server
+import threading
+import pytest
+
+
+class FakeSite(http.server.BaseHTTPRequestHandler):
+    """
+    Serves scripted responses: routes map a path to a list of (status, headers, body).
+
+    Responses are served in order and the last one repeats; unknown paths are 404.
+    """
+
+    routes = {}
+
+    def do_GET(self):
+        responses = self.routes.get(self.path) or [(404, {}, b'')]
+        status, headers, body = responses.pop(0) if len(responses) > 1 else responses[0]
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def site():
+    """Start a local HTTP server and return (base_url, routes)."""
+    FakeSite.routes = {}
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FakeSite)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", FakeSite.routes
+    server.shutdown()
+    server.server_close()
@@ -33,7 +33,7 @@ def client(app_instance):
 def create_mock_query(mock_data):
     """Factory function to create mock query function with specific data."""
     def mock_query(query):
-        if "COUNT (*)" in query and "Fall 2025" in query:
+        if "COUNT (*)" in query and "term_season = 'Fall' AND term_year = 2025" in query:
             return [(mock_data.get('fall_2025_count', 150),)]
         elif "international_percentage" in query:
             return [(mock_data.get('international_pct', 25.5),)]
@@ -0,0 +1,117 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import pytest
+
+from applicant_record import ApplicantRecord, JSON_KEYS, parse_decision, parse_term, to_score
+
+ROW = {
+    'program': 'CS, Test University', 'comments': 'Good', 'date_added': 'March 3, 2025',
+    'url': 'https://www.thegradcafe.com/result/123', 'status': 'Accepted on 3 Mar',
+    'Term': 'Fall 2025', 'US/International': 'American', 'gpa': '3.90', 'gre': '320',
+    'gre_v': '160', 'gre_aw': '4.50', 'Degree': 'Masters',
+}
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("field,value,expected", [
+    ("gpa", "3.90", 3.9),
+    ("gpa", 3.8, 3.8),
+    ("gre", " 320 ", 320.0),
+    ("gre_aw", "4.5", 4.5),
+    ("gpa", None, None),
+    ("gpa", "", None),
+    ("gpa", "n/a", None),
+    ("gpa", [3.9], None),
+    ("gpa", "0.00", None),
+    ("gre", "0", None),
+    ("gre", "nan", None),
+    ("gre_v", "171", None),
+    ("gre_aw", "-1", None),
+])
+def test_to_score(field, value, expected):
+    """Scores become floats; missing, zero and implausible values become None."""
+    assert to_score(field, value) == expected
+
+
+@pytest.mark.db
+def test_scores_are_converted_once_on_construction():
+    """A record built from a parsed row never holds score strings."""
+    record = ApplicantRecord.from_dict(ROW)
+
+    assert (record.gpa, record.gre, record.gre_v, record.gre_aw) == (3.9, 320.0, 160.0, 4.5)
+    assert record.term == 'Fall 2025'
+    assert record.us_or_international == 'American'
+    assert not hasattr(record, '__dict__')  # Slotted
+
+
+@pytest.mark.db
+def test_to_dict_round_trip():
+    """to_dict uses the JSON row keys and leaves out unset LLM fields."""
+    row = ApplicantRecord.from_dict(ROW).to_dict()
+
+    assert set(row) == set(ROW) | {'decision', 'decision_date', 'term_season', 'term_year'}
+    assert row['gpa'] == 3.9
+    assert ApplicantRecord.from_dict(row) == ApplicantRecord.from_dict(ROW)
+
+    row['llm-generated-program'] = 'Computer Science'
+    assert ApplicantRecord.from_dict(row).to_dict()['llm-generated-program'] == 'Computer Science'
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("text,date_added,expected", [
+    ("Accepted on 3 Mar", "March 7, 2025", ("accepted", "2025-03-03")),
+    ("  Wait listed  on 6 Mar ", "March 7, 2025", ("wait_listed", "2025-03-06")),
+    ("Interview on 11 September", "September 12, 2025", ("interview", "2025-09-11")),
+    ("Rejected on 28 Dec", "January 2, 2025", ("rejected", "2024-12-28")),
+    ("Accepted on 3 Mar, 2024", "March 7, 2025", ("accepted", "2024-03-03")),
+    ("Accepted on 3 Mar", "2025-03-07", ("accepted", "2025-03-03")),
+    ("Accepted on 3 Mar", None, ("accepted", None)),
+    ("Rejected on 30 Feb", "March 7, 2025", ("rejected", None)),
+    ("Accepted on 29 Feb", "February 1, 2024", ("accepted", None)),
+    ("Accepted on 29 Feb", "March 1, 2024", ("accepted", "2024-02-29")),
+    ("Other", "March 7, 2025", ("other", None)),
+    ("Pending", "March 7, 2025", ("other", None)),
+    ("  ", None, (None, None)),
+    (None, None, (None, None)),
+])
+def test_parse_decision(text, date_added, expected):
+    """Decisions are normalized; any other text is 'other'; the year comes from the text or date_added."""
+    assert parse_decision(text, date_added) == expected
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("term,expected", [
+    ("Fall 2025", ("Fall", 2025)),
+    ("spring  2026", ("Spring", 2026)),
+    ("2025", (None, 2025)),
+    ("TBD", (None, None)),
+    (None, (None, None)),
+])
+def test_parse_term(term, expected):
+    """Terms split into season and year."""
+    assert parse_term(term) == expected
+
+
+@pytest.mark.db
+def test_structured_fields_are_derived_unless_given():
+    """Decision and term fields come from status and term when not passed in."""
+    record = ApplicantRecord.from_dict(ROW)
+    assert (record.decision, record.decision_date) == ("accepted", "2025-03-03")
+    assert (record.term_season, record.term_year) == ("Fall", 2025)
+
+    record = ApplicantRecord(status=None, decision="interview", decision_date="2025-03-01",
+                             term_season="Fall", term_year=2025)
+    assert (record.decision, record.decision_date) == ("interview", "2025-03-01")
+    assert (record.term_season, record.term_year) == ("Fall", 2025)
+
+    assert ApplicantRecord(decision="maybe").decision is None
+
+
+@pytest.mark.db
+def test_as_tuple_follows_column_order():
+    """as_tuple lists values in applicants column order."""
+    record = ApplicantRecord.from_dict(dict(ROW, **{'llm-generated-university': 'Test University'}))
+
+    assert record.as_tuple() == tuple(getattr(record, name) for name in JSON_KEYS)
+    assert record.as_tuple()[7:11] == (3.9, 320.0, 160.0, 4.5)
@@ -0,0 +1,104 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'web_scraper'))
+import json
+import pytest
+
+import backfill
+import http_client
+
+
+@pytest.fixture
+def survey(site, monkeypatch):
+    """Point the backfill at the local site with one quick retry per page."""
+    base_url, routes = site
+    monkeypatch.setattr(backfill, 'BASE_URL', base_url)
+    monkeypatch.setattr(backfill, 'SURVEY_URL', base_url + "/survey/?page={}")
+    monkeypatch.setattr(http_client, '_site_controllers', {})
+    client = http_client.ResilientClient
+    monkeypatch.setattr(http_client, 'ResilientClient',
+                        lambda **kwargs: client(max_retries=1, backoff_base=0, **kwargs))
+    return routes
+
+
+@pytest.mark.scrape
+def test_shard_ranges_cover_the_range():
+    """Shards are contiguous, nearly equal and never more than the pages."""
+    assert backfill.shard_ranges(0, 10, 3) == [(0, 0, 4), (1, 4, 7), (2, 7, 10)]
+    assert backfill.shard_ranges(5, 7, 8) == [(0, 5, 6), (1, 6, 7)]
+    assert backfill.shard_ranges(0, 0, 4) == [(0, 0, 0)]
+
+
+@pytest.mark.scrape
+def test_manifest_is_fixed_on_first_run(tmp_path):
+    """Resuming with a different layout is refused."""
+    out_dir = str(tmp_path / 'backfill')
+    assert backfill.load_manifest(out_dir, 0, 10, 2) == {"start": 0, "end": 10, "shards": 2}
+    assert backfill.load_manifest(out_dir, 0, 10, 2) == {"start": 0, "end": 10, "shards": 2}
+
+    with pytest.raises(ValueError):
+        backfill.load_manifest(out_dir, 0, 20, 2)
+
+
+@pytest.mark.scrape
+def test_failed_page_is_recorded_and_skipped(survey, tmp_path):
+    """A page that still fails is logged and the shard carries on."""
+    survey['/survey/?page=0'] = [(200, {}, b'page 0')]
+    survey['/survey/?page=1'] = [(500, {}, b'')]
+    survey['/survey/?page=2'] = [(200, {}, b'page 2')]
+
+    result = backfill.crawl_shard((str(tmp_path), 0, 0, 3, 1))
+
+    assert result == (0, 2, 0, 1)
+    with open(backfill.failure_path(str(tmp_path), 0), encoding='utf-8') as f:
+        failures = [json.loads(line) for line in f]
+    assert [entry['page'] for entry in failures] == [1]
+    assert "500" in failures[0]['error']
+
+
+@pytest.mark.scrape
+def test_resume_fetches_only_missing_pages(survey, tmp_path):
+    """A second run only requests the pages that are not archived yet."""
+    survey['/survey/?page=0'] = [(200, {}, b'page 0')]
+    survey['/survey/?page=1'] = [(503, {}, b''), (503, {}, b''), (200, {}, b'page 1')]
+
+    assert backfill.crawl_shard((str(tmp_path), 0, 0, 2, 1)) == (0, 1, 0, 1)
+    assert backfill.crawl_shard((str(tmp_path), 0, 0, 2, 1)) == (0, 1, 1, 0)
+
+    archive = backfill.raw_archive.RawArchive(backfill.shard_path(str(tmp_path), 0))
+    assert archive.read(1) == b'page 1'
+    with open(backfill.failure_path(str(tmp_path), 0), encoding='utf-8') as f:
+        assert f.read() == ""  # The log only lists the last run's failures
+
+
+@pytest.mark.scrape
+def test_open_circuit_waits_for_cooldown(survey, tmp_path, mocker):
+    """With the breaker open, the worker waits out the cool-down instead of burning every page."""
+    sleep = mocker.patch.object(backfill.time, 'sleep')
+    breaker = http_client.CircuitBreaker(threshold=1, reset_timeout=7)
+    breaker.record_failure()
+    mocker.patch.object(http_client, 'CircuitBreaker', return_value=breaker)
+
+    assert backfill.crawl_shard((str(tmp_path), 0, 0, 1, 1)) == (0, 0, 0, 1)
+    sleep.assert_called_once_with(7)
+
+
+@pytest.mark.scrape
+def test_run_uses_spawn_and_reports(survey, tmp_path, mocker, capsys):
+    """run() starts spawn workers, tallies failures and reads back every archived page."""
+    survey['/survey/?page=0'] = [(200, {}, b'page 0')]
+    survey['/survey/?page=1'] = [(200, {}, b'page 1')]
+    survey['/survey/?page=2'] = [(500, {}, b'')]
+    get_context = mocker.patch.object(backfill.multiprocessing, 'get_context')
+    pool = get_context.return_value.Pool.return_value.__enter__.return_value
+    pool.imap_unordered.side_effect = lambda func, tasks: map(func, tasks)
+    out_dir = str(tmp_path / 'backfill')
+
+    assert backfill.run(out_dir, start=0, end=3, shards=2, workers=2) == 2
+
+    get_context.assert_called_once_with('spawn')
+    get_context.return_value.Pool.assert_called_once_with(processes=2)
+    output = capsys.readouterr().out
+    assert "2 of 3 pages archived (1 failed)" in output
+    assert "run again to retry them" in output
+    assert [entry['page'] for entry in backfill.iter_archived_pages(out_dir)] == [0, 1]
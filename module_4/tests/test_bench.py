@@ -0,0 +1,108 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'web_scraper'))
+import glob
+import pytest
+
+import http_client
+import raw_archive
+
+CORPUS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'fixtures', 'survey_pages', '*.html')))
+
+
+@pytest.fixture
+def bench(mocker, monkeypatch):
+    """Import bench (and scrape) against a mocked connection pool."""
+    mocker.patch.dict('sys.modules', {'psycopg_pool': mocker.MagicMock()})
+    sys.modules.pop('scrape', None)
+    sys.modules.pop('bench', None)
+    import bench
+    monkeypatch.setattr(http_client, '_site_controllers', {})
+    return bench
+
+
+@pytest.fixture
+def corpus():
+    pages = []
+    for path in CORPUS:
+        with open(path, 'rb') as f:
+            pages.append(f.read())
+    return pages
+
+
+@pytest.mark.scrape
+def test_load_corpus_respects_limit(bench, tmp_path, capsys):
+    """Pages are read in page order up to the limit."""
+    archive = raw_archive.RawArchive.create(str(tmp_path / 'pages.gz'))
+    for page in (1, 2, 3):
+        archive.append(page, f"<html>{page}</html>")
+
+    assert bench.load_corpus(archive.path, limit=2) == [b"<html>1</html>", b"<html>2</html>"]
+    assert "Loaded 2 pages" in capsys.readouterr().out
+    assert len(bench.load_corpus(archive.path)) == 3
+
+
+@pytest.mark.scrape
+def test_bench_extract_and_clean_compare_backends(bench, corpus, monkeypatch, capsys):
+    """Every backend and engine is timed, and disagreements are reported."""
+    assert set(bench.bench_extract(corpus, repeat=1)) == {'bs4', 'lxml'}
+    assert set(bench.bench_clean(corpus, repeat=1)) == {'bs4', 'lxml'}
+    out = capsys.readouterr().out
+    assert f"Backends agree on all {len(corpus)} pages" in out
+    assert f"Engines agree on all {len(corpus)} pages" in out
+
+    monkeypatch.setitem(bench.scrape.EXTRACTORS, 'lxml', lambda html: set())
+    monkeypatch.setitem(bench.clean.ENGINES, 'lxml', lambda html, is_known: [])
+    bench.bench_extract(corpus, repeat=1)
+    bench.bench_clean(corpus, repeat=1)
+    out = capsys.readouterr().out
+    assert f"Backends disagree on {len(corpus)} pages" in out
+    assert f"Engines disagree on {len(corpus)} pages" in out
+
+
+@pytest.mark.scrape
+def test_percentile_and_unknown_variant(bench):
+    """Nearest-rank percentiles, and unknown fetch loops are rejected."""
+    assert bench._percentile([], 99) == 0.0
+    assert bench._percentile([3, 1, 2, 4], 50) == 2
+    assert bench._percentile([3, 1, 2, 4], 99) == 4
+    with pytest.raises(ValueError, match="Unknown scrape variant"):
+        bench._run_variant("random", 4)
+
+
+@pytest.mark.scrape
+def test_bench_scrape_runs_each_variant_against_replay(bench, monkeypatch):
+    """Each fetch loop scrapes a fresh replay server; scrape's globals are restored after."""
+    monkeypatch.setattr(bench.scrape, 'SCRAPE_MAX_CONCURRENCY', 4)
+    original = (bench.scrape.BASE_URL, bench.scrape.http, bench.scrape.new_results)
+    pages = {page: f'<a href="/result/{page}">See More</a>'.encode() for page in (1, 2, 3)}
+
+    results = bench.bench_scrape(pages, concurrency=2)
+
+    assert list(results) == list(bench.SCRAPE_VARIANTS)
+    for variant, result in results.items():
+        assert result["pages"] >= 3, variant
+        assert result["p50"] <= result["p99"]
+    assert (bench.scrape.BASE_URL, bench.scrape.http, bench.scrape.new_results) == original
+
+
+@pytest.mark.scrape
+def test_main_dispatches_subcommands(bench, mocker, tmp_path, capsys):
+    """Each subcommand loads its pages and runs its benchmark with the parsed options."""
+    mocker.patch.object(bench, 'load_corpus', return_value=[b"<html>"])
+    mocker.patch.object(bench.replay_server, 'load_pages', return_value={1: b"<html>"})
+    for name in ('bench_extract', 'bench_clean', 'bench_scrape'):
+        mocker.patch.object(bench, name)
+
+    bench.main(["extract", "--repeat", "2"])
+    bench.bench_extract.assert_called_once_with([b"<html>"], repeat=2)
+    bench.main(["clean", "--limit", "5"])
+    bench.load_corpus.assert_called_with(bench.clean.RAW_ARCHIVE_PATH, bench.clean.RAW_JSON_PATH, 5)
+    bench.bench_clean.assert_called_once_with([b"<html>"], repeat=3)
+    bench.main(["scrape", "--archive", str(tmp_path), "--variants", "serial", "--latency", "20"])
+    bench.bench_scrape.assert_called_once_with({1: b"<html>"}, variants=["serial"],
+                                               concurrency=bench.scrape.SCRAPE_CONCURRENCY,
+                                               latency=0.02, jitter=0.025, error_rate=0,
+                                               throttle_rate=0)
+    assert "Loaded 1 pages" in capsys.readouterr().out
@@ -140,9 +140,9 @@ def test_add_to_db_exception_handling_complete(mocker):
     # Mock print to capture it
     mock_print = mocker.patch('builtins.print')
     
-    # Mock open to raise a specific exception
+    # Make reading the cleaned data file raise a specific exception
     test_exception = Exception("Test file error")
-    mocker.patch('builtins.open', side_effect=test_exception)
+    mocker.patch.object(app_module.load_data, 'iter_rows', side_effect=test_exception)
     
     # Call add_to_db and expect it to raise
     with pytest.raises(Exception) as exc_info:
@@ -170,8 +170,8 @@ def test_add_to_db_error_handling(client, mocker):
     """Test add_to_db function error handling."""
     from src.webpage import app as app_module
     
-    # Mock file operations to raise an exception
-    mocker.patch('builtins.open', side_effect=FileNotFoundError("File not found"))
+    # Make reading the cleaned data file raise an exception
+    mocker.patch.object(app_module.load_data, 'iter_rows', side_effect=FileNotFoundError("File not found"))
     
     with pytest.raises(FileNotFoundError):
         app_module.add_to_db()
@@ -190,4 +190,51 @@ def test_run_rescrape_function_calls(mocker):
     
     # Verify both functions were called (this hits lines 45-46)
     mock_scrape_main.assert_called_once()
-    mock_clean_main.assert_called_once()
\ No newline at end of file
+    mock_clean_main.assert_called_once()
+
+
+@pytest.mark.buttons
+def test_run_rescrape_hands_parsed_rows_to_clean(mocker):
+    """Test that run_rescrape passes the scraper's rows straight to clean.main."""
+    from src.webpage import app as app_module
+
+    rows = [{"program": "Computer Science, Test University"}]
+    mock_scrape_main = mocker.patch('scrape.main', return_value=rows)
+    mock_clean_main = mocker.patch('clean.main')
+
+    app_module.run_rescrape()
+
+    mock_scrape_main.assert_called_once_with(fused=True)
+    mock_clean_main.assert_called_once_with(rows=rows)
+
+@pytest.mark.buttons
+def test_post_rescrape_streaming_pipeline(mocker):
+    """Test POST /rescrape uses the streaming pipeline when enabled."""
+    from src.webpage.app import create_app
+
+    client = create_app({'TESTING': True, 'STREAMING_RESCRAPE': True}).test_client()
+    mock_streaming = mocker.patch('src.webpage.app.run_streaming_rescrape')
+    mock_run_rescrape = mocker.patch('src.webpage.app.run_rescrape')
+    mock_add_to_db = mocker.patch('src.webpage.app.add_to_db')
+
+    response = client.post('/rescrape')
+
+    assert response.status_code == 200
+    assert response.get_json() == {"ok": True}
+    mock_streaming.assert_called_once()
+    mock_run_rescrape.assert_not_called()
+    mock_add_to_db.assert_not_called()
+
+@pytest.mark.buttons
+def test_run_streaming_rescrape_runs_pipeline(mocker):
+    """Test that run_streaming_rescrape delegates to pipeline.run."""
+    from src.webpage import app as app_module
+
+    mock_pipeline = mocker.MagicMock()
+    mock_pipeline.run.return_value = {"pages": 2, "rows": 45, "batches": 1}
+    mocker.patch.dict('sys.modules', {'pipeline': mock_pipeline})
+
+    result = app_module.run_streaming_rescrape()
+
+    mock_pipeline.run.assert_called_once()
+    assert result == {"pages": 2, "rows": 45, "batches": 1}
@@ -0,0 +1,355 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'web_scraper'))
+import glob
+import pytest
+from bs4 import BeautifulSoup
+
+import clean
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'survey_pages')
+CORPUS = sorted(glob.glob(os.path.join(CORPUS_DIR, '*.html')))
+
+
+def read_page(path, as_bytes):
+    with open(path, 'rb') as f:
+        data = f.read()
+    return data if as_bytes else data.decode('utf-8')
+
+
+@pytest.mark.clean
+def test_corpus_is_present():
+    """Parity tests below must not pass vacuously on an empty corpus."""
+    assert len(CORPUS) >= 3
+
+
+@pytest.mark.clean
+@pytest.mark.parametrize("as_bytes", [False, True], ids=["str", "bytes"])
+@pytest.mark.parametrize("path", CORPUS, ids=os.path.basename)
+def test_lxml_engine_matches_bs4(path, as_bytes):
+    """The lxml engine returns exactly the rows of the reference bs4 engine."""
+    html = read_page(path, as_bytes)
+
+    expected = clean.clean_html(html, engine='bs4')
+    actual = clean.clean_html(html, engine='lxml')
+
+    assert expected
+    assert actual == expected
+
+
+@pytest.mark.clean
+@pytest.mark.parametrize("path", CORPUS, ids=os.path.basename)
+def test_engines_agree_when_skipping_known_ids(path):
+    """Known-ID skipping behaves the same in both engines, for sets and callables."""
+    html = read_page(path, as_bytes=False)
+    rows = clean.clean_html(html, engine='bs4')
+    ids = [int(clean.RESULT_ID_RE.search(row['url']).group(1)) for row in rows if row['url']]
+    known = set(ids[::2])
+
+    for known_ids in (known, known.__contains__):
+        expected = clean.clean_html(html, known_ids=known_ids, engine='bs4')
+        assert clean.clean_html(html, known_ids=known_ids, engine='lxml') == expected
+        assert len(expected) == len(rows) - len(known)
+
+
+@pytest.mark.clean
+def test_edge_case_rows():
+    """Spot-check reference behaviour the lxml engine has to reproduce."""
+    html = read_page(os.path.join(CORPUS_DIR, 'page_3_edge_cases.html'), as_bytes=False)
+    rows = clean.clean_html(html, engine='lxml')
+
+    assert rows[0]['program'] == "Data <Science>, Université de Montréal & Co"
+    assert rows[0]['comments'] == "Funding &amp; RA offer &gt; expected!"
+    assert rows[0]['status'] == "Accepted on 3 Mar, 2025   "
+    assert rows[1]['Term'] == "Spring 2025"  # Found in an attribute value
+    assert rows[1]['US/International'] is None  # Badge with a child element
+    assert rows[2]['status'] is None  # Status text interrupted by a comment
+    assert rows[3]['url'] is None
+    assert rows[4]['program'] == "Rice University"  # No program span
+    assert rows[4]['Term'] == "Fall 2024"  # Inside the GRE badge's start tag
+    assert rows[4]['gre'] == 320.0
+    assert rows[5]['program'] is None
+    assert rows[5]['Term'] is None  # Detail row without a term
+    assert rows[6]['Term'] is None  # No detail row
+
+
+@pytest.mark.clean
+def test_engine_from_environment_default(monkeypatch):
+    """CLEAN_ENGINE selects the engine when none is passed."""
+    calls = []
+    monkeypatch.setattr(clean, 'CLEAN_ENGINE', 'lxml')
+    monkeypatch.setitem(clean.ENGINES, 'lxml', lambda html, is_known: calls.append(html) or [])
+
+    assert clean.clean_html("<table></table>") == []
+    assert calls == ["<table></table>"]
+
+
+@pytest.mark.clean
+def test_lxml_engine_reuses_parsed_soup():
+    """A BeautifulSoup tree from the fused scraper is cleaned with the bs4 engine."""
+    html = read_page(CORPUS[0], as_bytes=False)
+    soup = BeautifulSoup(html, "html.parser")
+
+    assert clean.clean_html(soup, engine='lxml') == clean.clean_html(html, engine='bs4')
+
+
+@pytest.mark.clean
+def test_lxml_engine_decodes_non_utf8_bytes():
+    """Bytes that are not UTF-8 are decoded the way bs4 detects them."""
+    html = read_page(os.path.join(CORPUS_DIR, 'page_3_edge_cases.html'), as_bytes=False)
+    data = html.replace("Rice University", "Rice Universit\xe9").encode('latin-1')
+
+    rows = clean.clean_html(data, engine='lxml')
+
+    assert rows == clean.clean_html(data, engine='bs4')
+    assert rows[4]['program'] == "Rice Universit\xe9"
+
+
+@pytest.mark.clean
+def test_clean_imports_without_lxml(mocker):
+    """Without lxml installed the module still imports and cleans with bs4."""
+    mocker.patch.dict('sys.modules', {'lxml': None, 'lxml.html': None})
+    sys.modules.pop('clean', None)
+    import clean as clean_without_lxml
+
+    assert clean_without_lxml.lxml is None
+    assert clean_without_lxml.clean_html(read_page(CORPUS[0], as_bytes=False))
+
+
+@pytest.mark.clean
+@pytest.mark.parametrize("html", ["", "   ", b""])
+def test_lxml_engine_empty_page(html):
+    """Empty pages yield no rows instead of an lxml parser error."""
+    assert clean.clean_html(html, engine='lxml') == []
+
+
+@pytest.mark.clean
+def test_unknown_engine():
+    """Unknown engine names are rejected."""
+    with pytest.raises(ValueError, match="Unknown clean engine"):
+        clean.clean_html("<table></table>", engine='html5lib')
+
+
+@pytest.mark.clean
+@pytest.mark.parametrize("engine", ['bs4', 'lxml'])
+def test_parallel_clean_pages_keeps_page_order(engine):
+    """Worker processes return the same rows, in the same order, as a serial loop."""
+    pages = [read_page(path, as_bytes=False) for path in CORPUS] * 3
+    expected = clean.clean_pages(pages, engine=engine, workers=1)
+
+    actual = clean.clean_pages(pages, engine=engine, workers=2, chunk_size=2, min_pages=0)
+
+    assert expected
+    assert actual == expected
+
+
+@pytest.mark.clean
+def test_worker_chunks_use_initialized_settings(monkeypatch):
+    """Worker processes clean their chunks with the known IDs and engine they were started with."""
+    monkeypatch.setattr(clean, '_worker_known_ids', None)
+    monkeypatch.setattr(clean, '_worker_engine', None)
+    pages = [read_page(path, as_bytes=False) for path in CORPUS]
+    known = {880001, 880002}
+
+    clean._init_clean_worker(known, 'lxml')
+
+    assert clean._clean_chunk(pages) == [clean.clean_html(html, known_ids=known, engine='bs4')
+                                         for html in pages]
+
+
+@pytest.mark.clean
+def test_small_inputs_are_cleaned_serially(monkeypatch):
+    """Inputs below min_pages never start a process pool."""
+    def no_pool(*args, **kwargs):
+        raise AssertionError("process pool started")
+    monkeypatch.setattr(clean, 'ProcessPoolExecutor', no_pool)
+    pages = [read_page(path, as_bytes=False) for path in CORPUS]
+
+    rows = clean.clean_pages(pages, workers=4, min_pages=len(pages) + 1)
+
+    assert rows == [row for html in pages for row in clean.clean_html(html)]
+
+
+@pytest.mark.clean
+def test_page_cache_skips_unchanged_pages(tmp_path):
+    """A second run reads every page from the cache and returns the same rows."""
+    import page_cache
+    pages = [read_page(path, as_bytes=False) for path in CORPUS]
+    expected = clean.clean_pages(pages, workers=1)
+    ids = [int(clean.RESULT_ID_RE.search(row['url']).group(1)) for row in expected if row['url']]
+    known = set(ids[::2])
+
+    with page_cache.PageCache(str(tmp_path / 'cache.sqlite3')) as cache:
+        assert clean.clean_pages(pages[:1], workers=1, cache=cache) == clean.clean_html(pages[0])
+    with page_cache.PageCache(str(tmp_path / 'cache.sqlite3')) as cache:
+        assert clean.clean_pages(pages, workers=1, cache=cache) == expected
+        assert cache.stats == {"hits": 1, "misses": len(pages) - 1, "evicted": 0}
+        # Cached rows are stored unfiltered, so any known_ids can reuse them
+        assert clean.clean_pages(pages, known_ids=known, workers=1, cache=cache) == \
+            clean.clean_pages(pages, known_ids=known, workers=1)
+        assert cache.stats["hits"] == len(pages) + 1
+
+
+@pytest.mark.clean
+def test_page_cache_evicts_least_recently_used(tmp_path):
+    """Over the size limit, the oldest pages are dropped and parsed again later."""
+    import page_cache
+    pages = [read_page(path, as_bytes=False) for path in CORPUS]
+
+    with page_cache.PageCache(str(tmp_path / 'cache.sqlite3'), max_bytes=1) as cache:
+        rows = clean.clean_pages(pages, workers=1, cache=cache)
+        assert cache.stats["evicted"] == len(pages)
+        assert cache.total_bytes == 0
+        assert clean.clean_pages(pages, workers=1, cache=cache) == rows
+
+
+@pytest.mark.clean
+def test_page_cache_evicts_only_down_to_the_limit(tmp_path, mocker):
+    """Eviction stops once the cache is back under EVICT_TO of max_bytes."""
+    import page_cache
+    mocker.patch('page_cache.time.time', side_effect=range(100))
+    rows = [{"program": "CS, MIT"}]
+
+    with page_cache.PageCache(str(tmp_path / 'cache.sqlite3')) as cache:
+        cache.put('a', rows)
+        cache.max_bytes = int(cache.total_bytes * 2.5)
+        cache.put('b', rows)
+        assert cache.get('a') == rows  # 'b' is now the least recently used
+        cache.put('c', rows)
+
+        assert cache.stats["evicted"] == 1
+        assert cache.get('b') is None
+        assert cache.get('a') == cache.get('c') == rows
+
+
+@pytest.mark.clean
+def test_load_pages_prefers_archive_over_json(tmp_path):
+    """Pages come from the raw archive when it exists, else from the legacy JSON."""
+    archive_path = str(tmp_path / 'pages.gz')
+    json_path = str(tmp_path / 'pages.json')
+    clean.save_data([{"page": 1, "html": "<html>json</html>"}], json_path)
+    archive = clean.raw_archive.RawArchive.create(archive_path)
+    archive.append(1, "<html>archive</html>")
+
+    assert list(clean.load_pages(archive_path, json_path)) == [{"page": 1, "html": b"<html>archive</html>"}]
+    os.remove(archive_path)
+    assert list(clean.load_pages(archive_path, json_path)) == clean.load_data(json_path)
+    assert clean.load_data(json_path) == [{"page": 1, "html": "<html>json</html>"}]
+
+    with pytest.raises(FileNotFoundError):
+        clean.load_pages(archive_path, str(tmp_path / 'missing.json'))
+
+
+@pytest.mark.clean
+def test_raw_archive_recovers_from_torn_index(tmp_path):
+    """A torn final index line is ignored and create() starts over."""
+    path = str(tmp_path / 'pages.gz')
+    archive = clean.raw_archive.RawArchive.create(path)
+    archive.append(1, b"one")
+    archive.append(2, "two")
+    with open(path + '.idx', 'a', encoding='utf-8') as f:
+        f.write('{"page": 3, "off')
+
+    reopened = clean.raw_archive.RawArchive(path)
+    assert reopened.pages() == [1, 2]
+    assert reopened.read(2) == b"two"
+
+    assert len(clean.raw_archive.RawArchive.create(path)) == 0
+    assert not os.path.exists(path)
+
+
+STUB_STANDARDIZER = '''
+LOADS = []
+LOADS.append(1)
+
+def standardize_rows(rows, stats=None):
+    for row in rows:
+        if stats is not None:
+            stats["misses"] += 1
+        row["llm-generated-program"] = row["program"].split(",")[0]
+        row["llm-generated-university"] = row["program"].split(", ")[-1]
+        yield row
+'''
+
+
+@pytest.mark.clean
+def test_standardizer_is_loaded_once_and_streams_lazily(tmp_path):
+    """The standardizer module is imported once per process and pulls rows lazily."""
+    (tmp_path / "app.py").write_text(STUB_STANDARDIZER)
+    pulled = []
+
+    def rows():
+        for program in ("CS, MIT", "Physics, Yale University"):
+            pulled.append(program)
+            yield {"program": program}
+
+    stream = clean.llm_standardize_stream(rows(), llm_dir=str(tmp_path))
+    assert next(stream)["llm-generated-university"] == "MIT"
+    assert pulled == ["CS, MIT"]
+    assert [row["llm-generated-program"] for row in stream] == ["Physics"]
+
+    module = clean.load_standardizer(str(tmp_path))
+    assert list(clean.llm_standardize_stream([{"program": "Math, UBC"}], llm_dir=str(tmp_path)))
+    assert clean.load_standardizer(str(tmp_path)) is module
+    assert module.LOADS == [1]
+
+    with pytest.raises(FileNotFoundError):
+        clean.load_standardizer(str(tmp_path / "missing"))
+
+
+@pytest.mark.clean
+def test_llm_clean_command_runs_in_process(tmp_path, monkeypatch, capsys):
+    """llm_clean_command streams the cleaned JSON Lines file through the standardizer."""
+    (tmp_path / "app.py").write_text(STUB_STANDARDIZER)
+    data_dir = tmp_path / "jhu_software_concepts" / "module_3"
+    data_dir.mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(clean, "LLM_DIR", str(tmp_path))
+
+    assert clean.llm_clean_command() is False  # No cleaned file yet
+    assert "LLM processing error" in capsys.readouterr().out
+
+    clean.save_data([{"program": "CS, MIT"}], str(data_dir / "update_applicant_data.jsonl"))
+    assert clean.llm_clean_command() is True
+    assert "LLM cache: 0 hits, 1 misses" in capsys.readouterr().out
+
+    output = clean.json_stream.iter_file(str(data_dir / "update_llm_extend_applicant_data.jsonl"))
+    assert list(output) == [{"program": "CS, MIT", "llm-generated-program": "CS",
+                             "llm-generated-university": "MIT"}]
+
+
+@pytest.mark.clean
+def test_main_enriches_only_new_result_ids(mocker):
+    """Archived pages are enriched for result IDs the database does not have yet."""
+    rows = [{"url": "/result/1"}, {"url": "/result/2"}]
+    scrape = mocker.MagicMock()
+    scrape.find_existing_ids.return_value = {1}
+    mocker.patch.dict('sys.modules', {'scrape': scrape})
+    mocker.patch.object(clean, 'load_pages', return_value=iter([]))
+    mocker.patch.object(clean, 'clean_pages', return_value=rows)
+    mocker.patch.object(clean, 'save_data')
+    mocker.patch.object(clean, 'llm_clean_command')
+    enrich_rows = mocker.patch.object(clean.enrich, 'enrich_rows')
+
+    clean.main(enrich_details=True, cache_path=None)
+    scrape.find_existing_ids.assert_called_once_with({1, 2})
+    enrich_rows.assert_called_with(rows, known_ids={1})
+
+    clean.main(rows=rows, enrich_details=True)  # Fused rows are new already
+    enrich_rows.assert_called_with(rows, known_ids=None)
+    assert scrape.find_existing_ids.call_count == 1
+
+
+@pytest.mark.clean
+def test_main_reports_page_cache_stats(tmp_path, mocker, capsys):
+    """With a cache path, archived pages go through the page cache, which is closed afterwards."""
+    html = read_page(CORPUS[0], as_bytes=False)
+    mocker.patch.object(clean, 'load_pages', return_value=iter([{"page": 1, "html": html}]))
+    save_data = mocker.patch.object(clean, 'save_data')
+    mocker.patch.object(clean, 'llm_clean_command')
+
+    clean.main(known_ids=set(), cache_path=str(tmp_path / 'cache.sqlite3'))
+
+    assert save_data.call_args.args[0] == clean.clean_html(html)
+    assert "Page cache: 0 hits, 1 misses, 0 evicted" in capsys.readouterr().out
@@ -0,0 +1,236 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'web_scraper'))
+import gzip
+import threading
+import psycopg_pool
+import pytest
+
+import http_client
+
+
+@pytest.fixture
+def crawl_queue(mocker):
+    """Import crawl_queue (and scrape) against a mocked connection pool."""
+    mocker.patch.dict('sys.modules', {'psycopg_pool': mocker.MagicMock()})
+    sys.modules.pop('scrape', None)
+    sys.modules.pop('crawl_queue', None)
+    import crawl_queue
+    mocker.patch.object(crawl_queue.scrape, 'get_controller')
+    mocker.patch.object(crawl_queue.time, 'sleep')
+    return crawl_queue
+
+
+def executed_sql(pool):
+    """Return the SQL text of every conn.execute call made through a mocked pool."""
+    conn = pool.connection.return_value.__enter__.return_value
+    return [call.args[0] for call in conn.execute.call_args_list]
+
+
+@pytest.mark.scrape
+def test_queue_statements(crawl_queue, mocker):
+    """Each queue operation runs its statement and reports the row count."""
+    pool = mocker.MagicMock()
+    conn = pool.connection.return_value.__enter__.return_value
+    conn.execute.return_value.rowcount = 3
+    conn.execute.return_value.fetchall.return_value = [(7,), (5,)]
+
+    assert crawl_queue.seed(0, 3, pool=pool) == 3
+    assert crawl_queue.claim('w1', limit=2, pool=pool) == [5, 7]
+    assert crawl_queue.complete(5, 'w1', b'<html>', pool=pool) is False
+    crawl_queue.fail(7, 'w1', 'timeout', pool=pool)
+    crawl_queue.release(7, 'w1', pool=pool)
+    assert crawl_queue.requeue_failed(pool=pool) == 3
+    assert crawl_queue.reap_expired(pool=pool) == 3
+
+    sql = executed_sql(pool)
+    assert 'CREATE TABLE IF NOT EXISTS crawl_pages' in sql[0]
+    assert 'FOR UPDATE SKIP LOCKED' in sql[2]
+    assert "attempts = GREATEST(attempts - 1, 0)" in sql[5]
+    assert "WHERE status = 'failed'" in sql[6]
+    assert gzip.decompress(conn.execute.call_args_list[3].args[1][0]) == b'<html>'
+
+
+@pytest.mark.scrape
+def test_progress(crawl_queue, mocker):
+    """progress() maps each status to its page count."""
+    pool = mocker.MagicMock()
+    conn = pool.connection.return_value.__enter__.return_value
+    conn.execute.return_value.fetchall.return_value = [('done', 4), ('failed', 1)]
+
+    assert crawl_queue.progress(pool=pool) == {'done': 4, 'failed': 1}
+
+
+@pytest.fixture
+def queue_calls(crawl_queue, mocker):
+    """Replace the queue operations with recorders; claims come from a scripted list."""
+    calls = {"claims": [], "complete": [], "fail": [], "release": []}
+    mocker.patch.object(crawl_queue, 'claim', side_effect=lambda *a, **k: calls["claims"].pop(0))
+    mocker.patch.object(crawl_queue, 'complete', side_effect=lambda page, *a: calls["complete"].append(page)
+                        or page != 3)
+    mocker.patch.object(crawl_queue, 'fail', side_effect=lambda page, *a: calls["fail"].append(page))
+    mocker.patch.object(crawl_queue, 'release', side_effect=lambda page, *a: calls["release"].append(page))
+    mocker.patch.object(crawl_queue, 'reap_expired')
+    mocker.patch.object(crawl_queue, 'progress', return_value={'done': 3})
+    return calls
+
+
+@pytest.mark.scrape
+def test_worker_completes_fails_and_discards(crawl_queue, queue_calls, mocker):
+    """Fetched pages complete, failed fetches count an attempt, lost leases are discarded."""
+    queue_calls["claims"] = [[1, 2, 3], []]
+    response = mocker.Mock(data=b'<html>')
+    mocker.patch.object(crawl_queue.scrape.http, 'request',
+                        side_effect=[response, http_client.HTTPStatusError('url', 503), response])
+
+    assert crawl_queue.run_worker(processes=2) == 1
+
+    crawl_queue.scrape.get_controller.assert_called_once_with(initial=1, adaptive=False, processes=2)
+    assert queue_calls["complete"] == [1, 3]
+    assert queue_calls["fail"] == [2]
+    assert queue_calls["release"] == []
+
+
+@pytest.mark.scrape
+def test_open_circuit_releases_pages_without_attempts(crawl_queue, queue_calls, mocker):
+    """While the breaker is open, claimed pages go back unattempted and the worker waits."""
+    queue_calls["claims"] = [[4, 5, 6], [4, 5, 6], []]
+    response = mocker.Mock(data=b'<html>')
+    mocker.patch.object(crawl_queue.scrape.http, 'request', side_effect=[
+        response, http_client.CircuitOpenError("open"), response, response, response,
+    ])
+
+    assert crawl_queue.run_worker() == 4
+
+    assert queue_calls["release"] == [5, 6]
+    assert queue_calls["fail"] == []
+    crawl_queue.time.sleep.assert_called_once_with(crawl_queue.scrape.http.breaker.reset_timeout)
+
+
+@pytest.mark.scrape
+def test_worker_waits_for_live_claims(crawl_queue, queue_calls):
+    """With nothing claimable but pages still claimed elsewhere, the worker waits and retries."""
+    queue_calls["claims"] = [[], []]
+    crawl_queue.progress.side_effect = [{'claimed': 2}, {'done': 2}]
+
+    assert crawl_queue.run_worker(idle_wait=1.5) == 0
+
+    assert crawl_queue.reap_expired.call_count == 2
+    crawl_queue.time.sleep.assert_called_once_with(1.5)
+
+
+@pytest.mark.scrape
+def test_run_workers_uses_spawn(crawl_queue, mocker):
+    """Local workers are spawned processes that share the crawl delay."""
+    get_context = mocker.patch.object(crawl_queue.multiprocessing, 'get_context')
+    pool = get_context.return_value.Pool.return_value.__enter__.return_value
+    pool.apply_async.return_value.get.return_value = 2
+
+    assert crawl_queue.run_workers(workers=3, batch_size=4, lease_seconds=60) == 6
+
+    get_context.assert_called_once_with('spawn')
+    pool.apply_async.assert_called_with(crawl_queue.run_worker, (4, 60, 5.0, 3))
+
+
+@pytest.mark.scrape
+def test_export_writes_done_pages(crawl_queue, mocker, tmp_path):
+    """Done pages are decompressed into a raw page archive in page order."""
+    pool = mocker.MagicMock()
+    cursor = pool.connection.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+    cursor.__iter__.return_value = iter([(1, gzip.compress(b'one')), (2, gzip.compress(b'two'))])
+
+    archive = crawl_queue.export(str(tmp_path / 'pages.gz'), pool=pool)
+
+    assert [(entry['page'], entry['html']) for entry in archive] == [(1, b'one'), (2, b'two')]
+
+
+@pytest.fixture(scope='module')
+def pg_server():
+    """A real connection pool on DATABASE_URL; tests using it are skipped without Postgres."""
+    url = os.getenv('DATABASE_URL', "postgresql://postgres@localhost:5432/module_3_db")
+    pool = psycopg_pool.ConnectionPool(url, min_size=1, max_size=4, open=False)
+    try:
+        pool.open(wait=True, timeout=3)
+    except psycopg_pool.PoolTimeout:
+        pool.close()
+        pytest.skip("PostgreSQL is not reachable at DATABASE_URL")
+    yield pool
+    pool.close()
+
+
+@pytest.fixture
+def pg_pool(pg_server):
+    """The real pool with a fresh crawl_pages table, dropped again afterwards."""
+    with pg_server.connection() as conn:
+        conn.execute("DROP TABLE IF EXISTS crawl_pages")
+    yield pg_server
+    with pg_server.connection() as conn:
+        conn.execute("DROP TABLE IF EXISTS crawl_pages")
+
+
+@pytest.mark.db
+def test_concurrent_claimers_get_disjoint_pages(crawl_queue, pg_pool):
+    """Claimers racing for the same rows never share a page, and together take all of them."""
+    crawl_queue.seed(0, 40, pool=pg_pool)
+    claimed = {'w1': [], 'w2': []}
+    start = threading.Barrier(2)
+
+    def work(worker):
+        start.wait()
+        while pages := crawl_queue.claim(worker, limit=3, pool=pg_pool):
+            claimed[worker].extend(pages)
+
+    threads = [threading.Thread(target=work, args=(worker,)) for worker in claimed]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not set(claimed['w1']) & set(claimed['w2'])
+    assert sorted(claimed['w1'] + claimed['w2']) == list(range(40))
+
+
+@pytest.mark.db
+def test_claim_skips_rows_locked_by_an_open_claim(crawl_queue, pg_pool):
+    """A claim still in flight on another connection is skipped over, not waited on."""
+    crawl_queue.seed(0, 6, pool=pg_pool)
+    with pg_pool.connection() as conn:
+        rows = conn.execute(crawl_queue.CLAIM_SQL, {
+            "worker": 'w1', "lease": 60, "max_attempts": 5, "limit": 3,
+        }).fetchall()
+        assert sorted(row[0] for row in rows) == [0, 1, 2]
+
+        # w1's transaction is still open, so its rows are locked, not yet claimed
+        assert crawl_queue.claim('w2', limit=6, pool=pg_pool) == [3, 4, 5]
+
+
+@pytest.mark.db
+def test_expired_leases_are_taken_over_and_reaped(crawl_queue, pg_pool):
+    """An expired claim goes to the next worker; once out of attempts it is marked failed."""
+    crawl_queue.seed(0, 2, pool=pg_pool)
+    assert crawl_queue.claim('w1', lease_seconds=0, pool=pg_pool) == [0, 1]
+
+    assert crawl_queue.claim('w2', limit=1, lease_seconds=0, max_attempts=2, pool=pg_pool) == [0]
+    assert crawl_queue.complete(0, 'w1', b'<html>', pool=pg_pool) is False  # Lease lost to w2
+
+    assert crawl_queue.reap_expired(max_attempts=2, pool=pg_pool) == 1
+    assert crawl_queue.progress(pool=pg_pool) == {'failed': 1, 'claimed': 1}
+    assert crawl_queue.claim('w3', max_attempts=2, pool=pg_pool) == [1]
+
+
+@pytest.mark.db
+def test_failed_pages_are_requeued_after_max_attempts(crawl_queue, pg_pool):
+    """Failures return a page to pending until max attempts; requeue_failed makes it claimable again."""
+    crawl_queue.seed(7, 8, pool=pg_pool)
+    for attempt in (1, 2):
+        assert crawl_queue.claim('w1', max_attempts=2, pool=pg_pool) == [7]
+        crawl_queue.fail(7, 'w1', f'timeout {attempt}', max_attempts=2, pool=pg_pool)
+
+    assert crawl_queue.progress(pool=pg_pool) == {'failed': 1}
+    assert crawl_queue.claim('w1', max_attempts=2, pool=pg_pool) == []
+
+    assert crawl_queue.requeue_failed(pool=pg_pool) == 1
+    assert crawl_queue.claim('w1', max_attempts=2, pool=pg_pool) == [7]
+    assert crawl_queue.complete(7, 'w1', b'<html>', pool=pg_pool) is True
+    assert crawl_queue.progress(pool=pg_pool) == {'done': 1}
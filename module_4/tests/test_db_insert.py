@@ -140,18 +140,18 @@ def test_add_to_db_function_behavior(app_instance, mocker):
     
     # Mock the load_data module
     mock_load_data = mocker.patch('src.webpage.app.load_data')
-    mock_json = mocker.patch('src.webpage.app.json')
-    mock_open = mocker.patch('builtins.open', mocker.mock_open(read_data='{"test": "data"}'))
     
-    # Mock json.load to return test data
-    mock_json.load.return_value = {"test": "data"}
+    # Mock load_data.iter_rows to stream test rows
+    rows = iter([{"test": "data"}])
+    mock_load_data.iter_rows.return_value = rows
     
     # Call the function
     app_module.add_to_db()
     
-    # Verify it tried to open the file and call load_data
-    mock_open.assert_called()
-    mock_load_data.add_applicant_data.assert_called_once_with({"test": "data"})
+    # Verify it streamed the compact JSON Lines file into add_applicant_data
+    assert mock_load_data.iter_rows.call_args[0][0].endswith('update_llm_extend_applicant_data.jsonl')
+    mock_load_data.add_applicant_data.assert_called_once_with({"rows": rows})
+    mock_load_data.load_data.assert_not_called()
 
 @pytest.mark.db
 @pytest.mark.parametrize("query_type,expected_columns", [
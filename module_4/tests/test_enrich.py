@@ -0,0 +1,164 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'web_scraper'))
+import threading
+import time
+import pytest
+
+import enrich
+import http_client
+
+DETAIL_PAGE = os.path.join(os.path.dirname(__file__), 'fixtures', 'detail_pages', 'result_989988.html')
+
+
+def read_detail_page():
+    with open(DETAIL_PAGE, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def detail_site(site, monkeypatch, tmp_path):
+    """Serve detail pages locally through a fresh, quickly-retrying client and cache."""
+    base_url, routes = site
+    monkeypatch.setattr(enrich, 'DETAIL_URL', base_url + "/result/{}")
+    monkeypatch.setattr(enrich, '_client', http_client.ResilientClient(max_retries=0, backoff_base=0))
+    return routes, enrich.DetailCache(str(tmp_path / 'detail_cache'))
+
+
+@pytest.mark.scrape
+def test_parse_detail_fixture():
+    """Labelled fields map to row fields; zero scores and unmapped labels are left out."""
+    fields = enrich.parse_detail(read_detail_page())
+
+    assert fields == {
+        "Degree": "PhD",
+        "US/International": "International",
+        "gpa": 3.95,
+        "gre": 321.0,
+        "gre_v": 156.0,
+        "comments": "Funded offer, interview in August.",
+    }
+
+
+@pytest.mark.scrape
+def test_parse_detail_skips_unusable_values():
+    """Unknown origins, missing numbers and labels without a value are ignored."""
+    html = ("<dl><dt>Degree's Country of Origin</dt><dd>Other</dd>"
+            "<dt>Undergrad GPA</dt><dd>n/a</dd><dt>Notes</dt></dl>")
+
+    assert enrich.parse_detail(html) == {}
+
+
+@pytest.mark.scrape
+def test_detail_cache_is_content_addressed(tmp_path):
+    """Identical pages are stored once; each ID points at its page's digest."""
+    cache = enrich.DetailCache(str(tmp_path))
+
+    digest = cache.put(1, b'<html>same</html>')
+    assert cache.put(2, b'<html>same</html>') == digest
+    assert 1 in cache and 3 not in cache
+    assert cache.get(2) == b'<html>same</html>'
+    assert cache.get(3) is None
+    assert len(os.listdir(os.path.join(str(tmp_path), 'objects', digest[:2]))) == 1
+
+
+@pytest.mark.scrape
+def test_detail_cache_write_is_atomic(tmp_path, mocker):
+    """A failed write leaves no temporary or partial file behind."""
+    cache = enrich.DetailCache(str(tmp_path))
+    mocker.patch.object(enrich.os, 'replace', side_effect=OSError("disk full"))
+
+    with pytest.raises(OSError):
+        cache.put(1, b'<html>')
+
+    assert 1 not in cache
+    assert not [name for _, _, files in os.walk(str(tmp_path)) for name in files]
+
+
+@pytest.mark.scrape
+def test_enrich_rows_fills_only_new_empty_fields(detail_site, capsys):
+    """Only unknown IDs are fetched, and listing values always win over the detail page."""
+    routes, cache = detail_site
+    routes['/result/989988'] = [(200, {}, read_detail_page())]
+    routes['/result/989987'] = [(500, {}, b'')]
+    rows = [
+        {"url": "https://www.thegradcafe.com/result/989988", "gpa": 3.7, "gre": None},
+        {"url": "https://www.thegradcafe.com/result/989987", "gpa": None},
+        {"url": "https://www.thegradcafe.com/result/989986", "gpa": None},
+        {"url": None, "gpa": None},
+    ]
+
+    enrich.enrich_rows(rows, cache=cache, known_ids={989986})
+
+    assert rows[0]["gpa"] == 3.7
+    assert rows[0]["gre"] == 321.0
+    assert rows[1]["gpa"] is None  # Fetch failed; retried on the next run
+    assert rows[2] == {"url": "https://www.thegradcafe.com/result/989986", "gpa": None}
+    assert 989986 not in cache and 989987 not in cache
+    assert "0 cached, 1 fetched, 0 gone, 1 failed" in capsys.readouterr().out
+
+    enrich.enrich_rows([{"url": "/result/989988", "gre": None}], cache=cache)
+    assert "1 cached, 0 fetched, 0 gone, 0 failed" in capsys.readouterr().out
+
+
+@pytest.mark.scrape
+def test_dead_ids_are_cached_as_gone(detail_site, capsys):
+    """A 404 is recorded and never requested again; throttling is retried next run."""
+    routes, cache = detail_site
+    routes['/result/5'] = [(404, {}, b'')]
+    routes['/result/6'] = [(429, {}, b'')]
+
+    assert enrich.fetch_details([5, 6], cache=cache) == {}
+    assert "0 cached, 0 fetched, 1 gone, 1 failed" in capsys.readouterr().out
+    assert 5 in cache and 6 not in cache
+    assert cache.get(5) == b''
+
+    routes['/result/5'] = [(200, {}, b'<html>back</html>')]
+    assert enrich.fetch_details([5], cache=cache) == {}
+    assert "0 cached, 0 fetched, 1 gone, 0 failed" in capsys.readouterr().out
+
+
+@pytest.mark.scrape
+def test_result_ids():
+    """Result IDs come from row urls; rows without one are skipped."""
+    rows = [{"url": "/result/5"}, {"url": None}, {}, {"url": "https://x/result/7"}]
+
+    assert enrich.result_ids(rows) == [5, 7]
+
+
+@pytest.mark.scrape
+def test_shared_client_is_paced(mocker, monkeypatch):
+    """The detail client is created once and paced to the site's robots.txt."""
+    monkeypatch.setattr(enrich, '_client', None)
+    pace = mocker.patch.object(http_client.ResilientClient, 'pace')
+
+    client = enrich._http()
+
+    assert enrich._http() is client
+    pace.assert_called_once_with(enrich.BASE_URL, initial=enrich.ENRICH_CONCURRENCY,
+                                 max_limit=enrich.ENRICH_CONCURRENCY)
+
+
+@pytest.mark.scrape
+def test_shared_client_is_created_once_across_threads(mocker, monkeypatch):
+    """Fetch workers racing on first use all get the same client."""
+    monkeypatch.setattr(enrich, '_client', None)
+    start = threading.Barrier(8)
+    # A slow constructor widens the window in which every worker sees no client
+    client_class = mocker.patch.object(enrich.http_client, 'ResilientClient',
+                                       side_effect=lambda **k: time.sleep(0.05) or mocker.Mock())
+    clients = []
+
+    def worker():
+        start.wait()
+        clients.append(enrich._http())
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    client_class.assert_called_once()
+    assert len(clients) == 8 and all(client is enrich._client for client in clients)
@@ -43,13 +43,27 @@ def test_app_factory_config(app_instance):
         assert '/rescrape' in routes  # pull data route
         assert '/refresh' in routes  # update analysis route 
 
+@pytest.mark.web
+def test_app_factory_migrates_schema(mocker):
+    """Test app factory runs the schema migration and still starts when it fails."""
+    from src.webpage import app as app_module
+
+    mock_load_data = mocker.patch.object(app_module, 'load_data')
+    app_module.create_app({'TESTING': True})
+    mock_load_data.ensure_schema.assert_called_once()
+
+    mock_print = mocker.patch('builtins.print')
+    mock_load_data.ensure_schema.side_effect = Exception("connection refused")
+    assert app_module.create_app({'TESTING': True}) is not None
+    mock_print.assert_called_with("Error migrating database schema: connection refused")
+
 
 @pytest.mark.web
 def test_get_analysis_page_load(client, mocker):
     """Test GET /analysis (page load) - Status 200, contains buttons, contains analysis content"""
     # Mock the execute_query function to return realistic test data
     def mock_execute_query(query):
-        if "COUNT (*)" in query and "Fall 2025" in query:
+        if "COUNT (*)" in query and "term_season = 'Fall' AND term_year = 2025" in query:
             return [(150,)]
         elif "international_percentage" in query:
             return [(25.50,)]
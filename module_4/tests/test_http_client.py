@@ -0,0 +1,295 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'web_scraper'))
+import threading
+import pytest
+import urllib3
+
+import http_client
+
+
+def make_client(**kwargs):
+    kwargs.setdefault('backoff_base', 0)
+    kwargs.setdefault('max_retries', 2)
+    return http_client.ResilientClient(**kwargs)
+
+
+class RecordingController:
+    def __init__(self):
+        self.started = 0
+        self.observed = []
+
+    def before_request(self):
+        self.started += 1
+
+    def observe(self, status, latency):
+        self.observed.append(status)
+
+
+@pytest.mark.scrape
+def test_redirect_is_followed(site):
+    """A 301 from the site returns the target page, not an empty redirect body."""
+    base_url, routes = site
+    routes['/survey/'] = [(301, {'Location': '/survey/?page=1'}, b'')]
+    routes['/survey/?page=1'] = [(200, {}, b'<html>page 1</html>')]
+
+    response = make_client().request('GET', f"{base_url}/survey/")
+
+    assert response.status == 200
+    assert response.data == b'<html>page 1</html>'
+
+
+@pytest.mark.scrape
+def test_unfollowable_redirect_raises(site):
+    """A 3xx urllib3 cannot follow is an error, never a successful empty page."""
+    base_url, routes = site
+    routes['/moved'] = [(302, {}, b'')]
+    client = make_client()
+
+    with pytest.raises(http_client.HTTPStatusError) as exc_info:
+        client.request('GET', f"{base_url}/moved")
+
+    assert exc_info.value.status == 302
+    assert client.stats_snapshot()['retries'] == 0
+    assert client.breaker.state == 'closed'
+
+
+@pytest.mark.scrape
+def test_server_errors_are_retried(site):
+    """5xx responses are retried with backoff until one succeeds."""
+    base_url, routes = site
+    routes['/flaky'] = [(503, {}, b''), (500, {}, b''), (200, {}, b'ok')]
+    controller = RecordingController()
+    client = make_client(controller=controller)
+
+    assert client.request('GET', f"{base_url}/flaky").data == b'ok'
+
+    stats = client.stats_snapshot()
+    assert stats['requests'] == 3
+    assert stats['retries'] == 2
+    assert stats['failures'] == 2
+    assert controller.started == 3
+    assert controller.observed == [503, 500, 200]
+
+
+@pytest.mark.scrape
+def test_error_status_raised_after_last_retry(site):
+    """The last error status is raised once retries run out."""
+    base_url, routes = site
+    routes['/down'] = [(502, {}, b'')]
+    client = make_client(max_retries=1)
+
+    with pytest.raises(http_client.HTTPStatusError) as exc_info:
+        client.request('GET', f"{base_url}/down")
+
+    assert exc_info.value.status == 502
+    assert client.stats_snapshot()['requests'] == 2
+
+
+@pytest.mark.scrape
+def test_client_error_is_not_retried(site):
+    """A 404 will not improve with retries and does not count against the breaker."""
+    base_url, routes = site
+    routes['/missing'] = [(404, {}, b'')]
+    client = make_client()
+
+    with pytest.raises(http_client.HTTPStatusError):
+        client.request('GET', f"{base_url}/missing")
+
+    assert client.stats_snapshot()['requests'] == 1
+    assert client.breaker.failures == 0
+
+
+@pytest.mark.scrape
+def test_connection_errors_are_retried_then_raised():
+    """Connection failures are retried, reported to the controller as None, then raised."""
+    controller = RecordingController()
+    client = make_client(max_retries=1, controller=controller)
+
+    with pytest.raises(urllib3.exceptions.HTTPError):
+        client.request('GET', "http://127.0.0.1:1/")
+
+    assert client.stats_snapshot()['failures'] == 2
+    assert controller.observed == [None, None]
+
+
+@pytest.mark.scrape
+def test_breaker_opens_and_rejects(site):
+    """Once the breaker trips, requests fail fast without contacting the site."""
+    base_url, routes = site
+    routes['/down'] = [(503, {}, b'')]
+    breaker = http_client.CircuitBreaker(threshold=2, reset_timeout=60)
+    client = make_client(max_retries=3, breaker=breaker)
+
+    with pytest.raises(http_client.CircuitOpenError):
+        client.request('GET', f"{base_url}/down")
+
+    stats = client.stats_snapshot()
+    assert stats['requests'] == 2
+    assert stats['breaker_trips'] == 1
+    assert stats['breaker_rejections'] == 1
+    assert breaker.state == 'open'
+
+
+@pytest.mark.scrape
+def test_breaker_half_open_trial():
+    """After the cool-down one trial is allowed; its outcome closes or reopens the breaker."""
+    breaker = http_client.CircuitBreaker(threshold=1, reset_timeout=0)
+    assert breaker.record_failure() is True
+    assert breaker.state == 'half-open'
+
+    assert breaker.allow() is True
+    assert breaker.allow() is False  # Only one trial at a time
+    assert breaker.record_failure() is True  # A failed trial reopens the breaker
+
+    assert breaker.allow() is True
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.record_failure() is True
+
+
+@pytest.mark.scrape
+def test_unexpected_error_releases_trial(mocker):
+    """A non-urllib3 error during the half-open trial does not block later trials."""
+    breaker = http_client.CircuitBreaker(threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    client = make_client(breaker=breaker)
+    mocker.patch.object(client.pool, 'request', side_effect=ValueError("bad header"))
+
+    with pytest.raises(ValueError):
+        client.request('GET', "http://example.invalid/")
+
+    assert breaker.trial_in_flight is False
+    assert breaker.allow() is True
+
+
+@pytest.mark.scrape
+def test_backoff_honors_retry_after(mocker):
+    """Retry-After raises the delay, up to the backoff cap."""
+    client = make_client(backoff_base=0.5, backoff_cap=30.0)
+    response = mocker.Mock(headers={'Retry-After': '12'})
+
+    assert client._backoff(0, response) == 12
+    response.headers = {'Retry-After': '120'}
+    assert client._backoff(0, response) == 30.0
+    response.headers = {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}
+    assert client._backoff(0, response) <= 0.5
+
+
+@pytest.fixture
+def fresh_controllers(monkeypatch):
+    """Give each test its own per-site controller registry."""
+    monkeypatch.setattr(http_client, '_site_controllers', {})
+
+
+@pytest.mark.scrape
+def test_crawl_delay_from_robots(site):
+    """The slower of Crawl-delay and Request-rate wins."""
+    base_url, routes = site
+    routes['/robots.txt'] = [(200, {}, b"User-agent: *\nCrawl-delay: 2\nRequest-rate: 1/5\n")]
+
+    assert http_client.get_crawl_delay(make_client(), base_url) == 5.0
+
+
+@pytest.mark.scrape
+def test_crawl_delay_missing_or_unreadable(site, capsys):
+    """No robots.txt means no delay; other errors are reported and also mean no delay."""
+    base_url, routes = site
+    routes['/robots.txt'] = [(404, {}, b'')]
+    assert http_client.get_crawl_delay(make_client(), base_url) is None
+    assert capsys.readouterr().out == ""
+
+    routes['/robots.txt'] = [(403, {}, b'')]
+    assert http_client.get_crawl_delay(make_client(), base_url) is None
+    assert "Error reading robots.txt" in capsys.readouterr().out
+
+    assert http_client.get_crawl_delay(make_client(max_retries=0), "http://127.0.0.1:1") is None
+    assert "Error reading robots.txt" in capsys.readouterr().out
+
+    routes['/robots.txt'] = [(200, {}, b"User-agent: *\nDisallow: /private\n")]
+    assert http_client.get_crawl_delay(make_client(), base_url) is None
+
+
+@pytest.mark.scrape
+def test_pace_shares_one_controller_per_site(site, fresh_controllers):
+    """Every client paced to a site shares the controller built on the first call."""
+    base_url, routes = site
+    routes['/robots.txt'] = [(200, {}, b"User-agent: *\nCrawl-delay: 3\n")]
+    first, second = make_client(), make_client()
+
+    controller = first.pace(base_url, processes=4, initial=2, max_limit=2)
+
+    assert controller.crawl_delay == 12.0  # Four processes share the site's delay
+    assert controller.limit == 2
+    assert second.pace(base_url, initial=16) is controller
+    assert first.controller is second.controller is controller
+
+
+@pytest.mark.scrape
+def test_aimd_increases_on_healthy_responses():
+    """About one extra request per round trip of healthy responses, up to max_limit."""
+    controller = http_client.AdaptiveConcurrency(initial=2, max_limit=3)
+
+    for _ in range(3):  # 2 -> 2.5 -> 2.9 -> 3.24
+        controller.observe(200, 0.1)
+    assert controller.limit == 3
+    for _ in range(10):
+        controller.observe(200, 0.1)
+
+    assert controller.limit == 3
+    assert controller.stats == {"increases": 1, "decreases": 0}
+
+
+@pytest.mark.scrape
+def test_aimd_halves_on_pushback_once_per_cooldown(mocker):
+    """429, 5xx and errors halve the limit, but a burst only counts once."""
+    clock = mocker.patch('http_client.time.monotonic', return_value=100.0)
+    controller = http_client.AdaptiveConcurrency(initial=16)
+
+    controller.observe(429, 1.0)
+    controller.observe(503, 1.0)  # Same burst: still inside the cooldown
+    assert controller.limit == 8
+
+    clock.return_value = 102.0
+    controller.observe(None, 1.0)
+    assert controller.limit == 4
+    assert controller.stats["decreases"] == 2
+
+
+@pytest.mark.scrape
+def test_aimd_treats_rising_latency_as_pushback():
+    """A latency well above the fastest seen lowers the limit, never below min_limit."""
+    controller = http_client.AdaptiveConcurrency(initial=2, min_limit=1, latency_factor=3.0)
+
+    controller.observe(200, 0.1)
+    limit = controller.limit
+    controller.observe(200, 0.5)
+    assert controller.limit < limit
+
+    controller._cooldown_until = 0.0
+    controller.observe(200, 0.5)
+    assert controller.limit == 1
+
+
+@pytest.mark.scrape
+def test_before_request_waits_for_a_free_slot_and_crawl_delay(mocker):
+    """Attempts block at the limit and their starts are spaced by the crawl delay."""
+    sleep = mocker.patch('http_client.time.sleep')
+    controller = http_client.AdaptiveConcurrency(initial=1, max_limit=1, crawl_delay=2.0)
+    controller.before_request()
+
+    started = threading.Event()
+
+    def second_attempt():
+        controller.before_request()
+        started.set()
+
+    thread = threading.Thread(target=second_attempt)
+    thread.start()
+    assert not started.wait(0.05)  # The only slot is taken
+
+    controller.observe(200, 0.1)
+    thread.join()
+    assert started.is_set()
+    assert sleep.call_count == 1
+    assert 0 < sleep.call_args[0][0] <= 2.0
@@ -0,0 +1,138 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+import io
+import json
+import pytest
+
+import json_stream
+
+ROWS = [
+    {"program": "Computer Science, Stanford University", "gpa": 3.9, "gre": None},
+    {"program": "Physics, MIT", "comments": "Funding \"confirmed\" ☃", "gre_v": 165},
+    {"program": "Economics", "scores": [1, [2.5, {}]], "gre_aw": 12345},
+]
+
+LAYOUTS = {
+    "array": json.dumps(ROWS),
+    "array_indented": json.dumps(ROWS, indent=2),
+    "rows_object": json.dumps({"count": 3, "rows": ROWS}, indent=2),
+    "rows_object_key_after": json.dumps({"rows": ROWS, "meta": {"v": [1, 2]}}, indent=2),
+    "rows_object_one_line": json.dumps({"rows": ROWS}),
+    "jsonl": "".join(json.dumps(row) + "\n" for row in ROWS),
+}
+
+
+def records(text, **kwargs):
+    return list(json_stream.iter_records(io.StringIO(text), **kwargs))
+
+
+@pytest.mark.stream
+@pytest.mark.parametrize("chunk_size", [1, 5, json_stream.CHUNK_SIZE])
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_layouts_yield_the_same_rows(layout, chunk_size):
+    """Every supported layout yields the rows, whatever the read chunk size."""
+    assert records(LAYOUTS[layout], chunk_size=chunk_size) == ROWS
+
+
+@pytest.mark.stream
+def test_numbers_split_across_chunks():
+    """A number at the end of a read chunk is not cut short."""
+    assert records("[12345, 678]", chunk_size=3) == [12345, 678]
+
+
+@pytest.mark.stream
+def test_records_are_read_incrementally():
+    """Records are yielded before the rest of the file has been read."""
+    f = io.StringIO(json.dumps([{"n": i} for i in range(1000)]))
+    stream = json_stream.iter_records(f, chunk_size=64)
+
+    assert next(stream) == {"n": 0}
+    assert f.tell() < 200
+
+
+@pytest.mark.stream
+def test_jsonl_skips_invalid_and_blank_lines():
+    """Lines that are not valid JSON are skipped, as in the old JSONL fallback."""
+    text = 'not json\n{"a": 1}\n\n{"b": \n{"c": 3}'
+    assert records(text) == [{"a": 1}, {"c": 3}]
+
+
+@pytest.mark.stream
+@pytest.mark.parametrize("text,expected", [
+    ("", []),
+    ("  [ ]  ", []),
+    ("{\n}", [{}]),
+    ('{"program": "CS"}', [{"program": "CS"}]),
+    ('{\n "program": "CS"\n}', [{"program": "CS"}]),
+])
+def test_small_documents(text, expected):
+    """Empty files and objects without 'rows' are handled."""
+    assert records(text) == expected
+
+
+@pytest.mark.stream
+@pytest.mark.parametrize("text", [
+    '[{"a": 1}, {"a": ',
+    '[1 2]',
+    '{\n "rows": [1, 2',
+    '{\n 5: 1}',
+    '{\n "rows" [1]}',
+])
+def test_malformed_documents_raise(text):
+    """A corrupt array or 'rows' document raises instead of losing rows silently."""
+    with pytest.raises(json.JSONDecodeError):
+        records(text)
+
+
+@pytest.mark.stream
+def test_custom_key():
+    """Records can be held under another top-level key."""
+    assert records('{\n "pages": [{"page": 1}]\n}', key="pages") == [{"page": 1}]
+
+
+@pytest.mark.stream
+def test_iter_file(tmp_path):
+    """iter_file opens the file and streams its records."""
+    path = tmp_path / "rows.json"
+    path.write_text(LAYOUTS["rows_object"], encoding="utf-8")
+
+    assert list(json_stream.iter_file(str(path))) == ROWS
+
+
+@pytest.mark.stream
+def test_write_file_is_compact_and_round_trips(tmp_path):
+    """write_file writes one compact line per record that the readers stream back."""
+    path = tmp_path / "rows.jsonl"
+
+    assert json_stream.write_file(str(path), iter(ROWS)) == len(ROWS)
+
+    text = path.read_text(encoding="utf-8")
+    assert text.splitlines()[0] == '{"program":"Computer Science, Stanford University","gpa":3.9,"gre":null}'
+    assert "☃" in text  # Not escaped
+    assert list(json_stream.iter_file(str(path))) == ROWS
+    assert len(text) < len(LAYOUTS["array_indented"]) * 0.8
+
+
+@pytest.mark.stream
+def test_write_file_keeps_old_file_on_error(tmp_path):
+    """A record that cannot be serialized leaves the previous file and no temp file."""
+    path = tmp_path / "rows.jsonl"
+    json_stream.write_file(str(path), ROWS)
+
+    with pytest.raises(TypeError):
+        json_stream.write_file(str(path), [{"ok": 1}, {"bad": object()}])
+
+    assert list(json_stream.iter_file(str(path))) == ROWS
+    assert [p.name for p in tmp_path.iterdir()] == ["rows.jsonl"]
+
+
+@pytest.mark.stream
+@pytest.mark.parametrize("layout", ["array_indented", "rows_object", "rows_object_key_after"])
+def test_convert_file(tmp_path, layout):
+    """Legacy JSON documents convert to JSON Lines with the same records."""
+    src, dst = tmp_path / "legacy.json", tmp_path / "rows.jsonl"
+    src.write_text(LAYOUTS[layout], encoding="utf-8")
+
+    assert json_stream.convert_file(str(src), str(dst)) == len(ROWS)
+    assert dst.read_text(encoding="utf-8") == "".join(json_stream.dumps(row) + "\n" for row in ROWS)
@@ -1,6 +1,7 @@
 import sys
 import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 import pytest
 import json
 
@@ -18,6 +19,8 @@ def mock_database_modules(mocker):
     mock_conn.cursor.return_value.__exit__.return_value = None
     
     mocker.patch('psycopg_pool.ConnectionPool', return_value=mock_pool)
+    # Loader tests count statements on an already migrated database
+    mocker.patch('src.load_data._schema_ready', True)
     
     return mock_pool, mock_conn, mock_cursor
 
@@ -124,12 +127,13 @@ def test_add_applicant_data(mock_database_modules):
     # Verify database operations
     mock_pool.getconn.assert_called_once()
     mock_conn.cursor.assert_called_once()
-    mock_cursor.execute.assert_called_once()
+    mock_cursor.executemany.assert_called_once()
+    mock_cursor.execute.assert_not_called()  # No result ID, so no cursor advance
     mock_conn.commit.assert_called_once()
     mock_pool.close.assert_called_once()
     
     # Verify INSERT SQL was executed
-    executed_sql = mock_cursor.execute.call_args[0][0]
+    executed_sql = mock_cursor.executemany.call_args[0][0]
     assert "INSERT INTO applicants" in executed_sql
 
 @pytest.mark.db
@@ -154,7 +158,7 @@ def test_add_applicant_data_master_copy(mock_database_modules):
     load_data.add_applicant_data_master_copy(test_data)
     
     # Verify database operations
-    mock_cursor.execute.assert_called_once()
+    mock_cursor.executemany.assert_called_once()
     mock_conn.commit.assert_called_once()
     mock_pool.close.assert_called_once()
 
@@ -201,3 +205,290 @@ def test_load_data_jsonl_with_invalid_lines(mocker):
     # Should skip the invalid line and continue
     expected = {"rows": [{"name": "test1", "value": 1}, {"name": "test2", "value": 2}]}
     assert result == expected
+
+@pytest.mark.db
+@pytest.mark.parametrize("url,expected", [
+    ("https://www.thegradcafe.com/result/12345", 12345),
+    ("/result/7", 7),
+    ("https://www.thegradcafe.com/survey/", None),
+    (None, None),
+])
+def test_extract_result_id(url, expected):
+    """Test extract_result_id pulls the numeric ID out of applicant URLs."""
+    from src import load_data
+
+    assert load_data.extract_result_id(url) == expected
+
+@pytest.mark.db
+def test_add_applicant_data_inserts_result_id(mock_database_modules):
+    """Test add_applicant_data stores the parsed result_id and skips duplicates."""
+    from src import load_data
+
+    mock_pool, mock_conn, mock_cursor = mock_database_modules
+
+    test_data = {
+        "rows": [
+            {
+                'program': 'CS', 'comments': None, 'date_added': '2024-01-01',
+                'url': 'https://www.thegradcafe.com/result/98765', 'status': 'Accepted',
+                'Term': 'Fall 2025', 'US/International': 'American', 'gpa': 3.8,
+                'gre': 320, 'gre_v': 160, 'gre_aw': 4.5, 'Degree': 'Masters',
+                'llm-generated-program': 'Computer Science',
+                'llm-generated-university': 'Test University'
+            }
+        ]
+    }
+
+    load_data.add_applicant_data(test_data)
+
+    executed_sql, (params,) = mock_cursor.executemany.call_args[0]
+    assert "result_id" in executed_sql
+    assert "ON CONFLICT (result_id) DO NOTHING" in executed_sql
+    assert params[-1] == 98765
+
+@pytest.mark.db
+def test_create_applicant_table_builds_result_id_index(mock_database_modules):
+    """Test create_applicant_table adds the unique result_id index."""
+    from src import load_data
+
+    mock_pool, mock_conn, mock_cursor = mock_database_modules
+
+    load_data.create_applicant_table()
+
+    executed_sql = " ".join(call[0][0] for call in mock_cursor.execute.call_args_list)
+    assert "result_id INTEGER" in executed_sql
+    assert "CREATE UNIQUE INDEX IF NOT EXISTS applicants_result_id_idx" in executed_sql
+
+@pytest.mark.db
+def test_add_applicant_data_stores_structured_columns(mock_database_modules):
+    """Test add_applicant_data derives decision and term columns for old rows."""
+    from src import load_data
+
+    mock_pool, mock_conn, mock_cursor = mock_database_modules
+
+    test_data = {
+        "rows": [
+            {
+                'program': 'CS', 'date_added': 'March 7, 2025',
+                'url': 'https://www.thegradcafe.com/result/98765',
+                'status': 'Accepted on 3 Mar', 'Term': 'Fall 2025'
+            }
+        ]
+    }
+
+    load_data.add_applicant_data(test_data)
+
+    executed_sql, (params,) = mock_cursor.executemany.call_args[0]
+    assert "decision, decision_date, term_season, term_year, result_id" in executed_sql
+    assert executed_sql.count("%s") == len(params) == 19
+    assert params[-5:] == ('accepted', '2025-03-03', 'Fall', 2025, 98765)
+
+@pytest.mark.db
+def test_create_applicant_table_builds_structured_indexes(mock_database_modules):
+    """Test create_applicant_table adds the typed decision and term columns."""
+    from src import load_data
+
+    mock_pool, mock_conn, mock_cursor = mock_database_modules
+
+    load_data.create_applicant_table()
+
+    executed_sql = " ".join(call[0][0] for call in mock_cursor.execute.call_args_list)
+    assert "decision_date DATE" in executed_sql
+    assert "term_year SMALLINT" in executed_sql
+    assert "applicants_term_idx" in executed_sql
+    assert "applicants_decision_idx" in executed_sql
+
+@pytest.mark.db
+def test_add_structured_columns(mocker, mock_database_modules):
+    """Test add_structured_columns backfills unflagged rows a chunk at a time, then indexes."""
+    from src import load_data
+
+    mock_pool, mock_conn, mock_cursor = mock_database_modules
+    mocker.patch.object(load_data, 'LOAD_BATCH_SIZE', 2)
+    mock_cursor.fetchall.side_effect = [
+        [(1, 'Rejected on 28 Dec', 'January 2, 2025', 'Spring 2025'), (2, 'Pending', None, '2025')],
+        [(3, None, None, 'TBD')],
+        [],
+    ]
+
+    load_data.add_structured_columns()
+
+    executed = [call[0] for call in mock_cursor.execute.call_args_list]
+    assert "ADD COLUMN IF NOT EXISTS structured_parsed BOOLEAN" in executed[0][0]
+    assert "SET DEFAULT true" in executed[0][0]
+    assert "WHERE structured_parsed IS NULL" in executed[1][0]
+    assert executed[1][1] == (2,)
+    assert executed[2] == (load_data.STRUCTURED_BACKFILL_SQL, [
+        [1, 2], ['rejected', 'other'], ['2024-12-28', None], ['Spring', None], [2025, 2025],
+    ])
+    assert executed[4] == (load_data.STRUCTURED_BACKFILL_SQL, [[3], [None], [None], [None], [None]])
+    assert "applicants_decision_idx" in executed[6][0]
+    assert len(executed) == 7  # Every row is read once, even when no year could be derived
+    mock_cursor.executemany.assert_not_called()
+    assert mock_conn.commit.call_count == 4
+    mock_pool.close.assert_called_once()
+
+@pytest.mark.db
+def test_add_result_id_column(mock_database_modules):
+    """Test add_result_id_column adds, backfills and indexes result_id."""
+    from src import load_data
+
+    mock_pool, mock_conn, mock_cursor = mock_database_modules
+
+    load_data.add_result_id_column()
+
+    executed_sql = [call[0][0] for call in mock_cursor.execute.call_args_list]
+    assert len(executed_sql) == 3
+    assert "ADD COLUMN IF NOT EXISTS result_id" in executed_sql[0]
+    assert "UPDATE applicants" in executed_sql[1]
+    assert "CREATE UNIQUE INDEX IF NOT EXISTS" in executed_sql[2]
+    mock_conn.commit.assert_called_once()
+    mock_pool.close.assert_called_once()
+
+@pytest.mark.db
+def test_add_applicant_data_advances_crawl_cursor(mock_database_modules):
+    """Test add_applicant_data moves the crawl cursor after the rows are committed."""
+    from src import load_data
+
+    mock_pool, mock_conn, mock_cursor = mock_database_modules
+
+    rows = []
+    for url in ['https://www.thegradcafe.com/result/100',
+                'https://www.thegradcafe.com/result/250',
+                None]:
+        rows.append({
+            'program': 'CS', 'comments': None, 'date_added': '2024-01-01',
+            'url': url, 'status': 'Accepted', 'Term': 'Fall 2025',
+            'US/International': 'American', 'gpa': 3.8, 'gre': 320, 'gre_v': 160,
+            'gre_aw': 4.5, 'Degree': 'Masters', 'llm-generated-program': 'CS',
+            'llm-generated-university': 'Test University'
+        })
+
+    load_data.add_applicant_data({"rows": rows})
+
+    assert len(mock_cursor.executemany.call_args[0][1]) == 3
+    assert mock_cursor.execute.call_count == 1
+    cursor_sql, cursor_params = mock_cursor.execute.call_args_list[-1][0]
+    assert "INSERT INTO crawl_cursor" in cursor_sql
+    assert "GREATEST" in cursor_sql
+    assert cursor_params == (load_data.CRAWL_CURSOR_NAME, 250)
+    assert mock_conn.commit.call_count == 2
+
+@pytest.mark.db
+def test_advance_crawl_cursor_without_ids(mocker):
+    """Test advance_crawl_cursor does nothing when no row has a result ID."""
+    from src import load_data
+
+    mock_cursor = mocker.MagicMock()
+
+    load_data.advance_crawl_cursor(mock_cursor, [None, None])
+
+    mock_cursor.execute.assert_not_called()
+
+@pytest.mark.db
+def test_create_crawl_cursor_table(mock_database_modules):
+    """Test create_crawl_cursor_table creates the cursor table."""
+    from src import load_data
+
+    mock_pool, mock_conn, mock_cursor = mock_database_modules
+
+    load_data.create_crawl_cursor_table()
+
+    executed_sql = mock_cursor.execute.call_args[0][0]
+    assert "CREATE TABLE IF NOT EXISTS crawl_cursor" in executed_sql
+    mock_conn.commit.assert_called_once()
+    mock_pool.close.assert_called_once()
+
+@pytest.mark.db
+def test_ensure_schema_migrates_once(mocker):
+    """Test ensure_schema runs every migration before the first insert only."""
+    from src import load_data
+
+    mocker.patch.object(load_data, '_schema_ready', False)
+    migrations = mocker.MagicMock()
+    for name in ('create_crawl_cursor_table', 'add_result_id_column', 'add_structured_columns'):
+        mocker.patch.object(load_data, name, getattr(migrations, name))
+    row = {'program': 'CS', 'url': 'https://www.thegradcafe.com/result/1'}
+
+    load_data.add_applicant_data({"rows": [row]})
+    load_data.add_applicant_data({"rows": [row]})
+
+    assert [call[0] for call in migrations.mock_calls] == [
+        'create_crawl_cursor_table', 'add_result_id_column', 'add_structured_columns'
+    ]
+    assert load_data._schema_ready is True
+
+@pytest.mark.db
+def test_add_applicant_data_inserts_in_batches(mocker, mock_database_modules):
+    """Test rows from an iterator are inserted and committed one batch at a time."""
+    from src import load_data
+
+    mock_pool, mock_conn, mock_cursor = mock_database_modules
+    mocker.patch.object(load_data, 'LOAD_BATCH_SIZE', 2)
+    rows = ({'program': 'CS', 'url': f'https://www.thegradcafe.com/result/{i}'} for i in range(5))
+
+    load_data.add_applicant_data({"rows": rows})
+
+    assert [len(call[0][1]) for call in mock_cursor.executemany.call_args_list] == [2, 2, 1]
+    assert [call[0][1][1] for call in mock_cursor.execute.call_args_list] == [4]
+    assert mock_conn.commit.call_count == 4
+
+@pytest.mark.db
+def test_failed_batch_leaves_crawl_cursor_unchanged(mocker, mock_database_modules):
+    """Test a load that fails part-way commits earlier batches but never moves the cursor."""
+    from src import load_data
+
+    mock_pool, mock_conn, mock_cursor = mock_database_modules
+    mocker.patch.object(load_data, 'LOAD_BATCH_SIZE', 2)
+    mock_cursor.executemany.side_effect = [None, Exception("connection lost")]
+    rows = [{'program': 'CS', 'url': f'https://www.thegradcafe.com/result/{i}'} for i in (9, 8, 7, 6)]
+
+    with pytest.raises(Exception, match="connection lost"):
+        load_data.add_applicant_data_master_copy({"rows": [
+            {**row, 'comments': None, 'date_added': None, 'status': None, 'semester': None,
+             'applicant_type': None, 'gpa': None, 'gre_total': None, 'gre_verbal': None,
+             'gre_aw': None, 'degree': None, 'llm-generated-program': None,
+             'llm-generated-university': None} for row in rows
+        ]})
+
+    mock_conn.commit.assert_called_once()  # The first batch only
+    mock_cursor.execute.assert_not_called()
+
+@pytest.mark.db
+def test_loading_the_same_file_twice_skips_duplicates(tmp_path, capsys, mock_database_modules):
+    """Test a second load of the same file inserts nothing and reports every row as skipped."""
+    from src import load_data
+
+    mock_pool, mock_conn, mock_cursor = mock_database_modules
+    stored = set()
+
+    def insert(sql, params):
+        # ON CONFLICT (result_id) DO NOTHING: rowcount counts only new result IDs
+        new_ids = {row[-1] for row in params} - stored
+        stored.update(new_ids)
+        mock_cursor.rowcount = len(new_ids)
+
+    mock_cursor.executemany.side_effect = insert
+    path = tmp_path / "rows.jsonl"
+    path.write_text("\n".join(json.dumps({'program': 'CS', 'url': f'https://www.thegradcafe.com/result/{i}'})
+                              for i in range(3)))
+
+    assert load_data.add_applicant_data({"rows": load_data.iter_rows(str(path))}) == {"inserted": 3, "skipped": 0}
+    assert load_data.add_applicant_data({"rows": load_data.iter_rows(str(path))}) == {"inserted": 0, "skipped": 3}
+
+    assert stored == {0, 1, 2}
+    assert "Inserted 0 rows, skipped 3 already in the database" in capsys.readouterr().out
+
+@pytest.mark.db
+def test_iter_rows_latin1_fallback_skips_yielded_rows(tmp_path):
+    """Test iter_rows re-reads a non-UTF-8 file as latin1 without repeating rows."""
+    from src import load_data
+
+    path = tmp_path / "rows.jsonl"
+    lines = ['{"program": "CS"}'] * 5000 + ['{"program": "Caf\xe9"}']
+    path.write_bytes("\n".join(lines).encode('latin1'))
+
+    rows = list(load_data.iter_rows(str(path)))
+
+    assert len(rows) == 5001
+    assert rows[-1] == {"program": "Caf\xe9"}
@@ -0,0 +1,120 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'web_scraper'))
+import itertools
+import queue
+import threading
+import time
+import pytest
+
+import raw_archive
+
+
+@pytest.fixture
+def pipeline(mocker):
+    """Import pipeline against a mocked connection pool, with the LLM model replaced."""
+    mocker.patch.dict('sys.modules', {'psycopg_pool': mocker.MagicMock()})
+    for name in ('scrape', 'load_data', 'pipeline'):
+        sys.modules.pop(name, None)
+    import pipeline
+    mocker.patch.object(pipeline.scrape, 'get_high_water_mark', return_value=880000)
+    mocker.patch.object(pipeline.clean, 'llm_standardize_stream',
+                        side_effect=lambda rows, llm_dir=None: ({**row, "llm": True} for row in rows))
+    mocker.patch.object(pipeline.load_data, 'ensure_schema')
+    mocker.patch.object(pipeline.load_data, 'insert_applicant_rows', wraps=pipeline.load_data.insert_applicant_rows)
+    mocker.patch.object(pipeline.load_data, 'advance_crawl_cursor')
+    return pipeline
+
+
+def loaded_batches(pipeline):
+    """Rows of each batch the load stage inserted, in order."""
+    return [call.args[1] for call in pipeline.load_data.insert_applicant_rows.call_args_list]
+
+
+def scraped_pages(count, rows_per_page=2, closed=None):
+    """Yield fused survey pages the way scrape.iter_pages does, recording when it is closed."""
+    try:
+        for page in range(1, count + 1):
+            rows = [{"url": f"/result/{page * 10 + n}"} for n in range(rows_per_page)]
+            yield {"page": page, "html": f"<html>{page}</html>", "rows": rows}
+    finally:
+        if closed is not None:
+            closed.append(True)
+
+
+@pytest.mark.integration
+def test_run_streams_pages_into_batches(pipeline, mocker, tmp_path, capsys):
+    """Pages are archived and enriched, rows standardized, then committed in batches."""
+    closed = []
+    iter_pages = mocker.patch.object(pipeline.scrape, 'iter_pages', return_value=scraped_pages(3, closed=closed))
+    enrich_rows = mocker.patch.object(pipeline.enrich, 'enrich_rows')
+    archive_path = str(tmp_path / 'pages.gz')
+    cur = pipeline.scrape.db_pool.connection.return_value.__enter__.return_value.cursor.return_value.__enter__.return_value
+    cur.rowcount = 2  # Rows inserted by each batch; the rest were already stored
+
+    stats = pipeline.run(concurrency=4, batch_size=4, archive_path=archive_path, enrich_details=True)
+
+    assert stats == {"pages": 3, "rows": 4, "batches": 2, "skipped": 2}
+    batches = loaded_batches(pipeline)
+    iter_pages.assert_called_once_with(concurrency=4, high_water_mark=880000, fused=True)
+    assert enrich_rows.call_count == 3
+    assert [len(batch) for batch in batches] == [4, 2]
+    assert all(row["llm"] for batch in batches for row in batch)
+    assert [row["url"] for row in itertools.chain(*batches)][:3] == ["/result/10", "/result/11", "/result/20"]
+    assert raw_archive.RawArchive(archive_path).read(2) == b"<html>2</html>"
+    assert closed == [True]
+    out = capsys.readouterr().out
+    assert "Loaded batch of 4 rows (2 already in the database)" in out
+    assert "Loaded batch of 2 rows (0 already in the database)" in out
+    # One connection for every batch, one more to move the cursor after the run
+    assert pipeline.scrape.db_pool.connection.call_count == 2
+    pipeline.load_data.ensure_schema.assert_called_once()
+    assert pipeline.load_data.advance_crawl_cursor.call_args.args[1] == [31]
+
+
+@pytest.mark.integration
+def test_run_without_new_pages_skips_the_model(pipeline, mocker, capsys):
+    """With nothing new to scrape the LLM model is never started and nothing is loaded."""
+    mocker.patch.object(pipeline.scrape, 'iter_pages', return_value=scraped_pages(0))
+
+    assert pipeline.run(archive_path=None, enrich_details=False) == {"pages": 0, "rows": 0, "batches": 0, "skipped": 0}
+
+    pipeline.clean.llm_standardize_stream.assert_not_called()
+    pipeline.load_data.insert_applicant_rows.assert_not_called()
+    pipeline.load_data.advance_crawl_cursor.assert_not_called()
+    assert "No new data to scrape." in capsys.readouterr().out
+
+
+@pytest.mark.integration
+def test_queue_helpers_wait_for_room_or_items(pipeline):
+    """Blocked puts and gets keep waiting until the end marker or a pipeline stop."""
+    stop = threading.Event()
+    full = queue.Queue(maxsize=1)
+    full.put("waiting")
+    threading.Timer(0.25, stop.set).start()
+    assert pipeline._put(full, "more", stop) is False
+
+    stop.clear()
+    empty = queue.Queue()
+    threading.Timer(0.25, lambda: [empty.put(1), empty.put(pipeline._DONE)]).start()
+    assert list(pipeline._drain(empty, stop)) == [1]
+
+
+@pytest.mark.integration
+def test_failed_stage_stops_the_others(pipeline, mocker):
+    """The first error stops every stage, and the crawl cursor stays where it was."""
+    closed = []
+    mocker.patch.object(pipeline.scrape, 'iter_pages', return_value=scraped_pages(100, closed=closed))
+
+    def fail_slowly(cur, rows):
+        time.sleep(0.3)  # Long enough for the earlier stages to fill their queues
+        raise RuntimeError("database down")
+
+    pipeline.load_data.insert_applicant_rows.side_effect = fail_slowly
+
+    with pytest.raises(RuntimeError, match="database down"):
+        pipeline.run(batch_size=1, queue_size=1, archive_path=None, enrich_details=False)
+
+    assert closed == [True]
+    pipeline.load_data.advance_crawl_cursor.assert_not_called()
@@ -0,0 +1,87 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'web_scraper'))
+import pytest
+import urllib3
+
+import http_client
+import raw_archive
+import replay_server
+
+
+@pytest.fixture
+def replay():
+    """Start a replay server for two recorded pages; return the server."""
+    server, _ = replay_server.start({1: b"<html>one</html>", 2: b"<html>two</html>"})
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, path):
+    return urllib3.request('GET', server.base_url + path, retries=False, redirect=False)
+
+
+@pytest.mark.scrape
+def test_load_pages_from_archive_json_or_backfill(tmp_path, mocker):
+    """Recorded pages load from an archive, the legacy JSON or a backfill directory, as bytes."""
+    archive_path = str(tmp_path / 'pages.gz')
+    raw_archive.RawArchive.create(archive_path).append(3, "<html>three</html>")
+    json_path = str(tmp_path / 'pages.json')
+    replay_server.clean.save_data([{"page": 1, "html": "<html>one</html>"}], json_path)
+    backfill_pages = mocker.patch.object(replay_server.backfill, 'iter_archived_pages',
+                                         return_value=iter([{"page": 7, "html": b"<html>seven</html>"}]))
+
+    assert replay_server.load_pages(archive_path, json_path) == {3: b"<html>three</html>"}
+    assert replay_server.load_pages(str(tmp_path / 'missing.gz'), json_path) == {1: b"<html>one</html>"}
+    assert replay_server.load_pages(str(tmp_path)) == {7: b"<html>seven</html>"}
+    backfill_pages.assert_called_once_with(str(tmp_path))
+
+
+@pytest.mark.scrape
+def test_serves_recorded_and_empty_pages(replay):
+    """Recorded pages are served by number; others are empty survey pages."""
+    assert get(replay, '/survey/?page=2').data == b"<html>two</html>"
+    assert get(replay, '/survey/').data == b"<html>one</html>"  # Page 1 by default
+    assert get(replay, '/survey/?page=9').data == replay_server.EMPTY_PAGE
+    assert get(replay, '/survey/?page=x').status == 400
+    assert get(replay, '/robots.txt').data == b"User-agent: *\nAllow: /\n"
+    assert get(replay, '/result/1').status == 404
+
+    assert replay.stats == {"requests": 4, "errors": 0, "throttled": 0}
+
+
+@pytest.mark.scrape
+def test_injected_errors_throttling_and_latency(replay, mocker):
+    """Error and throttle rates answer 503 and 429; latency plus jitter delays each response."""
+    sleep = mocker.patch.object(replay_server.time, 'sleep')
+    replay.error_rate = 1.0
+    assert get(replay, '/survey/?page=1').status == 503
+
+    replay.error_rate, replay.throttle_rate = 0.0, 1.0
+    response = get(replay, '/survey/?page=1')
+    assert response.status == 429
+    assert response.headers['Retry-After'] == "1"
+
+    replay.throttle_rate, replay.latency, replay.jitter = 0.0, 0.25, 0.5
+    assert get(replay, '/survey/?page=1').status == 200
+    assert 0.25 <= sleep.call_args.args[0] <= 0.75
+    assert replay.stats == {"requests": 3, "errors": 1, "throttled": 1}
+
+
+@pytest.mark.scrape
+def test_scraper_runs_against_replay(replay, mocker, monkeypatch):
+    """The unmodified scraper fetches every recorded page and stops on the empty ones."""
+    mocker.patch.dict('sys.modules', {'psycopg_pool': mocker.MagicMock()})
+    sys.modules.pop('scrape', None)
+    import scrape
+    replay.pages = {page: f'<a href="/result/{page}">See More</a>'.encode() for page in (1, 2, 3)}
+    monkeypatch.setattr(scrape, 'BASE_URL', replay.base_url)
+    monkeypatch.setattr(scrape, 'http', http_client.ResilientClient(max_retries=0))
+    monkeypatch.setattr(http_client, '_site_controllers', {})
+
+    pages = scrape.fetch_pages(existing_ids=set(), concurrency=2, max_empty_pages=2)
+
+    assert [page['page'] for page in pages] == [1, 2, 3]
+    assert replay.stats["requests"] >= 5
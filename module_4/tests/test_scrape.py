@@ -0,0 +1,307 @@
+import sys
+import os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src', 'web_scraper'))
+import glob
+import pytest
+
+import http_client
+import raw_archive
+
+CORPUS = sorted(glob.glob(os.path.join(os.path.dirname(__file__), 'fixtures', 'survey_pages', '*.html')))
+
+
+def survey_page(result_ids):
+    """A minimal survey page linking to the given results."""
+    links = "".join(f'<a href="/result/{result_id}">See More</a>' for result_id in result_ids)
+    return f"<html><body>{links}<a href=\"/survey/?page=2\">Next</a></body></html>".encode()
+
+
+@pytest.fixture
+def scrape(mocker, monkeypatch, site):
+    """Import scrape against a mocked connection pool, pointed at the local site."""
+    mocker.patch.dict('sys.modules', {'psycopg_pool': mocker.MagicMock()})
+    sys.modules.pop('scrape', None)
+    import scrape
+    base_url, routes = site
+    monkeypatch.setattr(scrape, 'BASE_URL', base_url)
+    monkeypatch.setattr(scrape, 'http', http_client.ResilientClient(max_retries=0, backoff_base=0))
+    monkeypatch.setattr(http_client, '_site_controllers', {})
+    return scrape
+
+
+@pytest.fixture
+def survey(site):
+    """Serve pages 1-3 with new results (IDs 300 down) and pages 4-12 with known ones."""
+    _, routes = site
+    for page in range(1, 13):
+        first = 330 - page * 10
+        routes[f'/survey/?page={page}'] = [(200, {}, survey_page(range(first, first + 10)))]
+    return set(range(100, 300))
+
+
+def db_cursor(scrape):
+    """Return the cursor that scrape's mocked connection pool hands out."""
+    return scrape.db_pool.connection.return_value.__enter__.return_value.cursor.return_value
+
+
+@pytest.mark.scrape
+@pytest.mark.parametrize("path", CORPUS, ids=os.path.basename)
+def test_extractors_agree_on_corpus(scrape, path):
+    """The lxml fast path finds exactly the IDs the bs4 implementation finds."""
+    with open(path, 'rb') as f:
+        html = f.read()
+
+    ids = scrape.extract_result_ids(html, backend='lxml')
+
+    assert ids == scrape.extract_result_ids(html, backend='bs4')
+    assert ids == scrape.extract_result_ids(html.decode('utf-8'), backend='lxml')
+
+
+@pytest.mark.scrape
+def test_extractor_edge_cases(scrape, monkeypatch, mocker):
+    """Malformed hrefs are skipped, empty pages have no IDs and lxml is optional."""
+    html = b'<a href="/result/12">a</a><a href="/result/x1">b</a><a href="/survey/">c</a>'
+
+    assert scrape.extract_result_ids(html) == {12}
+    assert scrape.extract_result_ids(b'  ', backend='lxml') == set()
+    with pytest.raises(ValueError):
+        scrape.extract_result_ids(html, backend='regex')
+
+    monkeypatch.setattr(scrape, 'lxml', None)
+    bs4 = mocker.patch.object(scrape, 'BeautifulSoup', wraps=scrape.BeautifulSoup)
+    assert scrape.extract_result_ids(html, backend='lxml') == {12}
+    bs4.assert_called_once()
+
+
+@pytest.mark.scrape
+def test_scrape_imports_without_lxml(mocker):
+    """Without lxml installed the module still imports and falls back to bs4."""
+    mocker.patch.dict('sys.modules', {'psycopg_pool': mocker.MagicMock(), 'lxml': None, 'lxml.html': None})
+    sys.modules.pop('scrape', None)
+    import scrape
+
+    assert scrape.lxml is None
+    assert scrape.extract_result_ids(b'<a href="/result/7">x</a>') == {7}
+
+
+@pytest.mark.scrape
+def test_iter_pages_yields_new_pages_in_order(scrape, survey, capsys):
+    """Pages arrive concurrently but are yielded in order; five empty pages end the crawl."""
+    controller = http_client.AdaptiveConcurrency(initial=4, max_limit=4)
+
+    pages = list(scrape.iter_pages(existing_ids=survey, controller=controller))
+
+    assert [entry["page"] for entry in pages] == [1, 2, 3]
+    assert pages[0]["html"] == survey_page(range(320, 330))
+    out = capsys.readouterr().out
+    assert "Page 1: 10 new results out of 10 total" in out
+    assert "Page 8: No new results" in out
+    assert "Page 9:" not in out
+
+
+@pytest.mark.scrape
+def test_iter_pages_stops_at_high_water_mark(scrape, survey, capsys):
+    """The first stored page whose IDs are all at or below the mark ends the crawl."""
+    pages = scrape.fetch_pages(existing_ids=survey, concurrency=2, high_water_mark=299, adaptive=False)
+
+    assert [entry["page"] for entry in pages] == [1, 2, 3]
+    assert "Page 4: reached high-water mark 299" in capsys.readouterr().out
+    assert scrape.http.controller.limit == 2
+
+
+@pytest.mark.scrape
+def test_high_water_mark_does_not_skip_missing_rows(scrape, survey, capsys):
+    """Pages below the mark whose rows were never stored are fetched before the crawl stops."""
+    stored = survey - set(range(280, 300))  # Pages 4-5 were lost by an earlier failed load
+
+    pages = scrape.fetch_pages(existing_ids=stored, concurrency=2, high_water_mark=299, adaptive=False)
+
+    assert [entry["page"] for entry in pages] == [1, 2, 3, 4, 5]
+    out = capsys.readouterr().out
+    assert "Page 4: reached high-water mark" not in out
+    assert "Page 6: reached high-water mark 299" in out
+
+
+@pytest.mark.scrape
+def test_fetch_pages_fused_attaches_rows(scrape, survey):
+    """Fused pages carry the rows cleaned from the scraper's own parse."""
+    pages = scrape.fetch_pages(existing_ids=survey, concurrency=2, high_water_mark=299, fused=True)
+
+    assert [sorted(entry) for entry in pages] == [["html", "page", "rows"]] * 3
+
+
+@pytest.mark.scrape
+def test_iter_pages_close_cancels_queued_pages(scrape, survey):
+    """Closing the iterator early stops the crawl without waiting for queued pages."""
+    pages = scrape.iter_pages(existing_ids=survey, concurrency=3)
+
+    assert next(pages)["page"] == 1
+    pages.close()
+
+
+@pytest.mark.scrape
+def test_iter_pages_looks_up_ids_per_page(scrape, survey):
+    """Without known IDs, each page's IDs are checked against the database."""
+    db_cursor(scrape).fetchall.return_value = [(320,)]
+    controller = http_client.AdaptiveConcurrency(initial=1, max_limit=1)
+
+    pages = scrape.iter_pages(controller=controller)
+    entry = next(pages)
+    pages.close()
+
+    assert entry["page"] == 1
+    assert set(db_cursor(scrape).execute.call_args[0][1][0]) == set(range(320, 330))
+
+
+@pytest.mark.scrape
+def test_new_results_fused_cleans_only_new_rows(scrape, site):
+    """In fused mode one parse gives both the IDs and the rows of the new results."""
+    _, routes = site
+    with open(CORPUS[0], 'rb') as f:
+        html = f.read()
+    routes['/survey/?page=1'] = [(200, {}, html)]
+    page_ids = scrape.extract_result_ids(html)
+    known = set(sorted(page_ids)[:3])
+
+    has_new, total, new, content, reached = scrape.new_results(1, existing_ids=known, fused=True)
+
+    assert (has_new, total, new, reached) == (True, len(page_ids), len(page_ids) - 3, False)
+    assert content["html"] == html
+    assert content["rows"] == scrape.clean.clean_html(html, known_ids=known)
+
+
+@pytest.mark.scrape
+def test_find_existing_ids_and_high_water_mark(scrape, capsys):
+    """Database lookups return what the query finds and degrade to 'nothing known' on errors."""
+    cursor = db_cursor(scrape)
+    cursor.fetchall.return_value = [(5,)]
+    cursor.fetchone.return_value = (42,)
+
+    assert scrape.find_existing_ids(set()) == set()
+    assert scrape.find_existing_ids({5, 6}) == {5}
+    assert scrape.get_high_water_mark() == 42
+    cursor.fetchone.return_value = None
+    assert scrape.get_high_water_mark() is None
+
+    cursor.execute.side_effect = Exception("no such table")
+    assert scrape.find_existing_ids({5}) == set()
+    assert scrape.get_high_water_mark() is None
+    out = capsys.readouterr().out
+    assert "Error getting existing IDs: no such table" in out
+    assert "Error reading crawl cursor: no such table" in out
+
+
+@pytest.fixture
+def fake_pages(scrape, mocker):
+    """Replace new_results with a fetch whose pages up to the boundary have new results."""
+    fetched = []
+
+    def install(boundary, empty=()):
+        def new_results(page_number, existing_ids=None, high_water_mark=None, fused=False):
+            fetched.append(page_number)
+            has_new = page_number <= boundary and page_number not in empty
+            return has_new, 25, 25 if has_new else 0, f"page {page_number}" if has_new else None, False
+        mocker.patch.object(scrape, 'new_results', side_effect=new_results)
+        return fetched
+
+    return install
+
+
+@pytest.mark.scrape
+@pytest.mark.parametrize("boundary,max_page,expected_probes", [
+    (37, None, [1, 2, 4, 8, 16, 32, 64, 48, 40, 36, 38, 37]),
+    (0, None, [1]),
+    (1, None, [1, 2]),
+    (8, 8, [1, 2, 4, 8]),
+    (5, 6, [1, 2, 4, 5, 6]),
+])
+def test_boundary_search_gallops_then_bisects(scrape, fake_pages, boundary, max_page, expected_probes):
+    """The boundary is found in O(log n) probes, never probing past max_page."""
+    fetched = fake_pages(boundary)
+
+    found, probes = scrape.find_new_data_boundary(max_page=max_page)
+
+    assert found == boundary
+    assert list(probes) == expected_probes
+    assert fetched == expected_probes
+
+
+@pytest.mark.scrape
+def test_fetch_pages_gallop_reuses_probes(scrape, fake_pages, capsys):
+    """After the search, every page up to the boundary is fetched exactly once."""
+    fetched = fake_pages(37, empty={20})  # A gap that is not probed is still fetched
+
+    pages = scrape.fetch_pages_gallop(concurrency=4)
+
+    assert [entry["page"] for entry in pages] == [page for page in range(1, 38) if page != 20]
+    assert sorted(fetched) == list(range(1, 39)) + [40, 48, 64]
+    out = capsys.readouterr().out
+    assert "New-data boundary found at page 37 after 12 probes" in out
+    assert "Page 20: No new results" in out
+
+
+@pytest.mark.scrape
+def test_get_controller_paces_to_robots(scrape, site, capsys):
+    """The first call reads the crawl delay; a fixed limit sets min and max to it."""
+    _, routes = site
+    routes['/robots.txt'] = [(200, {}, b"User-agent: *\nCrawl-delay: 2\n")]
+
+    controller = scrape.get_controller(initial=3, adaptive=False)
+
+    assert (controller.limit, controller.min_limit, controller.max_limit) == (3, 3, 3)
+    assert controller.crawl_delay == 2.0
+    assert scrape.get_controller() is controller
+    assert capsys.readouterr().out == "Honoring robots.txt crawl delay of 2.0s\n"
+
+
+@pytest.mark.scrape
+def test_scrape_data_returns_prettified_page(scrape, site):
+    """scrape_data fetches through the paced client and prettifies the page."""
+    base_url, routes = site
+    routes['/survey/'] = [(200, {}, b'<html><body><p>hi</p></body></html>')]
+
+    html = scrape.scrape_data(base_url + '/survey/')
+
+    assert "<p>\n   hi\n  </p>" in html
+    assert scrape.http.controller is not None
+
+
+@pytest.mark.scrape
+def test_save_data_and_archive(scrape, tmp_path):
+    """Pages are written as JSON Lines or as a compressed archive readable page by page."""
+    pages = [{"page": 1, "html": "<html>1</html>"}, {"page": 2, "html": "<html>2</html>"}]
+
+    scrape.save_data(pages, str(tmp_path / 'raw.jsonl'))
+    archive = scrape.save_archive(pages, str(tmp_path / 'raw.gz'))
+
+    assert list(scrape.json_stream.iter_file(str(tmp_path / 'raw.jsonl'))) == pages
+    reopened = raw_archive.RawArchive(str(tmp_path / 'raw.gz'))
+    assert [(entry['page'], entry['html']) for entry in reopened] == [(1, b'<html>1</html>'),
+                                                                      (2, b'<html>2</html>')]
+    assert len(archive) == 2
+
+
+@pytest.mark.scrape
+def test_main_saves_archive_or_returns_rows(scrape, mocker, capsys):
+    """main() archives new pages, returns fused rows, and reports when nothing is new."""
+    mocker.patch.object(scrape, 'get_high_water_mark', return_value=250)
+    save_archive = mocker.patch.object(scrape, 'save_archive')
+    pages = [{"page": 1, "html": b"1", "rows": [{"program": "A"}]},
+             {"page": 2, "html": b"2", "rows": [{"program": "B"}]}]
+    fetch_pages = mocker.patch.object(scrape, 'fetch_pages', return_value=pages)
+    gallop = mocker.patch.object(scrape, 'fetch_pages_gallop', return_value=[])
+
+    assert scrape.main(concurrency=2) is None
+    save_archive.assert_called_once_with(pages)
+    assert fetch_pages.call_args.kwargs["high_water_mark"] == 250
+    assert fetch_pages.call_args.kwargs["controller"] is scrape.http.controller
+
+    assert scrape.main(fused=True, save_raw=False) == [{"program": "A"}, {"program": "B"}]
+    assert save_archive.call_count == 1
+
+    assert scrape.main(boundary_search=True) is None
+    gallop.assert_called_once_with(concurrency=scrape.SCRAPE_CONCURRENCY, high_water_mark=250, fused=False)
+    out = capsys.readouterr().out
+    assert "No new data to scrape." in out
+    assert "HTTP stats:" in out